@@ -0,0 +1,107 @@
+"""
+Scaling of the docstring analysis stage (parse, walk and insertion list) with
+worker processes.
+
+Builds --files synthetic modules of --defs definition groups each, then times
+codex_autotest.docplan.iter_plans over all of them with 1, 2, 4, ... worker
+processes up to --max-workers (default: the number of CPUs), and reports the
+speedup and parallel efficiency relative to the in-process run. Each count is
+also timed for the whole `docstring` command on a cold symbol index, with the
+API stubbed out, so serial work outside the pool shows up in the totals.
+
+    python -m benchmarks.bench_analysis --files 5000 --json analysis.json
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from click.testing import CliRunner
+from codex_autotest import cli
+from codex_autotest.astwalk import parse
+from codex_autotest.docplan import iter_plans
+from .synth import MODULE_TEMPLATE
+
+
+def build_tree(root, n_files, n_defs):
+    paths = []
+    for i in range(n_files):
+        path = Path(root) / f'pkg{i // 500}' / f'mod_{i}.py'
+        if i % 500 == 0:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('\n\n'.join(MODULE_TEMPLATE.format(i=f'{i}_{j}') for j in range(n_defs)))
+        paths.append(path)
+    return paths
+
+
+def worker_counts(max_workers):
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def time_analysis(paths, workers):
+    """Return (seconds, insertions found) for one pass over paths."""
+    # Trees cached by an earlier pass (and inherited by forked workers) would skew the timing
+    parse.cache_clear()
+    start = time.perf_counter()
+    found = sum(len(plan.insertions) for plan in iter_plans(paths, workers=workers))
+    return time.perf_counter() - start, found
+
+
+def time_command(root, workers):
+    """Return the seconds one `docstring` run over root takes with a cold index and no API calls."""
+    state = Path(root) / '.codex-autotest'
+    shutil.rmtree(state, ignore_errors=True)
+    parse.cache_clear()
+    saved, cwd = cli.chat_completion, os.getcwd()
+    cli.chat_completion = lambda prompt, **kwargs: 'Doc.'
+    os.chdir(root)
+    try:
+        start = time.perf_counter()
+        result = CliRunner().invoke(cli.main, ['--no-cache', 'docstring', '--path', 'src', '--workers', str(workers)])
+        seconds = time.perf_counter() - start
+    finally:
+        cli.chat_completion = saved
+        os.chdir(cwd)
+    if result.exit_code != 0:
+        raise SystemExit(result.output)
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark docstring analysis scaling across processes.')
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--defs', type=int, default=10, help='Definition groups (4 objects each) per module')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--json', dest='json_out', default=None, help='Write results to this JSON file')
+    args = parser.parse_args()
+    results = []
+    with tempfile.TemporaryDirectory(prefix='bench-analysis-') as tmp:
+        paths = build_tree(Path(tmp) / 'src', args.files, args.defs)
+        print(f'{args.files} files, {args.defs * 4} definitions each, {os.cpu_count()} CPU(s)')
+        print(f'{"Workers":>8}{"Seconds":>10}{"Files/s":>10}{"Speedup":>10}{"Efficiency":>12}'
+              f'{"Command s":>11}{"Speedup":>10}')
+        base = command_base = None
+        for workers in worker_counts(args.max_workers):
+            seconds, found = time_analysis(paths, workers)
+            command = time_command(tmp, workers)
+            base = base or seconds
+            command_base = command_base or command
+            row = {'workers': workers, 'seconds': seconds, 'files_per_sec': args.files / seconds,
+                   'speedup': base / seconds, 'efficiency': base / seconds / workers, 'insertions': found,
+                   'command_seconds': command, 'command_speedup': command_base / command}
+            results.append(row)
+            print(f'{workers:>8}{seconds:>10.2f}{row["files_per_sec"]:>10.0f}{row["speedup"]:>10.2f}'
+                  f'{row["efficiency"]:>12.0%}{command:>11.2f}{row["command_speedup"]:>10.2f}')
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=1))
+
+
+if __name__ == '__main__':
+    main()
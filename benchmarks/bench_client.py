@@ -0,0 +1,65 @@
+"""
+Latency saved per request by the shared, pooled API client.
+
+Sends the same requests against the local mock server twice: once building a
+new client (and connection) per request, as the legacy code path did, and once
+through the long-lived client from openai_client.
+
+    python benchmarks/bench_client.py --requests 200 --latency 0.005
+"""
+import argparse
+import os
+import statistics
+import time
+from codex_autotest import openai_client
+from codex_autotest.mock_server import MockServer
+
+
+def _timed(func, n):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(label, samples):
+    print(f'{label:<18} mean {statistics.mean(samples) * 1000:7.2f} ms   '
+          f'p50 {statistics.median(samples) * 1000:7.2f} ms   total {sum(samples):6.2f} s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0, help='Server-side latency per request in seconds')
+    args = parser.parse_args()
+    os.environ.setdefault('OPENAI_API_KEY', 'mock')
+    openai_client.configure_cache(enabled=False)
+    with MockServer(latency=args.latency) as server:
+        openai_client.configure_client(base_url=server.base_url)
+
+        def fresh(i):
+            client = openai_client._build_client()
+            try:
+                client.chat.completions.create(model='mock', messages=[{'role': 'user', 'content': str(i)}])
+            finally:
+                client.close()
+
+        def shared(i):
+            openai_client.chat_completion(f'prompt {i}', model='gpt-3.5-turbo')
+
+        # Warm up imports and the shared pool before measuring
+        fresh(0)
+        shared(0)
+        fresh_samples = _timed(fresh, args.requests)
+        shared_samples = _timed(shared, args.requests)
+        openai_client.close_clients()
+    _report('client per request', fresh_samples)
+    _report('shared client', shared_samples)
+    saved = statistics.mean(fresh_samples) - statistics.mean(shared_samples)
+    print(f'Saved per request: {saved * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
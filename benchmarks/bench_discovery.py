@@ -0,0 +1,54 @@
+"""
+Walk time of source discovery on a large synthetic tree.
+
+Builds a tree of --files files where most live in a virtualenv, node_modules,
+build output and a gitignored vendor directory, then times a plain
+`rglob('*.py')` against codex_autotest.discovery.discover().
+
+    python -m benchmarks.bench_discovery --files 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from codex_autotest.discovery import discover
+
+# Share of the tree that lives in each top-level directory
+LAYOUT = (('src', 0.2), ('.venv/lib/python3/site-packages', 0.4), ('node_modules', 0.2),
+          ('build/lib', 0.1), ('vendor', 0.1))
+
+
+def build_tree(root, n_files):
+    root = Path(root)
+    (root / '.git').mkdir()
+    (root / '.gitignore').write_text('vendor/\n*.log\n')
+    for top, share in LAYOUT:
+        count = int(n_files * share)
+        ext = '.js' if top == 'node_modules' else '.py'
+        for i in range(count):
+            directory = root / top / f'pkg{i // 200}'
+            if i % 200 == 0:
+                directory.mkdir(parents=True, exist_ok=True)
+            (directory / f'mod_{i}{ext}').write_text('x = 1\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark source discovery.')
+    parser.add_argument('--files', type=int, default=100000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(prefix='bench-discovery-') as tmp:
+        start = time.perf_counter()
+        build_tree(tmp, args.files)
+        print(f'Built {args.files} files in {time.perf_counter() - start:.1f} s')
+        start = time.perf_counter()
+        naive = list(Path(tmp).rglob('*.py'))
+        naive_time = time.perf_counter() - start
+        start = time.perf_counter()
+        found = discover(tmp, '.py')
+        pruned_time = time.perf_counter() - start
+    print(f'rglob:    {naive_time:6.2f} s  {len(naive)} files')
+    print(f'discover: {pruned_time:6.2f} s  {len(found)} files')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+CLI startup time: an import-time breakdown of the console entry point
+(`codex_autotest.daemon`, then `codex_autotest.cli`) and the wall time of
+`codex-autotest --help` run through that entry point.
+
+    python -m benchmarks.bench_startup --runs 20 --json startup.json
+    python -m benchmarks.bench_startup --budget-ms 250 --baseline startup.json
+
+The run fails if the median --help time exceeds --budget-ms, or with
+--baseline if it grew by more than --tolerance compared with the saved result.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# What the installed `codex-autotest` script runs: the daemon client, falling back to the CLI
+ENTRY_POINT = 'from codex_autotest.daemon import run; run()'
+HELP_CMD = [sys.executable, '-c', ENTRY_POINT, '--help']
+# Modules imported, in order, on the way to the CLI
+ENTRY_MODULES = ('codex_autotest.daemon', 'codex_autotest.cli')
+
+
+def import_times(modules=ENTRY_MODULES):
+    """Return [(name, self_us, cumulative_us)] from `python -X importtime -c 'import <modules>'`."""
+    run = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {", ".join(modules)}'],
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in run.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative)))
+    return rows
+
+
+def help_times(runs):
+    """Return the wall time in seconds of each of runs `codex-autotest --help` invocations."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(HELP_CMD, capture_output=True, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def measure(runs=10, top=15):
+    rows = import_times()
+    cumulative = {name: c / 1000 for name, _, c in rows}
+    times = help_times(runs)
+    return {
+        'import_ms': cumulative.get('codex_autotest.cli', 0),
+        'daemon_import_ms': cumulative.get('codex_autotest.daemon', 0),
+        'help_ms': statistics.median(times) * 1000,
+        'help_min_ms': min(times) * 1000,
+        'heaviest': [{'module': name, 'self_ms': s / 1000, 'cumulative_ms': c / 1000}
+                     for name, s, c in sorted(rows, key=lambda r: r[1], reverse=True)[:top]],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark CLI startup time.')
+    parser.add_argument('--runs', type=int, default=10, help='Number of --help invocations to time')
+    parser.add_argument('--top', type=int, default=15, help='Number of modules in the import breakdown')
+    parser.add_argument('--json', dest='json_out', default=None, help='Write results to this JSON file')
+    parser.add_argument('--budget-ms', type=float, default=None, help='Fail if the median --help time exceeds this')
+    parser.add_argument('--baseline', default=None, help='JSON results of a previous run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed fractional growth in --help time')
+    args = parser.parse_args(argv)
+    result = measure(args.runs, args.top)
+    print(f'{"Module":<40}{"Self ms":>10}{"Cum. ms":>10}')
+    for row in result['heaviest']:
+        print(f'{row["module"]:<40}{row["self_ms"]:>10.1f}{row["cumulative_ms"]:>10.1f}')
+    print(f'import codex_autotest.daemon: {result["daemon_import_ms"]:.1f} ms')
+    print(f'import codex_autotest.cli: {result["import_ms"]:.1f} ms')
+    print(f'codex-autotest --help: {result["help_ms"]:.1f} ms median, {result["help_min_ms"]:.1f} ms min '
+          f'over {args.runs} run(s)')
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(result, indent=1))
+    failed = False
+    if args.budget_ms is not None and result['help_ms'] > args.budget_ms:
+        print(f'Regression: --help took {result["help_ms"]:.1f} ms, budget {args.budget_ms:.0f} ms', file=sys.stderr)
+        failed = True
+    if args.baseline:
+        old = json.loads(Path(args.baseline).read_text())
+        if result['help_ms'] > old['help_ms'] * (1 + args.tolerance):
+            print(f'Regression: --help took {result["help_ms"]:.1f} ms vs {old["help_ms"]:.1f} ms baseline',
+                  file=sys.stderr)
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Offline throughput benchmarks for the CLI commands.
+
+Runs generate-tests, docstring, audit-security and mutate against synthetic
+repositories served by the local mock server and reports wall time,
+requests/sec, peak RSS and a breakdown of time spent waiting on the API versus
+in the tool itself. Per-phase timings (discovery, parse, render, queue, api,
+write) come from each run's --metrics-out events.
+
+    python -m benchmarks.run_suite --sizes 10 1000 --json results.json
+    python -m benchmarks.run_suite --sizes 1000 --baseline results.json
+
+With --baseline the run fails if requests/sec of any command drops by more
+than --tolerance compared with the saved results.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from codex_autotest.mock_server import MockServer
+from .synth import make_repo
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+COMMANDS = {
+    'generate-tests': ['generate-tests', '--apply', '--jobs', '{jobs}'],
+    'audit-security': ['audit-security', '--jobs', '{jobs}'],
+    'docstring': ['docstring', '--apply'],
+    'mutate': ['mutate', '--jobs', '{jobs}'],
+}
+
+
+def _run_cli(args, cwd, env, metrics_out=None):
+    """Run the CLI in a child process; return (wall seconds, peak RSS in MB, exit status)."""
+    cmd = [sys.executable, '-m', 'codex_autotest.cli', '--no-cache']
+    if metrics_out:
+        cmd += ['--metrics-out', metrics_out]
+    cmd += args
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in kilobytes on Linux
+    return wall, usage.ru_maxrss / 1024, proc.returncode
+
+
+def _phases(metrics_out):
+    """Return {phase: seconds} from the final run event of a --metrics-out file."""
+    try:
+        lines = Path(metrics_out).read_text().splitlines()
+    except OSError:
+        return {}
+    for line in reversed(lines):
+        record = json.loads(line)
+        if record.get('event') == 'run':
+            return {name: p['seconds'] for name, p in record['phases'].items()}
+    return {}
+
+
+def run(sizes, commands, jobs=4, latency=0.0, error_rate=0.0, response_size=None, mutants=100):
+    """Run each command at each repository size and return a list of result dicts."""
+    results = []
+    env = dict(os.environ, OPENAI_API_KEY='mock')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get('PYTHONPATH')]))
+    with MockServer(latency=latency, error_rate=error_rate, response_size=response_size, seed=0) as server:
+        startup, _, _ = _run_cli(['--help'], REPO_ROOT, env)
+        for size in sizes:
+            with tempfile.TemporaryDirectory(prefix=f'bench-{size}-') as tmp:
+                bin_dir = make_repo(tmp, size, server.base_url, mutants=mutants)
+                run_env = dict(env, PATH=os.pathsep.join([str(bin_dir), env.get('PATH', '')]))
+                for name in commands:
+                    args = [a.format(jobs=jobs) for a in COMMANDS[name]]
+                    with server.lock:
+                        before = server.requests
+                        server.intervals = []
+                    metrics_out = os.path.join(tmp, f'{name}.metrics.jsonl')
+                    wall, rss, status = _run_cli(args, tmp, run_env, metrics_out)
+                    requests = server.requests - before
+                    api = min(server.busy_time(), wall)
+                    phases = {'startup': startup, 'api': api, 'tool': max(wall - api - startup, 0.0)}
+                    # Client-side phases; 'api' there sums request time across workers
+                    phases.update({f'cli.{k}': v for k, v in _phases(metrics_out).items()})
+                    results.append({
+                        'command': name,
+                        'files': size,
+                        'status': status,
+                        'wall': wall,
+                        'requests': requests,
+                        'rps': requests / wall if wall else 0.0,
+                        'peak_rss_mb': rss,
+                        'phases': phases,
+                    })
+    return results
+
+
+def print_table(results):
+    header = f'{"command":<16}{"files":>7}{"wall s":>9}{"reqs":>8}{"req/s":>9}{"rss MB":>8}{"startup":>9}{"api":>8}{"tool":>8}'
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        p = r['phases']
+        flag = '' if r['status'] == 0 else f'  (exit {r["status"]})'
+        print(f'{r["command"]:<16}{r["files"]:>7}{r["wall"]:>9.2f}{r["requests"]:>8}{r["rps"]:>9.1f}'
+              f'{r["peak_rss_mb"]:>8.1f}{p["startup"]:>9.2f}{p["api"]:>8.2f}{p["tool"]:>8.2f}{flag}')
+        cli = '  '.join(f'{k[4:]} {v:.2f}' for k, v in p.items() if k.startswith('cli.'))
+        if cli:
+            print(f'{"":<16}{cli}')
+
+
+def regressions(results, baseline, tolerance):
+    """Return messages for results whose requests/sec fell more than tolerance below baseline."""
+    previous = {(r['command'], r['files']): r for r in baseline}
+    found = []
+    for r in results:
+        old = previous.get((r['command'], r['files']))
+        if old and old['rps'] and r['rps'] < old['rps'] * (1 - tolerance):
+            found.append(f'{r["command"]} @ {r["files"]} files: {r["rps"]:.1f} req/s '
+                         f'vs {old["rps"]:.1f} req/s baseline')
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline CLI throughput benchmarks.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000], help='Repository sizes in files')
+    parser.add_argument('--commands', nargs='+', default=list(COMMANDS), choices=list(COMMANDS))
+    parser.add_argument('--jobs', type=int, default=4, help='--jobs passed to commands that support it')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mock server latency per request in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of mock requests that fail')
+    parser.add_argument('--response-size', type=int, default=None, help='Mock completion size in bytes')
+    parser.add_argument('--mutants', type=int, default=100, help='Surviving mutants reported by the fake mutmut')
+    parser.add_argument('--json', dest='json_out', default=None, help='Write results to this JSON file')
+    parser.add_argument('--baseline', default=None, help='JSON results of a previous run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed fractional drop in requests/sec')
+    args = parser.parse_args(argv)
+    results = run(args.sizes, args.commands, jobs=args.jobs, latency=args.latency,
+                  error_rate=args.error_rate, response_size=args.response_size, mutants=args.mutants)
+    print_table(results)
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=1))
+    if args.baseline:
+        found = regressions(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for message in found:
+            print(f'Regression: {message}', file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Synthetic repositories for the offline benchmark suite.
+"""
+import json
+import stat
+import sys
+from pathlib import Path
+import yaml
+from codex_autotest.config import DEFAULT_CONFIG
+
+MODULE_TEMPLATE = '''import os
+
+
+def documented_{i}(value):
+    """Return value doubled."""
+    return value * 2
+
+
+def undocumented_{i}(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return f.read()
+
+
+class Store{i}:
+    def __init__(self):
+        self.items = {{}}
+
+    def put(self, key, value):
+        self.items[key] = value
+        return len(self.items)
+'''
+
+# Stand-in for the mutmut CLI: every module gets one surviving mutant
+FAKE_MUTMUT = '''#!{python}
+import json, sys
+survivors = {survivors}
+if sys.argv[1:2] == ['run']:
+    sys.exit(0)
+if sys.argv[1:3] == ['results', '--json']:
+    print(json.dumps([{{'id': i, 'filename': f, 'status': 'survived'}} for i, f in enumerate(survivors, 1)]))
+    sys.exit(0)
+if sys.argv[1:2] == ['show']:
+    f = survivors[int(sys.argv[2]) - 1]
+    print(f'--- {{f}}\\n+++ {{f}}\\n@@ -2,1 +2,1 @@\\n-    return value * 2\\n+    return value * 3')
+    sys.exit(0)
+sys.exit(1)
+'''
+
+
+def make_repo(root, n_files, base_url, mutants=100):
+    """
+    Create a project under root with n_files Python modules, a config pointing
+    at base_url and a fake `mutmut` in root/bin. Returns the bin directory.
+    """
+    root = Path(root)
+    src = root / 'src'
+    files = []
+    for i in range(n_files):
+        # At most 100 modules per package keeps directories realistic
+        pkg = src / f'pkg{i // 100}'
+        pkg.mkdir(parents=True, exist_ok=True)
+        path = pkg / f'mod_{i}.py'
+        path.write_text(MODULE_TEMPLATE.format(i=i))
+        files.append(str(path.relative_to(root)))
+    (root / 'tests').mkdir(exist_ok=True)
+    config = dict(DEFAULT_CONFIG, src_path='src', http={'base_url': base_url})
+    (root / '.codex-autotest.yaml').write_text(yaml.dump(config))
+    bin_dir = root / 'bin'
+    bin_dir.mkdir(exist_ok=True)
+    mutmut = bin_dir / 'mutmut'
+    mutmut.write_text(FAKE_MUTMUT.format(python=sys.executable, survivors=json.dumps(files[:mutants])))
+    mutmut.chmod(mutmut.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return bin_dir
@@ -0,0 +1,39 @@
+"""
+Shared parsing of, and walk over the definitions of, Python modules.
+"""
+import ast
+from functools import lru_cache
+
+DEF_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+PARSE_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse(source):
+    """
+    Parse source into a module AST. Trees are cached by source text, so a file
+    parsed by several stages (or by several commands served by the daemon) is
+    parsed once while unchanged. The returned tree is shared: do not modify it.
+    """
+    return ast.parse(source)
+
+
+def iter_definitions(tree):
+    """
+    Yield (node, object_type) for top-level functions and classes and for the
+    methods defined directly inside those classes, in source order.
+    object_type is one of 'function', 'class' or 'method'.
+    """
+    for node in tree.body:
+        if isinstance(node, DEF_TYPES):
+            yield node, 'class' if isinstance(node, ast.ClassDef) else 'function'
+        if isinstance(node, ast.ClassDef):
+            for child in node.body:
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    yield child, 'method'
+
+
+def node_span(node):
+    """Return (first, last) source lines of node, including decorators."""
+    first = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', [])])
+    return first, getattr(node, 'end_lineno', node.lineno)
@@ -0,0 +1,117 @@
+"""
+Offline bulk jobs: batch-API request files for `--bulk-export` and their
+results for `--bulk-import`.
+
+An export renders every request a command would send into a JSON-lines file in
+the OpenAI Batch API input format, one `POST /v1/chat/completions` request per
+line. The custom_id of a request is its response-cache key (model, completion
+budget and prompt), so when a later run renders the same prompts from the same
+sources and settings it finds their answers in the results file by key alone.
+During an import, BulkResults.complete is installed as the response source of
+openai_client.chat_completion, so requests are answered from the results; a
+request without a successful result fails like an API error, and imported
+answers are stored in the response cache.
+"""
+import json
+from .cache import cache_key
+from .openai_client import DEFAULT_MODEL, get_cache
+from .tokens import DEFAULT_MAX_TOKENS, completion_budget, prompt_tokens
+
+BATCH_URL = '/v1/chat/completions'
+
+
+class BulkResultError(RuntimeError):
+    """A request has no successful result in the imported file."""
+
+
+def request(prompt, model=DEFAULT_MODEL, max_tokens=None):
+    """
+    Return the batch input record of one chat completion, sized as
+    chat_completion would size it (raises PromptTooLargeError likewise).
+    """
+    max_tokens = completion_budget(prompt_tokens(prompt, model), model, cap=max_tokens or DEFAULT_MAX_TOKENS)
+    return {
+        'custom_id': cache_key(model, max_tokens, prompt),
+        'method': 'POST',
+        'url': BATCH_URL,
+        'body': {'model': model, 'messages': [{'role': 'user', 'content': prompt}], 'max_tokens': max_tokens},
+    }
+
+
+class JobWriter:
+    """Write batch input records to a JSONL file, once per distinct request."""
+
+    def __init__(self, path):
+        self.path = path
+        self._out = open(path, 'w')
+        self._ids = set()
+
+    def add(self, prompt, model=DEFAULT_MODEL, max_tokens=None):
+        """Append the request for prompt; returns False if an identical one was already written."""
+        record = request(prompt, model, max_tokens)
+        if record['custom_id'] in self._ids:
+            return False
+        self._ids.add(record['custom_id'])
+        self._out.write(json.dumps(record) + '\n')
+        return True
+
+    @property
+    def written(self):
+        return len(self._ids)
+
+    def close(self):
+        self._out.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _failure(result):
+    """Return why a batch output record has no answer, or None if it succeeded."""
+    error = result.get('error')
+    if isinstance(error, dict):
+        return error.get('message') or json.dumps(error)
+    if error:
+        return str(error)
+    response = result.get('response') or {}
+    status = response.get('status_code')
+    if status != 200:
+        message = ((response.get('body') or {}).get('error') or {}).get('message', 'no response')
+        return f'HTTP {status}: {message}' if status else message
+    return None
+
+
+class BulkResults:
+    """The results of a batch run, keyed by custom_id."""
+
+    def __init__(self, path):
+        self.path = path
+        self.results = {}
+        with open(path) as f:
+            for n, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    result = json.loads(line)
+                    self.results[result['custom_id']] = result
+                except (ValueError, TypeError, KeyError):
+                    raise ValueError(f'{path}:{n}: not a batch result record') from None
+
+    def complete(self, prompt, model=DEFAULT_MODEL, max_tokens=None, **kwargs):
+        """Stand-in for chat_completion: return the imported answer to this request."""
+        record = request(prompt, model, max_tokens)
+        key = record['custom_id']
+        result = self.results.get(key)
+        if result is None:
+            raise BulkResultError(f'no result for request {key[:12]} in {self.path}')
+        failure = _failure(result)
+        if failure is not None:
+            raise BulkResultError(f'batch request {key[:12]} failed: {failure}')
+        content = result['response']['body']['choices'][0]['message']['content']
+        cache = get_cache()
+        if cache is not None:
+            cache.set(key, content, model=model, max_tokens=record['body']['max_tokens'])
+        return content
@@ -0,0 +1,136 @@
+"""
+Content-addressed on-disk cache for API responses.
+
+Entries live under `.codex-autotest/cache/<aa>/<key>.json`, where `key` is a
+SHA-256 digest of (model, max_tokens, prompt hash). Writes go to a temporary
+file in the same directory and are moved into place with os.replace, so
+concurrent processes only ever see complete entries.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+DEFAULT_CACHE_DIR = os.path.join('.codex-autotest', 'cache')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+
+
+def cache_key(model, max_tokens, prompt):
+    """Return the cache key for a request."""
+    prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    raw = json.dumps([model, max_tokens, prompt_hash])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """On-disk response cache with size- and age-based eviction."""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.writes = 0
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f'{key}.json')
+
+    def get(self, key):
+        """Return the cached content for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            if self.max_age and time.time() - os.path.getmtime(path) > self.max_age:
+                self._remove(path)
+                return None
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry.get('content')
+
+    def set(self, key, content, **meta):
+        """Atomically store content under key."""
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        entry = dict(meta, content=content, created=time.time())
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(tmp)
+            raise
+        self.writes += 1
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _entries(self):
+        """Yield (path, size, mtime) for every cache entry."""
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith('.json') or entry.name.startswith('.tmp-'):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, st.st_size, st.st_mtime
+
+    def stats(self):
+        """Return a dict with the number of entries, total size and age range."""
+        entries = list(self._entries())
+        mtimes = [m for _, _, m in entries]
+        return {
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'oldest': min(mtimes) if mtimes else None,
+            'newest': max(mtimes) if mtimes else None,
+        }
+
+    def prune(self, max_bytes=None, max_age=None):
+        """
+        Remove entries older than max_age seconds, then the oldest remaining
+        entries until the cache fits in max_bytes. Returns (removed, freed_bytes).
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_age = self.max_age if max_age is None else max_age
+        now = time.time()
+        removed = freed = 0
+        kept = []
+        for path, size, mtime in self._entries():
+            if max_age and now - mtime > max_age:
+                if self._remove(path):
+                    removed += 1
+                    freed += size
+            else:
+                kept.append((mtime, size, path))
+        total = sum(size for _, size, _ in kept)
+        if max_bytes and total > max_bytes:
+            for mtime, size, path in sorted(kept):
+                if total <= max_bytes:
+                    break
+                if self._remove(path):
+                    removed += 1
+                    freed += size
+                total -= size
+        return removed, freed
+
+    def clear(self):
+        """Remove every cache entry. Returns the number of entries removed."""
+        removed = 0
+        for path, _, _ in list(self._entries()):
+            if self._remove(path):
+                removed += 1
+        return removed
@@ -0,0 +1,214 @@
+"""
+Split large Python modules into per-function/per-class chunks and merge the
+per-chunk results back into a single test module or report.
+"""
+import ast
+import re
+from collections import namedtuple
+from .astwalk import DEF_TYPES, node_span, parse
+
+DEFAULT_CHUNK_LINES = 400
+# Top-level statements longer than this are left out of the shared context
+MAX_CONTEXT_STATEMENT_LINES = 3
+
+Chunk = namedtuple('Chunk', 'name start end code')
+_Unit = namedtuple('_Unit', 'name start end lines names')
+
+
+def _names(node):
+    """Return the identifiers referenced anywhere inside node."""
+    return {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}
+
+
+def _signature(node, lines):
+    """Return the decorator and header lines of a definition followed by an ellipsis body."""
+    first, _ = node_span(node)
+    body = node.body[0]
+    header = lines[first - 1:body.lineno - 1]
+    # The body can start on the header's last line, as in `def f(x: int) -> int: return x`;
+    # col_offset counts UTF-8 bytes
+    prefix = lines[body.lineno - 1].encode('utf-8')[:body.col_offset].decode('utf-8', 'replace').rstrip()
+    if prefix.strip():
+        header.append(prefix)
+    indent = ' ' * (node.col_offset + 4)
+    return header + [indent + '...']
+
+
+def _split_class(node, lines, max_lines):
+    """Split an oversized class into units of whole methods, each under the class header."""
+    first, _ = node_span(node)
+    header = lines[first - 1:node.body[0].lineno - 1] or [lines[node.lineno - 1]]
+    # Short class-level statements (attributes, nested aliases) stay with every unit
+    shared = []
+    methods = []
+    for child in node.body:
+        start, end = node_span(child)
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            methods.append((child, start, end))
+        elif end - start + 1 <= MAX_CONTEXT_STATEMENT_LINES:
+            shared.extend(lines[start - 1:end])
+    units = []
+    group = []
+    for child, start, end in methods:
+        size = sum(e - s + 1 for _, s, e in group)
+        if group and size + end - start + 1 > max_lines:
+            units.append(_class_unit(node, header + shared, group, lines))
+            group = []
+        group.append((child, start, end))
+    if group:
+        units.append(_class_unit(node, header + shared, group, lines))
+    return units
+
+
+def _class_unit(node, header, group, lines):
+    body = []
+    names = set()
+    for child, start, end in group:
+        body.extend(lines[start - 1:end])
+        names |= _names(child)
+    name = f'{node.name}.{group[0][0].name}'
+    if len(group) > 1:
+        name += f'..{group[-1][0].name}'
+    return _Unit(name, group[0][1], group[-1][2], header + body, names)
+
+
+def split_module(code, max_lines=DEFAULT_CHUNK_LINES):
+    """
+    Split a Python module into chunks of roughly max_lines lines made of whole
+    top-level functions and classes (oversized classes are split by method).
+    Each chunk carries the module's imports and short top-level statements plus
+    the signatures of other definitions it references as shared context.
+    Returns a single chunk holding the whole module when it is small enough or
+    cannot be parsed.
+    """
+    lines = code.splitlines()
+    whole = [Chunk('module', 1, len(lines), code)]
+    if not max_lines or len(lines) <= max_lines:
+        return whole
+    try:
+        tree = parse(code)
+    except SyntaxError:
+        return whole
+    context = []
+    signatures = {}
+    units = []
+    for node in tree.body:
+        start, end = node_span(node)
+        if isinstance(node, DEF_TYPES):
+            signatures[node.name] = _signature(node, lines)
+            if isinstance(node, ast.ClassDef) and end - start + 1 > max_lines:
+                units.extend(_split_class(node, lines, max_lines))
+            else:
+                units.append(_Unit(node.name, start, end, lines[start - 1:end], _names(node)))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)) or end - start + 1 <= MAX_CONTEXT_STATEMENT_LINES:
+            context.extend(lines[start - 1:end])
+    if not units:
+        return whole
+    # Pack consecutive units into chunks of at most max_lines source lines
+    groups = [[]]
+    for unit in units:
+        size = sum(len(u.lines) for u in groups[-1])
+        if groups[-1] and size + len(unit.lines) > max_lines:
+            groups.append([])
+        groups[-1].append(unit)
+    chunks = []
+    for group in groups:
+        defined = {u.name.split('.')[0] for u in group}
+        referenced = set().union(*(u.names for u in group))
+        sig_lines = []
+        for name, sig in signatures.items():
+            if name in referenced and name not in defined:
+                sig_lines.extend(sig)
+        parts = []
+        if context:
+            parts.append('\n'.join(context))
+        if sig_lines:
+            parts.append('# Signatures of other definitions in this module\n' + '\n'.join(sig_lines))
+        parts.append('\n\n'.join('\n'.join(u.lines) for u in group))
+        name = group[0].name if len(group) == 1 else f'{group[0].name}..{group[-1].name}'
+        chunks.append(Chunk(name, group[0].start, group[-1].end, '\n\n\n'.join(parts) + '\n'))
+    return chunks
+
+
+def _is_docstring(node):
+    return isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)
+
+
+def merge_test_modules(parts):
+    """
+    Merge generated test modules into one: a leading docstring is kept once,
+    leading imports are hoisted and de-duplicated, and the remaining bodies
+    are concatenated in order. A top-level function or class whose name is
+    already taken is dropped when its source is identical to the earlier one
+    (a shared fixture or helper), else renamed with the chunk's number.
+    """
+    if len(parts) == 1:
+        return parts[0]
+    docstring = None
+    imports = []
+    bodies = []
+    seen = {}
+    for n, part in enumerate(parts, 1):
+        part_lines = part.splitlines()
+        try:
+            tree = ast.parse(part)
+        except SyntaxError:
+            bodies.append(part.strip('\n'))
+            continue
+        nodes = list(tree.body)
+        body_start = 0
+        if nodes and _is_docstring(nodes[0]):
+            node = nodes.pop(0)
+            if docstring is None:
+                docstring = '\n'.join(part_lines[node.lineno - 1:node.end_lineno])
+            body_start = node.end_lineno
+        while nodes and isinstance(nodes[0], (ast.Import, ast.ImportFrom)):
+            node = nodes.pop(0)
+            stmt = '\n'.join(part_lines[node.lineno - 1:node.end_lineno])
+            if stmt not in imports:
+                imports.append(stmt)
+            body_start = node.end_lineno
+        edits = []
+        for node in nodes:
+            if not isinstance(node, DEF_TYPES):
+                continue
+            start, end = node_span(node)
+            source = '\n'.join(part_lines[start - 1:end])
+            if node.name not in seen:
+                seen[node.name] = source
+            elif seen[node.name] == source:
+                edits.append((start, end, node.lineno, None))
+            else:
+                name = f'{node.name}_{n}'
+                while name in seen:
+                    name += '_'
+                seen[name] = source
+                edits.append((start, end, node.lineno, name))
+        # Bottom-up, so earlier edits keep their line numbers
+        for start, end, lineno, name in reversed(edits):
+            if name is None:
+                del part_lines[start - 1:end]
+            else:
+                part_lines[lineno - 1] = re.sub(r'\b(def|class)(\s+)\w+', rf'\g<1>\g<2>{name}',
+                                                part_lines[lineno - 1], count=1)
+        body = '\n'.join(part_lines[body_start:]).strip('\n')
+        if body:
+            bodies.append(body)
+    # `from __future__` imports must come first
+    imports.sort(key=lambda stmt: not stmt.startswith('from __future__'))
+    merged = '\n\n\n'.join(bodies)
+    if imports:
+        merged = '\n'.join(imports) + '\n\n\n' + merged
+    if docstring is not None:
+        merged = docstring + '\n\n' + merged
+    return merged + '\n'
+
+
+def merge_reports(chunks, reports):
+    """Combine per-chunk audit reports under a heading naming each chunk's lines."""
+    if len(chunks) == 1:
+        return reports[0]
+    return '\n\n'.join(
+        f'### {chunk.name} (lines {chunk.start}-{chunk.end})\n\n{report.strip()}'
+        for chunk, report in zip(chunks, reports)
+    )
@@ -0,0 +1,5 @@
+"""
+CLI command implementations, one module per command (or command family).
+
+Modules are imported lazily by codex_autotest.cli.LazyGroup.
+"""
@@ -0,0 +1,215 @@
+"""
+`codex-autotest audit-security`.
+"""
+import click
+from string import Template
+from .. import cli, telemetry
+from ..chunking import DEFAULT_CHUNK_LINES, merge_reports, split_module
+from ..config import load_config
+from ..dispatch import imap_ordered
+from ..manifest import Manifest, fingerprint
+from ..openai_client import DEFAULT_MODEL, ensure_pool_size
+from .common import (LANG_TO_EXT, bulk_options, bulk_results, estimate_options, export_jobs, find_sources,
+                     git_scope, journal_options, journaled, print_dry_run, scope_options, start_journal,
+                     write_text)
+
+
+@click.command(name='audit-security')
+@click.option('--path', 'src_path', default=None, help='Source path to scan for security audit')
+@click.option('--language', default=None, help='Language override (e.g., python, javascript)')
+@click.option('--output', default='security_audit_report.md', help='Path to write the audit report')
+@click.option('--apply-fixes', is_flag=True, default=False, help='Apply suggested fixes to source files')
+@click.option('--incremental', is_flag=True, default=False, help='Reuse previous findings for files whose content and prompt are unchanged')
+@scope_options
+@click.option('--jobs', '-j', default=1, type=click.IntRange(min=1), help='Number of chunk requests to keep in flight concurrently')
+@click.option('--chunk-lines', 'chunk_lines', default=None, type=click.IntRange(min=0),
+              help='Split Python files longer than this into per-function/class requests (0 disables)')
+@estimate_options
+@journal_options
+@bulk_options
+def audit_security(src_path, language, output, apply_fixes, incremental=False, changed_since=None, staged_only=False,
+                   jobs=1, chunk_lines=None, dry_run=False, estimate=False, resume=False, retry_failed=False,
+                   bulk_export=None, bulk_import=None):
+    """Perform a security audit using OpenAI Codex and optionally apply fixes."""
+    # Load configuration unless path explicitly provided
+    if src_path:
+        config = {}
+    else:
+        try:
+            config = load_config()
+        except FileNotFoundError:
+            click.echo('Configuration not found. Please run "codex-autotest init" first.', err=True)
+            return
+    path = src_path or config.get('src_path')
+    if not path:
+        click.echo('Source path must be provided or defined in config.', err=True)
+        return
+    if bulk_export and bulk_import:
+        click.echo('Use either --bulk-export or --bulk-import, not both.', err=True)
+        return
+    if apply_fixes and (bulk_export or bulk_import):
+        # Fix prompts embed the audit results, so they cannot be rendered ahead of the audit
+        click.echo('--apply-fixes cannot be combined with --bulk-export or --bulk-import.', err=True)
+        return
+    lang = language or config.get('language', 'python')
+    # Determine file extension for scanning based on language
+    ext = LANG_TO_EXT.get(lang.lower(), '.py')
+    try:
+        scope = git_scope(changed_since, staged_only)
+    except RuntimeError as e:
+        click.echo(f'Error resolving git changes: {e}', err=True)
+        return
+    files = [f for f in find_sources(path, ext, config) if scope is None or f.resolve() in scope]
+    if not files:
+        click.echo(f'No {ext} files found under {path}.', err=True)
+        return
+    # Default audit prompt
+    default_prompt = (
+        'Audit the following {language} code for security vulnerabilities. '
+        'List each issue with line numbers, a description, and a suggested fix:\n\n'
+        '{code}'
+    )
+    prompts = config.get('prompts', {})
+    prompt_tpl = prompts.get('audit_security', default_prompt)
+    if chunk_lines is None:
+        chunk_lines = config.get('chunk_lines', DEFAULT_CHUNK_LINES)
+    manifest = Manifest() if incremental else None
+    prompt_id = fingerprint(prompt_tpl, lang, chunk_lines)
+    if dry_run or estimate or bulk_export:
+        planned = []
+        for f in files:
+            code = f.read_text()
+            if manifest is not None and manifest.is_current('audit-security', f, code, prompt_id, DEFAULT_MODEL):
+                continue
+            with telemetry.phase('parse'):
+                chunks = split_module(code, chunk_lines if ext == '.py' else 0)
+            chunk_prompts = _render_chunks(prompt_tpl, lang, f, chunks)
+            if chunk_prompts is not None:
+                planned.extend((f'{f}' + (f' [{c.name}]' if len(chunks) > 1 else ''), p)
+                               for c, p in zip(chunks, chunk_prompts))
+        if bulk_export:
+            export_jobs(((label, p, None) for label, p in planned), bulk_export)
+            return
+        print_dry_run(planned, estimate=estimate)
+        if apply_fixes:
+            click.echo('Fix requests depend on the audit results and are not included.')
+        return
+    # Sections are appended to the report, and fixes written, as each file
+    # completes; the journal records finished files so --resume can skip them
+    settings = fingerprint(path, lang, prompt_id, output, apply_fixes, changed_since, staged_only)
+    run = start_journal('audit-security', settings, files, resume, retry_failed)
+    if run is None:
+        return
+    journal, todo = run
+    _, items, _ = journal.read()
+    # Continue after the last finished section; retried files are appended at the end
+    offset = max([r.get('offset', 0) for r in items.values() if r.get('status') == 'done'] + [0])
+    try:
+        report = open(output, 'r+' if resume or retry_failed else 'w')
+        # Drop a section that was being written when the last run stopped
+        report.truncate(offset)
+        report.seek(offset)
+    except OSError as e:
+        click.echo(f'Error writing report to {output}: {e}', err=True)
+        journal.close()
+        return
+    ensure_pool_size(jobs)
+    skipped = 0
+
+    def _emit(f, text):
+        section = ('\n' if report.tell() else '') + '\n'.join([f'## File: {f}\n', text, '\n'])
+        with telemetry.phase('write'):
+            report.write(section)
+            report.flush()
+        telemetry.count('bytes_written', len(section.encode('utf-8')))
+
+    try:
+        with bulk_results(bulk_import), journaled(journal, note=f'the report so far is in {output}. '):
+            for f in todo:
+                code = f.read_text()
+                if manifest is not None and manifest.is_current('audit-security', f, code, prompt_id, DEFAULT_MODEL):
+                    # Unchanged since the last audit: carry the previous findings into the report
+                    _emit(f, manifest.get('audit-security', f)['artifact'] or '')
+                    journal.record(f, 'done', offset=report.tell())
+                    skipped += 1
+                    continue
+                # Large Python files are audited per function/class chunk
+                with telemetry.phase('parse'):
+                    chunks = split_module(code, chunk_lines if ext == '.py' else 0)
+                chunk_prompts = _render_chunks(prompt_tpl, lang, f, chunks)
+                if chunk_prompts is None:
+                    journal.record(f, 'failed', error='prompt')
+                    continue
+                # Invoke Codex for audit, one request per chunk
+                results = list(imap_ordered(cli.chat_completion, chunk_prompts, jobs))
+                error = next((e for _, _, e in results if e is not None), None)
+                if error is not None:
+                    click.echo(f'Error auditing {f}: {error}', err=True)
+                    journal.record(f, 'failed', error=str(error))
+                    continue
+                audits = [r for _, r, _ in results]
+                audit = merge_reports(chunks, audits)
+                _emit(f, audit)
+                # Files rewritten by --apply-fixes are re-audited on the next run
+                if manifest is not None and not apply_fixes:
+                    manifest.record('audit-security', f, code, prompt_id, DEFAULT_MODEL, artifact=audit)
+                fix_error = _apply_fixes(f, code, chunks, audits, audit, lang, jobs) if apply_fixes else None
+                journal.record(f, 'done', offset=report.tell(), fix_error=fix_error)
+    finally:
+        report.close()
+        if manifest is not None:
+            manifest.save()
+    if skipped:
+        click.echo(f'Reused findings for {skipped} unchanged file(s).')
+    if resume and len(todo) < len(files):
+        click.echo(f'Resumed after {len(files) - len(todo)} file(s) finished by the previous run.')
+    click.echo(f'Wrote security audit report to {output}')
+
+
+def _render_chunks(prompt_tpl, lang, f, chunks):
+    """Return the audit prompt of each chunk, or None if the template cannot be rendered."""
+    with telemetry.phase('render'):
+        if '$' in prompt_tpl:
+            return [Template(prompt_tpl).safe_substitute(language=lang, code=c.code) for c in chunks]
+        try:
+            return [prompt_tpl.format(language=lang, code=c.code) for c in chunks]
+        except Exception as e:
+            click.echo(f'Error formatting audit prompt for {f}: {e}', err=True)
+            return None
+
+
+def _apply_fixes(f, code, chunks, audits, audit, lang, jobs):
+    """Request and write the fixes for one audited file; returns an error message or None."""
+    # Ask for fixes
+    fix_prompt = (
+        'Apply the security fixes suggested below to the {language} code. '
+        'Return only the full updated code without commentary.\n\n'
+        'Issues:\n{audit}\n\n'
+        'Code:\n{code}'
+    )
+    # Chunked files are fixed per chunk and spliced back by line range
+    lines = code.splitlines()
+    if len(chunks) == 1:
+        segments = [(1, len(lines), code, audit)]
+    else:
+        segments = [(c.start, c.end, '\n'.join(lines[c.start - 1:c.end]), a) for c, a in zip(chunks, audits)]
+    fps = [fix_prompt.format(language=lang, audit=a, code=seg) for _, _, seg, a in segments]
+    results = list(imap_ordered(cli.chat_completion, fps, jobs))
+    error = next((e for _, _, e in results if e is not None), None)
+    if error is not None:
+        click.echo(f'Error generating fixes for {f}: {error}', err=True)
+        return str(error)
+    if len(segments) == 1:
+        new_code = results[0][1]
+    else:
+        new_lines = lines.copy()
+        for (start, end, _, _), (_, fixed, _) in reversed(list(zip(segments, results))):
+            new_lines[start - 1:end] = fixed.strip('\n').splitlines()
+        new_code = '\n'.join(new_lines) + '\n'
+    try:
+        write_text(f, new_code)
+        click.echo(f'Applied security fixes to {f}')
+    except Exception as e:
+        click.echo(f'Error writing fixes to {f}: {e}', err=True)
+        return str(e)
+    return None
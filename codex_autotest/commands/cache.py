@@ -0,0 +1,48 @@
+"""
+`codex-autotest cache stats|prune|clear`.
+"""
+import time
+import click
+from ..cache import ResponseCache
+from ..cli import cache_limits
+from ..config import load_config
+
+
+@click.group(name='cache')
+def cache_cmd():
+    """Inspect and manage the on-disk response cache."""
+    pass
+
+@cache_cmd.command(name='stats')
+def cache_stats():
+    """Show the number of cached responses and their total size."""
+    stats = ResponseCache().stats()
+    click.echo(f'Entries: {stats["entries"]}')
+    click.echo(f'Size: {stats["bytes"] / (1024 * 1024):.2f} MB')
+    if stats['entries']:
+        now = time.time()
+        click.echo(f'Oldest: {(now - stats["oldest"]) / 86400:.1f} days')
+        click.echo(f'Newest: {(now - stats["newest"]) / 86400:.1f} days')
+
+@cache_cmd.command(name='prune')
+@click.option('--max-size', 'max_size', default=None, type=float, help='Maximum cache size in MB')
+@click.option('--max-age', 'max_age', default=None, type=float, help='Maximum entry age in days')
+def cache_prune(max_size, max_age):
+    """Evict expired entries and the oldest entries above the size limit."""
+    try:
+        config = load_config()
+    except FileNotFoundError:
+        config = {}
+    max_bytes, max_age_s = cache_limits(config)
+    if max_size is not None:
+        max_bytes = int(max_size * 1024 * 1024)
+    if max_age is not None:
+        max_age_s = max_age * 24 * 3600
+    removed, freed = ResponseCache().prune(max_bytes=max_bytes, max_age=max_age_s)
+    click.echo(f'Removed {removed} cache entries ({freed / (1024 * 1024):.2f} MB).')
+
+@cache_cmd.command(name='clear')
+def cache_clear():
+    """Remove every cached response."""
+    removed = ResponseCache().clear()
+    click.echo(f'Removed {removed} cache entries.')
@@ -0,0 +1,119 @@
+"""
+`codex-autotest commit`: Conventional Commit messages for staged changes.
+"""
+import click
+from .. import cli, diffmap, docbatch, telemetry
+from ..config import DEFAULT_CONFIG, load_config
+from ..diffmap import DEFAULT_MAP_THRESHOLD, DEFAULT_PIECE_TOKENS, DEFAULT_REDUCE_PROMPT, DEFAULT_SUMMARY_PROMPT
+from ..dispatch import imap_ordered
+from ..openai_client import DEFAULT_MODEL, ensure_pool_size
+from ..tokens import count_tokens, prompt_tokens
+from .common import echo_stream, should_stream
+
+
+def _map_reduce_commit_prompt(diff, prompts, model, threshold, piece_tokens, jobs):
+    """
+    Summarise the pieces of a large diff concurrently and return the prompt
+    that reduces the summaries to one commit message. Summaries are folded
+    again while that prompt is larger than threshold tokens.
+    """
+    summary_tpl = prompts.get('commit_summary', DEFAULT_SUMMARY_PROMPT)
+    reduce_tpl = prompts.get('commit_reduce', DEFAULT_REDUCE_PROMPT)
+    count = lambda text: count_tokens(text, model)
+
+    def _summarise(text):
+        return cli.chat_completion(diffmap.render(summary_tpl, diff=text), model=model).strip()
+
+    with telemetry.phase('split'):
+        pieces = diffmap.split(diff, count, piece_tokens)
+    ensure_pool_size(jobs)
+    click.echo(f'Summarising {len(pieces)} piece(s) of the staged diff...', err=True)
+    summaries = []
+    for piece, summary, error in imap_ordered(lambda piece: _summarise(piece.text), pieces, jobs):
+        if error is not None:
+            raise error
+        summaries.append(f'{piece.path}:\n{summary}')
+    while len(summaries) > 1:
+        reduce_prompt = diffmap.render(reduce_tpl, summaries='\n\n'.join(summaries))
+        if prompt_tokens(reduce_prompt, model) <= threshold:
+            return reduce_prompt
+        groups = docbatch.pack(summaries, count, max_objects=len(summaries), max_tokens=piece_tokens)
+        if len(groups) >= len(summaries):
+            break
+        folded = []
+        for group, summary, error in imap_ordered(lambda group: _summarise('\n\n'.join(group)), groups, jobs):
+            if error is not None:
+                raise error
+            folded.append(summary)
+        summaries = folded
+    return diffmap.render(reduce_tpl, summaries='\n\n'.join(summaries))
+
+@click.command()
+@click.option('--staged', is_flag=True, default=False, help='Generate commit message for staged changes')
+@click.option('--model', default=None, help='OpenAI model to use for commit message')
+@click.option('--max-tokens', 'max_tokens', default=None, type=int, help='Maximum tokens for the commit message')
+@click.option('--stream/--no-stream', default=None, help='Print the message as it arrives (default: when stdout is a terminal)')
+@click.option('--map-reduce/--single-call', 'map_reduce', default=None,
+              help='Summarise the diff piecewise before writing the message (default: only for large diffs)')
+@click.option('--jobs', '-j', default=4, type=click.IntRange(min=1),
+              help='Number of piece summaries to request concurrently in map-reduce mode')
+def commit(staged, model, max_tokens, stream=None, map_reduce=None, jobs=4):
+    """Generate a conventional commit message using OpenAI Codex."""
+    if not staged:
+        click.echo('Please specify --staged to generate commit message for staged changes.', err=True)
+        return
+    import subprocess
+    run = subprocess.run(['git', 'diff', '--staged'], capture_output=True, text=True)
+    if run.returncode != 0:
+        click.echo(f'Error getting staged diff: {run.stderr}', err=True)
+        return
+    diff = run.stdout
+    if not diff.strip():
+        click.echo('No staged changes detected.', err=True)
+        return
+    try:
+        config = load_config()
+    except FileNotFoundError:
+        config = {}
+    prompts = config.get('prompts', {})
+    default_prompt = DEFAULT_CONFIG.get('prompts', {}).get('commit', '')
+    prompt_tpl = prompts.get('commit', default_prompt)
+    # Build prompt
+    if '$' in prompt_tpl:
+        from string import Template as _Tpl
+        prompt = _Tpl(prompt_tpl).safe_substitute(diff=diff)
+    else:
+        try:
+            prompt = prompt_tpl.format(diff=diff)
+        except Exception as e:
+            click.echo(f'Error formatting commit prompt: {e}', err=True)
+            return
+    # Large diffs are summarised per file/hunk first; small ones keep the single call
+    commit_config = config.get('commit') or {}
+    threshold = commit_config.get('map_threshold', DEFAULT_MAP_THRESHOLD)
+    if map_reduce is None:
+        map_reduce = prompt_tokens(prompt, model or DEFAULT_MODEL) > threshold
+    if map_reduce:
+        try:
+            prompt = _map_reduce_commit_prompt(diff, prompts, model or DEFAULT_MODEL, threshold,
+                                               commit_config.get('piece_tokens', DEFAULT_PIECE_TOKENS), jobs)
+        except Exception as e:
+            click.echo(f'Error summarising staged diff: {e}', err=True)
+            return
+    kwargs = {}
+    if model:
+        kwargs['model'] = model
+    if max_tokens:
+        kwargs['max_tokens'] = max_tokens
+    if should_stream(stream):
+        try:
+            echo_stream(prompt, **kwargs)
+        except Exception as e:
+            click.echo(f'Error generating commit message: {e}', err=True)
+        return
+    try:
+        msg = cli.chat_completion(prompt, **kwargs)
+    except Exception as e:
+        click.echo(f'Error generating commit message: {e}', err=True)
+        return
+    click.echo(msg)
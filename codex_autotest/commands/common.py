@@ -0,0 +1,209 @@
+"""
+Helpers and option sets shared by the command modules.
+"""
+import sys
+import click
+from contextlib import contextmanager
+from pathlib import Path
+from .. import cli, telemetry
+from ..bulk import BulkResults, JobWriter
+from ..config import optional_config
+from ..discovery import discover
+from ..gitscope import changed_lines
+from ..journal import RunJournal
+from ..openai_client import DEFAULT_MODEL, configure_responses
+from ..tokens import PromptTooLargeError, completion_budget, context_window, estimate_cost, prompt_tokens
+
+# Map file extensions to languages and vice versa
+EXT_TO_LANG = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.java': 'java',
+    '.go': 'go',
+    '.rb': 'ruby',
+}
+LANG_TO_EXT = {lang: ext for ext, lang in EXT_TO_LANG.items()}
+
+def scope_options(f):
+    """Add the shared --changed-since/--staged options to a path-scanning command."""
+    f = click.option('--staged', 'staged_only', is_flag=True, default=False,
+                     help='Only process files with staged changes')(f)
+    f = click.option('--changed-since', 'changed_since', default=None, metavar='REF',
+                     help='Only process files changed since the given git ref')(f)
+    return f
+
+def git_scope(changed_since, staged_only):
+    """Return {resolved path: touched line ranges}, or None when no git scope was requested."""
+    if not (changed_since or staged_only):
+        return None
+    return changed_lines(ref=changed_since, staged=staged_only)
+
+def estimate_options(f):
+    """Add the shared --dry-run/--estimate options to a request-issuing command."""
+    f = click.option('--estimate', is_flag=True, default=False,
+                     help='Print only total tokens and projected cost without calling the API (implies --dry-run)')(f)
+    f = click.option('--dry-run', 'dry_run', is_flag=True, default=False,
+                     help='Render prompts and report token budgets without calling the API')(f)
+    return f
+
+def print_dry_run(requests, model=DEFAULT_MODEL, estimate=False):
+    """Print the token budget of each (label, prompt) request and the projected cost of the run."""
+    count = oversized = total_prompt = total_completion = 0
+    for label, prompt in requests:
+        n_prompt = prompt_tokens(prompt, model)
+        try:
+            n_completion = completion_budget(n_prompt, model)
+        except PromptTooLargeError as e:
+            click.echo(f'{label}: {e}', err=True)
+            oversized += 1
+            continue
+        count += 1
+        total_prompt += n_prompt
+        total_completion += n_completion
+        if not estimate:
+            click.echo(f'{label}: {n_prompt} prompt tokens, up to {n_completion} completion tokens')
+    click.echo(f'Requests: {count} ({model}, {context_window(model)}-token context)')
+    click.echo(f'Prompt tokens: {total_prompt}')
+    click.echo(f'Completion tokens (max): {total_completion}')
+    if oversized:
+        click.echo(f'Oversized prompts: {oversized}', err=True)
+    cost = estimate_cost(total_prompt, total_completion, model)
+    if cost is None:
+        click.echo(f'Projected cost: unknown (no pricing for {model})')
+    else:
+        click.echo(f'Projected cost: up to ${cost:.4f} '
+                   f'(prompt ${estimate_cost(total_prompt, 0, model):.4f})')
+
+
+def bulk_options(f):
+    """Add the shared --bulk-export/--bulk-import options to a request-issuing command."""
+    f = click.option('--bulk-import', 'bulk_import', default=None, metavar='RESULTS',
+                     type=click.Path(exists=True, dir_okay=False),
+                     help='Answer requests from a batch results file instead of the API')(f)
+    f = click.option('--bulk-export', 'bulk_export', default=None, metavar='JOBS',
+                     type=click.Path(dir_okay=False, writable=True),
+                     help='Write every request to a batch-API jobs file instead of calling the API')(f)
+    return f
+
+def export_jobs(requests, path, model=DEFAULT_MODEL):
+    """Write each (label, prompt, max_tokens) request to the batch jobs file at path and report the count."""
+    oversized = 0
+    with JobWriter(path) as jobs:
+        for label, prompt, max_tokens in requests:
+            try:
+                jobs.add(prompt, model, max_tokens)
+            except PromptTooLargeError as e:
+                click.echo(f'{label}: {e}', err=True)
+                oversized += 1
+    click.echo(f'Wrote {jobs.written} request(s) to {path}')
+    if oversized:
+        click.echo(f'Oversized prompts: {oversized}', err=True)
+
+@contextmanager
+def bulk_results(path):
+    """Answer the chat completion requests of the block from a --bulk-import results file (if path is set)."""
+    if path is None:
+        yield None
+        return
+    try:
+        results = BulkResults(path)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--bulk-import')
+    configure_responses(results.complete)
+    try:
+        yield results
+    finally:
+        configure_responses(None)
+
+
+def write_text(path, text):
+    """Write text to path, recording the time and bytes for --profile/--metrics-out."""
+    with telemetry.phase('write'):
+        Path(path).write_text(text)
+    if telemetry.get() is not None:
+        size = len(text.encode('utf-8'))
+        telemetry.count('bytes_written', size)
+        telemetry.event('write', path=str(path), bytes=size)
+
+def find_sources(path, ext, config):
+    """Return the source files under path, applying the `discovery` settings from config or the config file."""
+    if not config:
+        config = optional_config()
+    with telemetry.phase('discovery'):
+        return discover(path, ext, config)
+
+
+def should_stream(stream):
+    """Stream when asked to, or by default when stdout is an interactive terminal."""
+    if stream is not None:
+        return stream
+    return sys.stdout.isatty()
+
+def echo_stream(prompt, **kwargs):
+    """
+    Print a completion as its deltas arrive. Ctrl-C cancels the request and
+    exits with status 130; errors after partial output start on a new line.
+    """
+    deltas = cli.stream_completion(prompt, **kwargs)
+    printed = False
+    try:
+        for delta in deltas:
+            click.echo(delta, nl=False)
+            printed = True
+    except KeyboardInterrupt:
+        deltas.close()
+        click.echo('\nCancelled.', err=True)
+        sys.exit(130)
+    except Exception:
+        if printed:
+            click.echo()
+        raise
+    click.echo()
+
+def journal_options(f):
+    """Add the shared --resume/--retry-failed options to a batch command."""
+    f = click.option('--retry-failed', 'retry_failed', is_flag=True, default=False,
+                     help='Only reprocess the files that failed in the last run with the same settings')(f)
+    f = click.option('--resume', is_flag=True, default=False,
+                     help='Continue the last interrupted run with the same settings, skipping finished files')(f)
+    return f
+
+def start_journal(command, settings, files, resume=False, retry_failed=False):
+    """
+    Open the run journal of a batch command and select the files to process:
+    all of them for a new run, the unfinished ones with resume, or the failed
+    ones with retry_failed. Returns (journal, files), or None after reporting
+    that there is nothing to resume or retry.
+    """
+    journal = RunJournal(command)
+    if resume:
+        items = journal.resumable(settings)
+        if items is None:
+            click.echo(f'No interrupted {command} run with these settings to resume.', err=True)
+            return None
+        files = [f for f in files if items.get(str(f), {}).get('status') != 'done']
+    elif retry_failed:
+        failed = journal.failed(settings)
+        if not failed:
+            click.echo(f'No failed files to retry from the last {command} run with these settings.', err=True)
+            return None
+        failed = set(failed)
+        files = [f for f in files if str(f) in failed]
+    journal.start(settings, resume=resume or retry_failed,
+                  params=click.get_current_context().params, pending=files)
+    return journal, files
+
+@contextmanager
+def journaled(journal, note=''):
+    """Finish the journal when the block completes; on Ctrl-C, point at --resume and exit 130."""
+    try:
+        yield journal
+        journal.finish()
+    except KeyboardInterrupt:
+        click.echo(f'\nInterrupted; {note}Run again with --resume to continue.', err=True)
+        sys.exit(130)
+    finally:
+        journal.close()
+    if journal.failures:
+        click.echo(f'{journal.failures} file(s) failed; run "codex-autotest retry-failed" to retry them.', err=True)
@@ -0,0 +1,271 @@
+"""
+`codex-autotest docstring`: docstring generation for Python modules.
+"""
+import difflib
+import click
+from pathlib import Path
+from string import Template
+from .. import cli, docbatch, telemetry
+from ..config import DEFAULT_CONFIG, load_config
+from ..docbatch import DEFAULT_BATCH_PROMPT, DEFAULT_BATCH_SIZE, DEFAULT_BATCH_TOKENS
+from ..docplan import apply as apply_docstrings, iter_plans
+from ..gitscope import overlaps
+from ..manifest import Manifest, fingerprint
+from ..openai_client import DEFAULT_MODEL
+from ..symindex import SymbolIndex
+from ..tokens import count_tokens
+from .common import (bulk_options, bulk_results, export_jobs, find_sources, git_scope, journal_options, journaled,
+                     scope_options, start_journal, write_text)
+
+
+def _single_prompt(f, prompt_tpl, obj_type, snippet):
+    """Render the docstring prompt for one object, or return None if the template cannot be rendered."""
+    with telemetry.phase('render'):
+        if '$' in prompt_tpl:
+            return Template(prompt_tpl).safe_substitute(language='python', object_type=obj_type, code=snippet)
+        try:
+            return prompt_tpl.format(language='python', object_type=obj_type, code=snippet)
+        except Exception as e:
+            click.echo(f'Error formatting prompt for {f}: {e}', err=True)
+            return None
+
+def _single_docstring(f, prompt_tpl, obj_type, snippet):
+    """Request the docstring for one object; returns the quoted docstring or None on error."""
+    prompt = _single_prompt(f, prompt_tpl, obj_type, snippet)
+    if prompt is None:
+        return None
+    # Generate docstring
+    try:
+        doc = cli.chat_completion(prompt)
+    except Exception as e:
+        click.echo(f'Error generating docstring for {f}: {e}', err=True)
+        return None
+    doc = doc.strip()
+    if not (doc.startswith('"""') and doc.endswith('"""')):
+        doc = f'"""{doc}"""'
+    return doc
+
+def _batch_prompts(f, lines, insertions, batch_tpl, batch_size, batch_tokens):
+    """
+    Yield (keyed entries, prompt, max_tokens) for each batched request of a
+    file's insertions; objects packed alone are left to single-object requests.
+    """
+    entries = []
+    for ins in sorted(insertions, key=lambda i: i.line):
+        code = '\n'.join(lines[ins.start - 1:ins.end])
+        entries.append((ins, ins.obj_type, ins.name, ins.start, code))
+    batches = docbatch.pack(entries, lambda e: count_tokens(e[4], DEFAULT_MODEL), batch_size, batch_tokens)
+    for group in batches:
+        if len(group) == 1:
+            continue
+        keyed = {f'D{i}': entry for i, entry in enumerate(group, 1)}
+        with telemetry.phase('render'):
+            try:
+                prompt = docbatch.render(batch_tpl, 'python', [(k,) + e[1:] for k, e in keyed.items()])
+            except Exception as e:
+                click.echo(f'Error formatting batch prompt for {f}: {e}', err=True)
+                continue
+        yield keyed, prompt, len(group) * docbatch.COMPLETION_TOKENS_PER_OBJECT
+
+def _batch_docstrings(f, lines, insertions, batch_tpl, batch_size, batch_tokens):
+    """
+    Request docstrings for a file's insertions in batches. Returns
+    {insertion: docstring text} for the objects whose answers parsed;
+    the rest are left to single-object requests.
+    """
+    docs = {}
+    for keyed, prompt, max_tokens in _batch_prompts(f, lines, insertions, batch_tpl, batch_size, batch_tokens):
+        try:
+            reply = cli.chat_completion(prompt, max_tokens=max_tokens)
+        except Exception as e:
+            click.echo(f'Error generating docstrings for {f}: {e}', err=True)
+            continue
+        parsed = docbatch.parse(reply, list(keyed))
+        for key, doc in parsed.items():
+            docs[keyed[key][0]] = doc
+        if len(parsed) < len(keyed):
+            click.echo(f'{len(keyed) - len(parsed)} docstring(s) in a batch for {f} did not parse; '
+                       'requesting them individually.', err=True)
+    return docs
+
+def _bulk_requests(plans, prompt_tpl, batch_tpl, batch, batch_size, batch_tokens, manifest=None, prompt_id=None):
+    """Yield (label, prompt, max_tokens) for each request a run over plans would send."""
+    for plan in plans:
+        f = Path(plan.path)
+        if plan.error is not None:
+            click.echo(f'SyntaxError parsing {f}: {plan.error}', err=True)
+            continue
+        if not plan.insertions or (manifest is not None and
+                                   manifest.is_current('docstring', f, plan.content, prompt_id, DEFAULT_MODEL)):
+            continue
+        lines = plan.content.splitlines()
+        batched = set()
+        if batch:
+            for keyed, prompt, max_tokens in _batch_prompts(f, lines, plan.insertions, batch_tpl, batch_size,
+                                                            batch_tokens):
+                batched.update(entry[0] for entry in keyed.values())
+                yield f'{f} [{len(keyed)} objects]', prompt, max_tokens
+        for ins in plan.insertions:
+            if ins not in batched:
+                prompt = _single_prompt(f, prompt_tpl, ins.obj_type, '\n'.join(lines[ins.start - 1:ins.end]))
+                if prompt is not None:
+                    yield f'{f} [{ins.name}]', prompt, None
+
+def _indexed(plans, index):
+    """Yield plans, storing the symbol index entries the workers built for stale files."""
+    for plan in plans:
+        if plan.entry is not None:
+            index.put(plan.path, plan.entry)
+        yield plan
+    telemetry.count('index_parsed', index.parsed)
+
+def _needs_docstrings(entry, touched=None):
+    """Return True unless the index entry shows no undocumented definition (within the touched lines)."""
+    if entry is None or entry['error']:
+        return True
+    return any(not s['docstring'] and s['body'] is not None
+               and (touched is None or overlaps(touched, s['start'], s['end']))
+               for s in entry['symbols'])
+
+@click.command()
+@click.option('--path', 'src_path', default=None, help='Source path to scan for Python files')
+@click.option('--apply', 'apply_changes', is_flag=True, default=False, help='Apply changes to files')
+@click.option('--incremental', is_flag=True, default=False, help='Skip files whose content and prompt are unchanged since the last run')
+@scope_options
+@click.option('--touched-only', is_flag=True, default=False, help='With --changed-since/--staged, only document objects whose lines changed')
+@click.option('--batch', is_flag=True, default=False, help='Document many objects per request')
+@click.option('--batch-size', 'batch_size', default=None, type=click.IntRange(min=1),
+              help=f'Maximum objects per batched request (default {DEFAULT_BATCH_SIZE})')
+@click.option('--batch-tokens', 'batch_tokens', default=None, type=click.IntRange(min=1),
+              help=f'Maximum source tokens per batched request (default {DEFAULT_BATCH_TOKENS})')
+@click.option('--workers', default=None, type=click.IntRange(min=1),
+              help='Processes that parse and analyse files ahead of the requests (default 1: in-process)')
+@journal_options
+@bulk_options
+def docstring(src_path, apply_changes, incremental=False, changed_since=None, staged_only=False, touched_only=False,
+              batch=False, batch_size=None, batch_tokens=None, workers=None, resume=False, retry_failed=False,
+              bulk_export=None, bulk_import=None):
+    """Generate or preview docstring insertions for functions, classes, and methods."""
+    # Load config only if no explicit path provided
+    if src_path:
+        config = {}
+    else:
+        try:
+            config = load_config()
+        except FileNotFoundError:
+            click.echo('Configuration not found. Please run "codex-autotest init" first.', err=True)
+            return
+    path = src_path or config.get('src_path')
+    if not path:
+        click.echo('Source path must be provided or defined in config.', err=True)
+        return
+    if bulk_export and bulk_import:
+        click.echo('Use either --bulk-export or --bulk-import, not both.', err=True)
+        return
+    try:
+        scope = git_scope(changed_since, staged_only)
+    except RuntimeError as e:
+        click.echo(f'Error resolving git changes: {e}', err=True)
+        return
+    files = [f for f in find_sources(path, '.py', config) if scope is None or f.resolve() in scope]
+    # Load user-configured docstring prompt or use default
+    prompts = config.get('prompts', {})
+    default_tpl = DEFAULT_CONFIG['prompts'].get('docstring', '')
+    prompt_tpl = prompts.get('docstring', default_tpl)
+    batch_tpl = prompts.get('docstring_batch', DEFAULT_BATCH_PROMPT)
+    batch_config = config.get('docstring') or {}
+    if batch_size is None:
+        batch_size = batch_config.get('batch_size', DEFAULT_BATCH_SIZE)
+    if batch_tokens is None:
+        batch_tokens = batch_config.get('batch_tokens', DEFAULT_BATCH_TOKENS)
+    if workers is None:
+        workers = batch_config.get('workers', 1)
+    manifest = Manifest() if incremental else None
+    prompt_id = fingerprint(prompt_tpl, 'python', batch and batch_tpl)
+    error_files = False
+    skipped = 0
+    index = SymbolIndex()
+    touched = {f: scope[f.resolve()] for f in files} if scope is not None and touched_only else {}
+    # Up-to-date entries are checked by mtime and size alone; stale ones are
+    # rebuilt by the analysis workers from the parse they do anyway
+    with telemetry.phase('index'):
+        entries = {f: index.current(f) for f in files}
+    stale = [f for f, entry in entries.items() if entry is None]
+    if bulk_export:
+        todo = [f for f in files if _needs_docstrings(entries[f], touched.get(f))]
+        plans = _indexed(iter_plans(todo, touched, workers, stale), index)
+        export_jobs(_bulk_requests(plans, prompt_tpl, batch_tpl, batch, batch_size, batch_tokens, manifest,
+                                   prompt_id), bulk_export)
+        index.save()
+        return
+    settings = fingerprint(path, prompt_id, apply_changes, changed_since, staged_only, touched_only,
+                           batch_size, batch_tokens)
+    run = start_journal('docstring', settings, files, resume, retry_failed)
+    if run is None:
+        return
+    journal, files = run
+    # Files whose indexed definitions all have docstrings are neither read nor parsed
+    todo = [f for f in files if _needs_docstrings(entries[f], touched.get(f))]
+    with bulk_results(bulk_import), journaled(journal):
+        pending = set(todo)
+        for f in files:
+            if f not in pending:
+                journal.record(f, 'done')
+        # Parsing and analysis run ahead in worker processes while this loop issues requests
+        plans = _indexed(iter_plans(todo, touched, workers, stale), index)
+        while True:
+            # Time spent waiting for the next file's analysis
+            with telemetry.phase('parse'):
+                plan = next(plans, None)
+            if plan is None:
+                break
+            f = Path(plan.path)
+            content = plan.content
+            if manifest is not None and manifest.is_current('docstring', f, content, prompt_id, DEFAULT_MODEL):
+                skipped += 1
+                journal.record(f, 'done', skipped=True)
+                continue
+            if plan.error is not None:
+                click.echo(f'SyntaxError parsing {f}: {plan.error}', err=True)
+                error_files = True
+                journal.record(f, 'failed', error='syntax')
+                continue
+            if not plan.insertions:
+                # Nothing to document; remember so unchanged files are not re-parsed
+                if manifest is not None:
+                    manifest.record('docstring', f, content, prompt_id, DEFAULT_MODEL, artifact=str(f))
+                journal.record(f, 'done')
+                continue
+            lines = content.splitlines()
+            batched = _batch_docstrings(f, lines, plan.insertions, batch_tpl, batch_size, batch_tokens) if batch else {}
+            docs = {}
+            for ins in plan.insertions:
+                if ins in batched:
+                    docs[ins] = f'"""{batched[ins]}"""'
+                else:
+                    # Extract code snippet for context
+                    snippet = '\n'.join(lines[ins.start - 1:ins.end])
+                    doc = _single_docstring(f, prompt_tpl, ins.obj_type, snippet)
+                    if doc is not None:
+                        docs[ins] = doc
+            complete = len(docs) == len(plan.insertions)
+            new_lines = apply_docstrings(lines, plan.insertions, docs)
+            result = '\n'.join(new_lines) + '\n'
+            if apply_changes:
+                write_text(f, result)
+                click.echo(f'Applied docstrings to {f}')
+                if manifest is not None and complete:
+                    manifest.record('docstring', f, result, prompt_id, DEFAULT_MODEL, artifact=str(f))
+            else:
+                diff = difflib.unified_diff(lines, new_lines, fromfile=str(f), tofile=str(f), lineterm='')
+                for d in diff:
+                    click.echo(d)
+            # Objects whose docstring request failed are requested again on retry
+            journal.record(f, 'done' if complete else 'failed', error=None if complete else 'incomplete')
+    index.save()
+    if manifest is not None:
+        manifest.save()
+    if skipped:
+        click.echo(f'Skipped {skipped} unchanged file(s).')
+    if error_files:
+        return
@@ -0,0 +1,96 @@
+"""
+`codex-autotest explain`.
+"""
+import re
+import click
+from pathlib import Path
+from string import Template
+from .. import cli
+from ..config import DEFAULT_CONFIG, load_config
+from ..symindex import SymbolIndex
+from .common import EXT_TO_LANG, echo_stream, should_stream
+
+
+@click.command()
+@click.argument('target')
+@click.option('--language', default=None, help='Language override for code explanation')
+@click.option('--model', default=None, help='OpenAI model to use for explanation')
+@click.option('--max-tokens', 'max_tokens', default=None, type=int, help='Maximum tokens for the explanation')
+@click.option('--stream/--no-stream', default=None, help='Print the explanation as it arrives (default: when stdout is a terminal)')
+def explain(target, language, model, max_tokens, stream=None):
+    """Explain what the given code snippet or file does using OpenAI Codex."""
+    path_str = target
+    start = end = None
+    name = None
+    if ':' in target:
+        path_str, rng = target.split(':', 1)
+        if re.fullmatch(r'[A-Za-z_][\w.]*', rng):
+            # A function, class or Class.method name, resolved through the symbol index
+            name = rng
+        elif '-' in rng:
+            s, e = rng.split('-', 1)
+            try:
+                start, end = int(s), int(e)
+            except ValueError:
+                click.echo(f'Invalid range spec "{rng}"; use start-end', err=True)
+                return
+        else:
+            click.echo(f'Invalid range spec "{rng}"; use start-end or a name', err=True)
+            return
+    path = Path(path_str)
+    if not path.exists():
+        click.echo(f'File not found: {path_str}', err=True)
+        return
+    if name is not None:
+        index = SymbolIndex()
+        symbol = index.lookup(path, name)
+        index.save()
+        if symbol is None:
+            click.echo(f'No function or class named {name} in {path_str}', err=True)
+            return
+        start, end = symbol['start'], symbol['end']
+    content = path.read_text()
+    if start is not None and end is not None:
+        lines = content.splitlines()
+        if start < 1 or end > len(lines) or start > end:
+            click.echo(f'Invalid line range {start}-{end} for file with {len(lines)} lines', err=True)
+            return
+        snippet = '\n'.join(lines[start-1:end])
+    else:
+        snippet = content
+    # Determine language from file extension or override
+    ext = path.suffix.lower()
+    lang = language or EXT_TO_LANG.get(ext)
+    if not lang:
+        click.echo(f'Could not infer language from extension "{ext}"; specify --language', err=True)
+        return
+    # Load user-configured prompt template or use default
+    try:
+        cfg = load_config()
+    except FileNotFoundError:
+        cfg = {}
+    prompts = cfg.get('prompts', {})
+    default_tpl = DEFAULT_CONFIG['prompts'].get('explain', '')
+    prompt_tpl = prompts.get('explain', default_tpl)
+    # Render the prompt
+    if '$' in prompt_tpl:
+        prompt = Template(prompt_tpl).safe_substitute(language=lang, code=snippet)
+    else:
+        prompt = prompt_tpl.format(language=lang, code=snippet)
+    kwargs = {}
+    if model:
+        kwargs['model'] = model
+    if max_tokens:
+        kwargs['max_tokens'] = max_tokens
+    if should_stream(stream):
+        try:
+            echo_stream(prompt, **kwargs)
+        except Exception as e:
+            click.echo(f'Error generating explanation: {e}', err=True)
+        return
+    try:
+        explanation = cli.chat_completion(prompt, **kwargs)
+    except Exception as e:
+        click.echo(f'Error generating explanation: {e}', err=True)
+        return
+    click.echo(explanation)
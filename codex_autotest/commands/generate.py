@@ -0,0 +1,183 @@
+"""
+`codex-autotest generate-tests` and the deprecated `generate` alias.
+"""
+import difflib
+import click
+from pathlib import Path
+from string import Template
+from .. import cli, telemetry
+from ..chunking import DEFAULT_CHUNK_LINES, merge_test_modules, split_module
+from ..config import DEFAULT_CONFIG, load_config
+from ..dispatch import imap_ordered
+from ..manifest import Manifest, fingerprint
+from ..openai_client import DEFAULT_MODEL, ensure_pool_size
+from .common import (LANG_TO_EXT, bulk_options, bulk_results, estimate_options, export_jobs, find_sources,
+                     git_scope, journal_options, journaled, print_dry_run, scope_options, start_journal,
+                     write_text)
+
+
+@click.command(name='generate-tests')
+@click.option('--path', 'src_path', default=None, help='Source path to scan for files')
+@click.option('--language', default=None, help='Language override')
+@click.option('--framework', default=None, help='Framework override')
+@click.option('--apply', 'apply_changes', is_flag=True, default=False, help='Apply generated tests instead of showing diff')
+@click.option('--jobs', '-j', default=1, type=click.IntRange(min=1), help='Number of requests to keep in flight concurrently')
+@click.option('--incremental', is_flag=True, default=False, help='Skip files whose content and prompt are unchanged since the last run')
+@scope_options
+@click.option('--chunk-lines', 'chunk_lines', default=None, type=click.IntRange(min=0),
+              help='Split Python files longer than this into per-function/class requests (0 disables)')
+@estimate_options
+@journal_options
+@bulk_options
+def generate_tests(src_path, language, framework, apply_changes, jobs=1, incremental=False,
+                   changed_since=None, staged_only=False, chunk_lines=None, dry_run=False, estimate=False,
+                   resume=False, retry_failed=False, bulk_export=None, bulk_import=None):
+    """Generate or preview test files for source code functions and classes."""
+    # Load configuration unless path explicitly provided
+    if src_path:
+        config = {}
+    else:
+        try:
+            config = load_config()
+        except FileNotFoundError:
+            click.echo('Configuration not found. Please run "codex-autotest init" first.', err=True)
+            return
+    path = src_path or config.get('src_path')
+    if not path:
+        click.echo('Source path must be provided or defined in config.', err=True)
+        return
+    if bulk_export and bulk_import:
+        click.echo('Use either --bulk-export or --bulk-import, not both.', err=True)
+        return
+    lang = language or config.get('language', 'python')
+    fw = framework or config.get('framework', '')
+    prompts = config.get('prompts', {})
+    default_prompt = DEFAULT_CONFIG['prompts'].get('unit_test', '')
+    prompt_tpl = prompts.get('unit_test', default_prompt)
+    use_str_template = '$' in prompt_tpl
+    if use_str_template:
+        str_tpl = Template(prompt_tpl)
+    # Determine file extension for tests based on language
+    ext = LANG_TO_EXT.get(lang.lower(), '.py')
+    try:
+        scope = git_scope(changed_since, staged_only)
+    except RuntimeError as e:
+        click.echo(f'Error resolving git changes: {e}', err=True)
+        return
+    path_obj = Path(path)
+    files = [f for f in find_sources(path, ext, config)
+             if f.name != '__init__.py' and (scope is None or f.resolve() in scope)]
+    if chunk_lines is None:
+        chunk_lines = config.get('chunk_lines', DEFAULT_CHUNK_LINES)
+    manifest = Manifest() if incremental else None
+    prompt_id = fingerprint(prompt_tpl, lang, fw, chunk_lines)
+
+    def _test_file(f):
+        rel_path = f.relative_to(path_obj)
+        return Path('tests') / rel_path.parent / f'test_{f.stem}{ext}'
+
+    skipped = []
+    def _units(files):
+        # Large Python files are split into chunks that are requested independently
+        for f in files:
+            code = f.read_text()
+            if manifest is not None and _test_file(f).exists() and \
+                    manifest.is_current('generate-tests', f, code, prompt_id, DEFAULT_MODEL):
+                skipped.append(f)
+                continue
+            with telemetry.phase('parse'):
+                chunks = split_module(code, chunk_lines if ext == '.py' else 0)
+            for chunk in chunks:
+                yield f, code, chunk, len(chunks)
+
+    def _render(unit):
+        chunk = unit[2]
+        with telemetry.phase('render'):
+            if use_str_template:
+                return str_tpl.safe_substitute(language=lang, framework=fw, code=chunk.code)
+            return prompt_tpl.format(language=lang, framework=fw, code=chunk.code)
+
+    def _generate(unit):
+        return cli.chat_completion(_render(unit))
+
+    def _label(unit):
+        return f'{unit[0]}' + (f' [{unit[2].name}]' if unit[3] > 1 else '')
+
+    if dry_run or estimate:
+        print_dry_run(((_label(u), _render(u)) for u in _units(files)), estimate=estimate)
+        return
+    if bulk_export:
+        export_jobs(((_label(u), _render(u), None) for u in _units(files)), bulk_export)
+        return
+
+    settings = fingerprint(path, prompt_id, apply_changes, changed_since, staged_only)
+    run = start_journal('generate-tests', settings, files, resume, retry_failed)
+    if run is None:
+        return
+    journal, files = run
+    # Requests run on the worker pool; results are written in discovery order
+    ensure_pool_size(jobs)
+    failed = []
+    parts = []
+    with bulk_results(bulk_import), journaled(journal):
+        for (f, code, chunk, total), result, error in imap_ordered(_generate, _units(files), jobs):
+            parts.append((result, error))
+            if len(parts) < total:
+                continue
+            results, errors = zip(*parts)
+            parts = []
+            click.echo(f'Generating tests for {f}' + (f' ({total} chunks)' if total > 1 else ''))
+            error = next((e for e in errors if e is not None), None)
+            if error is not None:
+                click.echo(f'Error generating tests for {f}: {error}', err=True)
+                failed.append(f)
+                journal.record(f, 'failed', error=str(error))
+                continue
+            test_code = merge_test_modules(list(results))
+            test_file = _test_file(f)
+            existing = test_file.read_text().splitlines() if test_file.exists() else []
+            new_lines = test_code.splitlines()
+            if apply_changes:
+                test_file.parent.mkdir(parents=True, exist_ok=True)
+                write_text(test_file, test_code)
+                click.echo(f'Wrote tests to {test_file}')
+                if manifest is not None:
+                    manifest.record('generate-tests', f, code, prompt_id, DEFAULT_MODEL, artifact=str(test_file))
+            else:
+                diff = difflib.unified_diff(existing, new_lines, fromfile=str(test_file), tofile=str(test_file), lineterm='')
+                for line in diff:
+                    click.echo(line)
+            journal.record(f, 'done')
+        for f in skipped:
+            journal.record(f, 'done', skipped=True)
+    if manifest is not None:
+        manifest.save()
+    if skipped:
+        click.echo(f'Skipped {len(skipped)} unchanged file(s).')
+    if failed:
+        click.echo(f'Failed to generate tests for {len(failed)} file(s):', err=True)
+        for f in failed:
+            click.echo(f'  {f}', err=True)
+
+
+@click.command(name='generate')
+@click.option('--path', 'src_path', default=None, help='(Deprecated) use generate-tests --apply instead')
+@click.option('--language', default=None, help='Language override')
+@click.option('--framework', default=None, help='Framework override')
+def generate(src_path, language, framework):
+    """[DEPRECATED] Alias for 'generate-tests --apply'."""
+    click.echo('Warning: "generate" is deprecated; please use "generate-tests --apply".', err=False)
+    # Ensure configuration exists (same as original generate behavior)
+    try:
+        load_config()
+    except FileNotFoundError:
+        click.echo('Configuration not found. Please run "codex-autotest init" first.', err=True)
+        return
+    # Invoke the new generate-tests command with apply flag
+    ctx = click.get_current_context()
+    ctx.invoke(generate_tests,
+               src_path=src_path,
+               language=language,
+               framework=framework,
+               apply_changes=True)
+    return
@@ -0,0 +1,19 @@
+"""
+`codex-autotest init`.
+"""
+import os
+import click
+from ..config import write_default_config
+
+
+@click.command()
+@click.option('--template', default=None, help='Optional template name')
+def init(template):
+    """Initialize codex-autotest in the current repository."""
+    config_path = '.codex-autotest.yaml'
+    try:
+        write_default_config(config_path)
+        os.makedirs('tests', exist_ok=True)
+        click.echo(f'Initialized codex-autotest with config at {config_path} and tests/ directory.')
+    except FileExistsError:
+        click.echo(f'Config file {config_path} already exists. Aborting.', err=True)
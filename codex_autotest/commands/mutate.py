@@ -0,0 +1,248 @@
+"""
+`codex-autotest mutate`: mutation-driven test amplification.
+"""
+import os
+import threading
+import time
+import click
+from pathlib import Path
+from string import Template
+from .. import cli, mutgroup, telemetry
+from ..config import load_config
+from ..dispatch import imap_ordered
+from ..mutcache import MutationCache, find_tests, source_key
+from ..mutgroup import DEFAULT_GROUP_PROMPT
+from ..mutverify import DEFAULT_MAX_ATTEMPTS, Sandbox, run_test
+from ..openai_client import ensure_pool_size
+from .common import find_sources, write_text
+
+
+@click.command()
+@click.option('--path', 'src_path', default=None, help='Source path to mutate and generate kill tests')
+@click.option('--language', default=None, help='Language override')
+@click.option('--framework', default=None, help='Framework override')
+@click.option('--jobs', '-j', default=1, type=click.IntRange(min=1),
+              help='Number of mutmut show calls and kill-test requests to run concurrently')
+@click.option('--verify', is_flag=True, default=False,
+              help='Run each kill test against its mutant in a temporary copy and keep only tests that kill it')
+@click.option('--max-attempts', 'max_attempts', default=DEFAULT_MAX_ATTEMPTS, type=click.IntRange(min=1),
+              help='With --verify, generation attempts per mutant (failure output is fed back)')
+@click.option('--full', is_flag=True, default=False,
+              help='Ignore cached mutation results and existing kill tests; run mutmut over the whole path')
+@click.option('--group', is_flag=True, default=False,
+              help='Send all surviving mutants of a function in one request and write one test module per function')
+def mutate(src_path, language, framework, jobs=1, verify=False, max_attempts=DEFAULT_MAX_ATTEMPTS, full=False,
+           group=False):
+    """Run mutation-driven test amplification to kill surviving mutants."""
+    try:
+        config = load_config()
+    except FileNotFoundError:
+        click.echo('Configuration not found. Please run "codex-autotest init" first.', err=True)
+        return
+    # Determine language/framework
+    lang = language or config.get('language', 'python')
+    fw = framework or config.get('framework', '')
+    prompts = config.get('prompts', {})
+    kill_prompt_tpl = prompts.get('kill_mutant', '')
+    group_prompt_tpl = prompts.get('kill_mutants', DEFAULT_GROUP_PROMPT)
+    if not kill_prompt_tpl:
+        click.echo('No kill_mutant prompt configured.', err=True)
+        return
+    import shutil, subprocess, json
+    # Determine source path (flag overrides config)
+    path = src_path or config.get('src_path', None)
+    if not path:
+        click.echo('Source path must be provided or defined in config.', err=True)
+        return
+    # Ensure mutmut is installed
+    if shutil.which('mutmut') is None:
+        click.echo('mutmut not found. Please install mutmut to use the mutate command.', err=True)
+        return
+    # Reuse cached statuses for modules whose source and relevant tests are unchanged
+    sources = [os.path.normpath(f) for f in find_sources(path, '.py', config)]
+    with telemetry.phase('discovery'):
+        tests = find_tests(config)
+    mutation_cache = MutationCache()
+    keys = {s: source_key(s, tests) for s in sources}
+    cached = {}
+    if not full:
+        for s in sources:
+            hit = mutation_cache.get(s, keys[s])
+            if hit is not None:
+                cached[s] = hit
+    stale = [s for s in sources if s not in cached]
+    results = []
+    if stale or not sources:
+        # Run mutation testing, restricted to the changed modules when others are cached
+        targets = ','.join(stale) if cached else path
+        click.echo(f'Running mutmut on {targets}...')
+        with telemetry.phase('mutmut'):
+            run_res = subprocess.run(['mutmut', 'run', '--paths-to-mutate', targets],
+                                     capture_output=True, text=True)
+        if run_res.returncode != 0:
+            click.echo(f'Error running mutmut: {run_res.stderr}', err=True)
+            return
+        # Get JSON results
+        res_res = subprocess.run(['mutmut', 'results', '--json'],
+                                  capture_output=True, text=True)
+        if res_res.returncode != 0:
+            click.echo(f'Error getting mutmut results: {res_res.stderr}', err=True)
+            return
+        try:
+            results = json.loads(res_res.stdout)
+        except Exception as e:
+            click.echo(f'Error parsing mutmut results: {e}', err=True)
+            return
+        results = [m for m in results if os.path.normpath(str(m.get('filename'))) not in cached]
+        for s in stale:
+            mutation_cache.put(s, keys[s], [m for m in results if os.path.normpath(str(m.get('filename'))) == s])
+        mutation_cache.save()
+    if cached:
+        click.echo(f'Reused cached mutation results for {len(cached)} of {len(sources)} file(s).')
+    results += [m for s in sources if s in cached for m in cached[s]]
+    # Filter surviving mutants
+    survived = [m for m in results if m.get('status') == 'survived']
+    if not survived:
+        click.echo('No surviving mutants. All mutants are killed by existing tests!')
+        return
+    def _test_file(m):
+        return Path('tests') / f'test_mutant_{Path(m.get("filename")).stem}_{m.get("id")}.py'
+
+    # Survivors whose kill test already exists and still passes need no new request
+    existing = [m for m in survived if _test_file(m).exists()] if not full else []
+    if existing:
+        with telemetry.phase('existing'):
+            checks = imap_ordered(lambda m: run_test('.', str(_test_file(m)), src_path=path)[0], existing, jobs)
+            passing = {id(m) for m, status, error in checks if status == 0}
+        if passing:
+            click.echo(f'Skipped {len(passing)} surviving mutant(s) whose kill test already passes.')
+            survived = [m for m in survived if id(m) not in passing]
+        if not survived:
+            return
+    # Ensure API key is set
+    try:
+        os.environ['OPENAI_API_KEY'] and None
+    except Exception:
+        click.echo('OPENAI_API_KEY is not set. Please export your API key.', err=True)
+        return
+    def _show(m):
+        show_res = subprocess.run(['mutmut', 'show', str(m.get('id'))],
+                                  capture_output=True, text=True)
+        if show_res.returncode != 0:
+            raise RuntimeError(show_res.stderr)
+        return show_res.stdout
+
+    # With --verify each worker thread reuses one temporary copy of the project
+    sandboxes = []
+    local = threading.local()
+
+    def _sandbox():
+        if getattr(local, 'sandbox', None) is None:
+            local.sandbox = Sandbox('.', path)
+            sandboxes.append(local.sandbox)
+        return local.sandbox
+
+    def _kill(unit):
+        test_file, members, scope, show_error = unit
+        if show_error is not None:
+            return None
+        # Prepare prompt: one mutant, or every mutant of one function with --group
+        if scope is not None:
+            prompt = mutgroup.render(group_prompt_tpl, lang, fw, members[0][0].get('filename'), scope, members)
+        elif '$' in kill_prompt_tpl:
+            prompt = Template(kill_prompt_tpl).safe_substitute(language=lang, framework=fw, diff=members[0][1])
+        else:
+            prompt = kill_prompt_tpl.format(language=lang, framework=fw, diff=members[0][1])
+        if not verify:
+            return cli.chat_completion(prompt), None
+        request = prompt
+        for attempt in range(1, max_attempts + 1):
+            test_code = cli.chat_completion(request)
+            with telemetry.phase('verify'):
+                verdict = _sandbox().verify(str(test_file), test_code, [diff for m, diff in members])
+            if verdict.killed:
+                return test_code, attempt
+            target = 'the mutant' if len(members) == 1 else 'every mutant'
+            request = (f'{prompt}\n\nThis test did not kill {target}:\n{test_code}\n\n'
+                       f'{verdict.output}\n\nWrite a corrected test.')
+        return test_code, None
+
+    # Pipeline: `mutmut show` calls and kill-test requests each run on their own
+    # worker pool; results are consumed, and tests written, in survivor order
+    ensure_pool_size(jobs)
+    started = time.perf_counter()
+    written = 0
+    failed = []
+    show_errors = 0
+    unverified = []
+    shown = imap_ordered(_show, survived, jobs)
+    if not group:
+        units = ((_test_file(m), [(m, diff)], None, show_error) for m, diff, show_error in shown)
+    else:
+        # Grouping needs every diff, so the show stage completes first
+        diffs = []
+        for m, diff, show_error in shown:
+            if show_error is not None:
+                click.echo(f'Error showing mutant {m.get("id")}: {show_error}', err=True)
+                failed.append(m.get('id'))
+                show_errors += 1
+            else:
+                diffs.append((m, diff))
+        with telemetry.phase('group'):
+            units = [(mutgroup.kill_test_path(filename, scope, path), members, scope, None)
+                     for filename, scope, members in mutgroup.group_mutants(diffs)]
+        if not full:
+            existing = [unit for unit in units if unit[0].exists()]
+            with telemetry.phase('existing'):
+                checks = imap_ordered(lambda unit: run_test('.', str(unit[0]))[0], existing, jobs)
+                passing = {unit[0] for unit, status, error in checks if status == 0}
+            if passing:
+                click.echo(f'Skipped {len(passing)} function(s) whose kill test module already passes.')
+                units = [unit for unit in units if unit[0] not in passing]
+        click.echo(f'Grouped {len(diffs)} surviving mutant(s) into {len(units)} kill-test request(s).')
+    try:
+        for (test_file, members, scope, show_error), result, error in imap_ordered(_kill, units, jobs):
+            ids = [m.get('id') for m, diff in members]
+            filename = members[0][0].get('filename')
+            if scope is None:
+                click.echo(f'Processing surviving mutant {ids[0]} in {filename}...')
+                if show_error is not None:
+                    click.echo(f'Error showing mutant {ids[0]}: {show_error}', err=True)
+                    failed.append(ids[0])
+                    show_errors += 1
+                    continue
+                click.echo(f'Generating test to kill mutant {ids[0]}...')
+            else:
+                click.echo(f'Generating test to kill mutant(s) {", ".join(str(i) for i in ids)} '
+                           f'in {scope} of {filename}...')
+            if error is not None:
+                click.echo(f'Error generating kill test: {error}', err=True)
+                failed.extend(ids)
+                continue
+            test_code, attempts = result
+            if verify and attempts is None:
+                click.echo(f'No test killed mutant(s) {", ".join(str(i) for i in ids)} after '
+                           f'{max_attempts} attempt(s); nothing written.', err=True)
+                unverified.extend(ids)
+                continue
+            # Write test file
+            test_file.parent.mkdir(parents=True, exist_ok=True)
+            write_text(test_file, test_code)
+            if verify:
+                click.echo(f'Wrote kill test to {test_file} (verified after {attempts} attempt(s))')
+            else:
+                click.echo(f'Wrote kill test to {test_file}')
+            written += 1
+    finally:
+        for sandbox in sandboxes:
+            sandbox.close()
+    elapsed = time.perf_counter() - started
+    rate = len(survived) / elapsed if elapsed else 0.0
+    click.echo(f'Processed {len(survived)} surviving mutant(s) in {elapsed:.1f}s ({rate:.1f}/s): '
+               f'{written} kill test(s) written, {show_errors} show error(s), '
+               f'{len(failed) - show_errors} generation error(s)'
+               + (f', {len(unverified)} unverified.' if verify else '.'))
+    if failed:
+        click.echo('Failed mutants: ' + ', '.join(str(i) for i in failed), err=True)
+    if unverified:
+        click.echo('Unkilled mutants: ' + ', '.join(str(i) for i in unverified), err=True)
@@ -0,0 +1,107 @@
+"""
+`codex-autotest refactor`.
+"""
+import difflib
+import click
+from string import Template
+from .. import cli
+from ..config import DEFAULT_CONFIG, load_config
+from ..manifest import Manifest, fingerprint
+from ..openai_client import DEFAULT_MODEL
+from .common import find_sources, git_scope, journal_options, journaled, scope_options, start_journal, write_text
+
+
+@click.command()
+@click.option('--path', 'src_path', default=None, help='Source path to scan for files')
+@click.option('--focus', default=None, help='Refactoring focus (e.g., performance, readability)')
+@click.option('--language', default=None, help='Language override')
+@click.option('--apply', 'apply_changes', is_flag=True, default=False, help='Apply refactored code instead of showing diff')
+@click.option('--incremental', is_flag=True, default=False, help='Skip files whose content and prompt are unchanged since the last run')
+@scope_options
+@journal_options
+def refactor(src_path, focus, language, apply_changes, incremental=False, changed_since=None, staged_only=False,
+             resume=False, retry_failed=False):
+    """Refactor source code files based on the given focus (e.g., performance, readability)."""
+    # Load configuration unless path explicitly provided
+    if src_path:
+        config = {}
+    else:
+        try:
+            config = load_config()
+        except FileNotFoundError:
+            click.echo('Configuration not found. Please run "codex-autotest init" first.', err=True)
+            return
+    path = src_path or config.get('src_path')
+    if not path:
+        click.echo('Source path must be provided or defined in config.', err=True)
+        return
+    lang = language or config.get('language', 'python')
+    prompts = config.get('prompts', {})
+    # default refactor prompt
+    default_prompt = DEFAULT_CONFIG['prompts'].get('refactor',
+        'Refactor the following {language} code focusing on {focus}. '
+        'Provide the entire updated code without extra commentary:\n\n{code}'
+    )
+    prompt_tpl = prompts.get('refactor', default_prompt)
+    use_str_template = '$' in prompt_tpl
+    if use_str_template:
+        str_tpl = Template(prompt_tpl)
+    ext_map = {'python': '.py', 'javascript': '.js'}
+    ext = ext_map.get(lang.lower(), '.py')
+    try:
+        scope = git_scope(changed_since, staged_only)
+    except RuntimeError as e:
+        click.echo(f'Error resolving git changes: {e}', err=True)
+        return
+    files = [f for f in find_sources(path, ext, config)
+             if f.name != '__init__.py' and (scope is None or f.resolve() in scope)]
+    manifest = Manifest() if incremental else None
+    prompt_id = fingerprint(prompt_tpl, lang, focus or '')
+    settings = fingerprint(path, prompt_id, apply_changes, changed_since, staged_only)
+    run = start_journal('refactor', settings, files, resume, retry_failed)
+    if run is None:
+        return
+    journal, files = run
+    skipped = 0
+    with journaled(journal):
+        for f in files:
+            code = f.read_text()
+            if manifest is not None and manifest.is_current('refactor', f, code, prompt_id, DEFAULT_MODEL):
+                skipped += 1
+                journal.record(f, 'done', skipped=True)
+                continue
+            # Render prompt
+            if use_str_template:
+                prompt = str_tpl.safe_substitute(language=lang, focus=focus or '', code=code)
+            else:
+                try:
+                    prompt = prompt_tpl.format(language=lang, focus=focus or '', code=code)
+                except Exception as e:
+                    click.echo(f'Error formatting prompt for {f}: {e}', err=True)
+                    journal.record(f, 'failed', error='prompt')
+                    continue
+            click.echo(f'Refactoring {f}')
+            try:
+                new_code = cli.chat_completion(prompt)
+            except Exception as e:
+                click.echo(f'Error refactoring {f}: {e}', err=True)
+                journal.record(f, 'failed', error=str(e))
+                continue
+            original_lines = code.splitlines()
+            new_lines = new_code.splitlines()
+            if apply_changes:
+                write_text(f, new_code)
+                click.echo(f'Wrote refactored code to {f}')
+                if manifest is not None:
+                    # Record the refactored content so the next run treats it as unchanged
+                    manifest.record('refactor', f, new_code, prompt_id, DEFAULT_MODEL, artifact=str(f))
+            else:
+                diff = difflib.unified_diff(original_lines, new_lines,
+                                            fromfile=str(f), tofile=str(f), lineterm='')
+                for line in diff:
+                    click.echo(line)
+            journal.record(f, 'done')
+    if manifest is not None:
+        manifest.save()
+    if skipped:
+        click.echo(f'Skipped {skipped} unchanged file(s).')
@@ -0,0 +1,32 @@
+"""
+`codex-autotest retry-failed`: reprocess the dead-letter files of batch runs.
+"""
+import click
+from ..journal import RunJournal
+
+# Commands that keep a run journal, in the order they are retried
+JOURNALED = ('generate-tests', 'docstring', 'refactor', 'audit-security')
+
+
+@click.command(name='retry-failed')
+@click.option('--command', 'commands', multiple=True, type=click.Choice(JOURNALED),
+              help='Only retry this command (repeatable; default: all)')
+@click.pass_context
+def retry_failed(ctx, commands):
+    """Reprocess the files that failed in the last run of each batch command."""
+    group = ctx.find_root().command
+    retried = False
+    for name in commands or JOURNALED:
+        start, items, _ = RunJournal(name).read()
+        failed = [item for item, record in items.items() if record.get('status') == 'failed']
+        if start is None or not failed:
+            continue
+        retried = True
+        click.echo(f'Retrying {len(failed)} failed file(s) from the last {name} run')
+        # Replay the original parameters so the run's settings (and journal) match
+        params = dict(start.get('params') or {}, resume=False, retry_failed=True)
+        # Requests that had no usable bulk result are retried through the API
+        params.pop('bulk_import', None)
+        ctx.invoke(group.get_command(ctx, name), **params)
+    if not retried:
+        click.echo('No failed files to retry.')
@@ -0,0 +1,129 @@
+"""
+`codex-autotest review`.
+"""
+import os
+import sys
+import click
+from pathlib import Path
+from string import Template
+from .. import cli
+from ..config import load_config
+from ..symindex import SymbolIndex
+from .common import LANG_TO_EXT, find_sources, write_text
+
+
+def _imported_source(test_path, src_path, config):
+    """
+    Return the module under src_path that test_path imports, preferring the one
+    named after the test (test_mod.py -> mod.py), or None if it imports none.
+    """
+    sources = find_sources(src_path, '.py', config)
+    index = SymbolIndex()
+    index.update([test_path] + sources)
+    index.save()
+    sources = {str(p) for p in sources}
+    candidates = []
+    for name in index.get(test_path)['imports']:
+        candidates.extend(Path(p) for p in index.modules(name) if p in sources and Path(p) not in candidates)
+    stem = test_path.stem[len('test_'):] if test_path.stem.startswith('test_') else test_path.stem
+    named = [p for p in candidates if p.stem == stem]
+    if named:
+        return named[0]
+    return candidates[0] if len(candidates) == 1 else None
+
+
+@click.command()
+@click.argument('test_file')
+def review(test_file):
+    """Review and regenerate tests interactively."""
+    try:
+        config = load_config()
+    except FileNotFoundError:
+        click.echo('Configuration not found. Please run "codex-autotest init" first.', err=True)
+        return
+    src_path = config.get('src_path', None)
+    if not src_path:
+        click.echo('src_path is not configured in .codex-autotest.yaml', err=True)
+        return
+    lang = config.get('language', '')
+    fw = config.get('framework', '')
+    prompts = config.get('prompts', {})
+    unit_prompt_tpl = prompts.get('unit_test', '')
+    # Determine file extension based on language
+    ext = LANG_TO_EXT.get(lang.lower(), '.py')
+
+    test_path = Path(test_file)
+    if not test_path.exists():
+        click.echo(f'Test file {test_file} not found.', err=True)
+        return
+    code_path = _imported_source(test_path, src_path, config) if ext == '.py' else None
+    if code_path is None:
+        # Mirror the test's location: tests/pkg/test_mod.py -> <src_path>/pkg/mod.py
+        try:
+            rel = test_path.relative_to('tests')
+        except Exception:
+            click.echo('Please provide a test file under the "tests/" directory.', err=True)
+            return
+        name = rel.name
+        if name.startswith('test_'):
+            src_name = name[len('test_'):]
+        else:
+            src_name = name
+        if not src_name.endswith(ext):
+            src_name = Path(src_name).stem + ext
+        code_path = Path(src_path) / rel.parent / src_name
+    if not code_path.exists():
+        click.echo(f'Could not find source file {code_path} for test {test_file}.', err=True)
+        return
+    code = code_path.read_text()
+
+    click.echo(f'Current test code for {test_file}:\n')
+    click.echo(test_path.read_text())
+
+    # Interactive prompt editing and regeneration loop using multi-line editor
+    prompt_template = unit_prompt_tpl
+    # Ensure API key is set
+    try:
+        os.environ['OPENAI_API_KEY'] and None
+    except Exception:
+        click.echo('OPENAI_API_KEY is not set. Please export your API key.', err=True)
+        return
+    while True:
+        # Use editor for interactive TTY sessions, else fallback to prompt input
+        if sys.stdin.isatty():
+            click.echo('\nOpening editor to customize the prompt. Save to apply changes, or exit without saving to keep existing prompt.')
+            edited = click.edit(text=prompt_template, require_save=True)
+            if edited is not None:
+                prompt_template = edited.rstrip('\n')
+        else:
+            click.echo('\nEnter a new prompt (or leave empty to use previous/default):')
+            new_prompt = click.prompt('Prompt', default=prompt_template)
+            prompt_template = new_prompt
+        click.echo('\nUsing prompt:\n' + prompt_template)
+        # Render prompt using templating
+        if '$' in prompt_template:
+            prompt = Template(prompt_template).safe_substitute(language=lang, framework=fw, code=code)
+        else:
+            try:
+                prompt = prompt_template.format(language=lang, framework=fw, code=code)
+            except Exception as e:
+                click.echo(f'Error formatting prompt: {e}', err=True)
+                return
+        try:
+            # Each round asks for a fresh answer, even when the prompt is unchanged
+            new_test_code = cli.chat_completion(prompt, refresh=True)
+        except Exception as e:
+            click.echo(f'Error regenerating tests: {e}', err=True)
+            return
+
+        click.echo('\nGenerated new test code:\n')
+        click.echo(new_test_code)
+        if click.confirm(f'Overwrite {test_file}?'):
+            write_text(test_path, new_test_code)
+            click.echo(f'Wrote updated tests to {test_file}')
+            break
+        elif click.confirm('Edit prompt and regenerate?', default=True):
+            continue
+        else:
+            click.echo('Aborted. No changes written.')
+            break
@@ -0,0 +1,41 @@
+"""
+`codex-autotest serve`.
+"""
+import click
+from ..daemon import DEFAULT_SOCKET, Daemon, request
+
+
+@click.command()
+@click.option('--socket', 'socket_path', default=DEFAULT_SOCKET, show_default=True, help='Unix socket to listen on')
+@click.option('--idle-timeout', 'idle_timeout', default=None, type=click.FloatRange(min=0),
+              help='Exit after this many minutes without a request')
+@click.option('--status', is_flag=True, default=False, help='Report whether a daemon is running and exit')
+@click.option('--stop', is_flag=True, default=False, help='Stop the running daemon and exit')
+def serve(socket_path, idle_timeout, status, stop):
+    """Run a daemon that keeps state warm and serves CLI commands over a Unix socket."""
+    reply = request({'op': 'ping'}, socket_path)
+    if status:
+        if reply is None:
+            click.echo('No daemon is running.')
+        else:
+            busy = ', running a command' if reply.get('busy') else ''
+            click.echo(f'Daemon {reply["pid"]} serving {reply["root"]}: {reply["requests"]} request(s), '
+                       f'up {reply["uptime"]:.0f}s{busy}')
+        return
+    if stop:
+        if reply is None:
+            click.echo('No daemon is running.', err=True)
+            return
+        request({'op': 'stop'}, socket_path)
+        click.echo(f'Stopped daemon {reply["pid"]}.')
+        return
+    if reply is not None:
+        click.echo(f'A daemon is already running (pid {reply["pid"]}).', err=True)
+        return
+    daemon = Daemon(socket_path, idle_timeout=idle_timeout * 60 if idle_timeout else None)
+    try:
+        daemon.serve(ready=lambda: click.echo(f'Serving codex-autotest commands on {socket_path} (Ctrl-C to stop)'))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        click.echo(f'Error listening on {socket_path}: {e}', err=True)
@@ -1,5 +1,8 @@
+import copy
 import os
-import yaml
+
+# path -> ((absolute path, mtime, size), parsed config), see load_config
+_loaded = {}
 
 DEFAULT_CONFIG = {
     'src_path': 'src',
@@ -49,12 +52,41 @@ def write_default_config(path='.codex-autotest.yaml'):
     """Write the default configuration to the given path."""
     if os.path.exists(path):
         raise FileExistsError(f'{path} already exists')
+    import yaml
     with open(path, 'w') as f:
         yaml.dump(DEFAULT_CONFIG, f)
 
 def load_config(path='.codex-autotest.yaml'):
-    """Load configuration from the given path."""
-    if not os.path.exists(path):
+    """
+    Load configuration from the given path. Parsed files are cached by path,
+    modification time and size, so repeated loads (within a command or across
+    commands served by the daemon) skip the YAML parse; callers get a copy.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
         raise FileNotFoundError(f'{path} not found')
-    with open(path) as f:
-        return yaml.safe_load(f)
\ No newline at end of file
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    if _loaded.get(path, (None,))[0] != key:
+        import yaml
+        with open(path) as f:
+            _loaded[path] = (key, yaml.safe_load(f))
+    return copy.deepcopy(_loaded[path][1])
+
+def optional_config(path='.codex-autotest.yaml'):
+    """
+    Return the configuration for optional settings (rate limits, http, cache,
+    discovery), or {} when the file is missing or malformed; the commands that
+    need the configuration report the error.
+    """
+    try:
+        config = load_config(path)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        # yaml is already imported once the file exists
+        import yaml
+        if isinstance(e, yaml.YAMLError):
+            return {}
+        raise
+    return config if isinstance(config, dict) else {}
@@ -0,0 +1,277 @@
+"""
+`codex-autotest serve`: a per-project daemon that keeps the package imported
+and the API clients, response cache, parsed config and AST cache warm.
+
+The daemon listens on a Unix socket under `.codex-autotest/`. The console
+entry point (run below) looks for that socket before importing anything else
+and, when a daemon answers, sends it the command line and relays the output,
+so a command costs a socket round trip instead of a fresh interpreter start.
+Each connection is handled on its own thread, but commands swap the process's
+standard streams, so they run one at a time in the daemon's working directory
+and environment; a command arriving while another runs is rejected as busy and
+runs in the client instead.
+
+Messages are JSON lines. A request is `{"argv": [...], "cwd": ..., "tty": ...,
+"key": ...}` (or `{"op": "ping"}` / `{"op": "stop"}`), where tty tells whether
+the client's stdout is a terminal and key is a digest of its OPENAI_API_KEY; the
+reply is a stream of `{"out": text}` and `{"err": text}` chunks ending with
+`{"exit": code}`, or `{"reject": reason}` when the client should run the command
+itself. A client that disconnects mid-command interrupts the command as Ctrl-C
+would.
+"""
+import hashlib
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+DEFAULT_SOCKET = os.path.join('.codex-autotest', 'daemon.sock')
+# Commands that are forwarded; interactive and daemon-management commands always run locally
+FORWARDED = frozenset(('audit-security', 'cache', 'commit', 'docstring', 'explain', 'generate',
+                       'generate-tests', 'mutate', 'refactor', 'retry-failed'))
+# Global options that take a value, skipped when looking for the command name
+_VALUE_OPTIONS = ('--metrics-out',)
+# Set to any non-empty value to never forward
+NO_DAEMON_ENV = 'CODEX_AUTOTEST_NO_DAEMON'
+
+
+def command_name(argv):
+    """Return the command named in argv (after any global options), or None."""
+    args = iter(argv)
+    for arg in args:
+        if arg in _VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith('-'):
+            return arg
+    return None
+
+
+def key_digest():
+    """Return a digest of this process's OPENAI_API_KEY, so the key itself never crosses the socket."""
+    return hashlib.sha256(os.environ.get('OPENAI_API_KEY', '').encode('utf-8')).hexdigest()
+
+
+def _connect(socket_path):
+    """Return a connected socket, or None when no daemon is listening."""
+    if not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        # A stale socket left behind by a daemon that did not shut down cleanly
+        sock.close()
+        return None
+    return sock
+
+
+def _send(stream, message):
+    stream.write(json.dumps(message).encode('utf-8') + b'\n')
+    stream.flush()
+
+
+def request(message, socket_path=DEFAULT_SOCKET):
+    """Send a control message (ping/stop) and return the reply, or None when no daemon is running."""
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+    with sock, sock.makefile('rwb') as stream:
+        _send(stream, message)
+        line = stream.readline()
+    return json.loads(line) if line else None
+
+
+def forward(argv, socket_path=DEFAULT_SOCKET, stdout=None, stderr=None):
+    """
+    Run argv in a running daemon, relaying its output. Returns the exit code,
+    or None when the command should run in this process instead (no daemon,
+    a command that is not forwarded, or a daemon serving another directory).
+    """
+    if os.environ.get(NO_DAEMON_ENV) or command_name(argv) not in FORWARDED:
+        return None
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    with sock, sock.makefile('rwb') as stream:
+        _send(stream, {'argv': list(argv), 'cwd': os.getcwd(), 'tty': stdout.isatty(), 'key': key_digest()})
+        for line in stream:
+            message = json.loads(line)
+            if 'out' in message:
+                stdout.write(message['out'])
+                stdout.flush()
+            elif 'err' in message:
+                stderr.write(message['err'])
+                stderr.flush()
+            elif 'exit' in message:
+                return message['exit']
+            else:
+                return None
+    # The daemon went away mid-command
+    stderr.write('codex-autotest daemon closed the connection.\n')
+    return 1
+
+
+def run():
+    """Console entry point: forward to a running daemon, else run the command in this process."""
+    code = forward(sys.argv[1:])
+    if code is None:
+        from .cli import main
+        return main()
+    sys.exit(code)
+
+
+class _Relay(io.TextIOBase):
+    """
+    Text stream that sends each write to the client as a `{key: text}` message.
+    When the client has gone away, the first failed write raises
+    KeyboardInterrupt to stop the command and later writes to the relays
+    sharing its state are dropped.
+    """
+
+    def __init__(self, stream, key, tty=False, state=None):
+        self._stream = stream
+        self._key = key
+        self._tty = tty
+        self._state = {'broken': False} if state is None else state
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        if not isinstance(text, str):
+            # Tells click's stream detection that this is a text stream
+            raise TypeError(f'write() argument must be str, not {type(text).__name__}')
+        if text and not self._state['broken']:
+            try:
+                _send(self._stream, {self._key: text})
+            except OSError:
+                self._state['broken'] = True
+                raise KeyboardInterrupt
+        return len(text)
+
+    def isatty(self):
+        return self._tty
+
+
+class Daemon:
+    """Serve CLI invocations for the project in the current directory over a Unix socket."""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, idle_timeout=None):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.root = os.getcwd()
+        self.started = time.time()
+        self.requests = 0
+        self._running = False
+        # Held while a command runs
+        self._busy = threading.Lock()
+
+    def serve(self, ready=None):
+        """
+        Accept requests until stopped or idle for idle_timeout seconds; calls
+        ready() once listening. Each connection is handled on its own thread.
+        """
+        from .cli import main
+        os.makedirs(os.path.dirname(self.socket_path) or '.', exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(self.socket_path)
+            server.listen()
+            server.settimeout(self.idle_timeout)
+            self._running = True
+            if ready is not None:
+                ready()
+            while self._running:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    if self._busy.locked():
+                        continue
+                    break
+                if not self._running:
+                    conn.close()
+                    break
+                threading.Thread(target=self._connection, args=(main, conn), daemon=True).start()
+        finally:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            # Let a running command finish before closing the clients it uses
+            with self._busy:
+                from .openai_client import close_clients
+                close_clients()
+
+    def _connection(self, main, conn):
+        try:
+            with conn, conn.makefile('rwb') as stream:
+                line = stream.readline()
+                if line:
+                    self._handle(main, json.loads(line), stream)
+        except (OSError, ValueError):
+            # The client went away or sent garbage; the others are unaffected
+            pass
+
+    def _handle(self, main, message, stream):
+        op = message.get('op')
+        if op == 'ping':
+            _send(stream, {'pid': os.getpid(), 'root': self.root, 'requests': self.requests,
+                           'busy': self._busy.locked(), 'uptime': round(time.time() - self.started, 1)})
+        elif op == 'stop':
+            self._running = False
+            _send(stream, {'stopped': True})
+            # Wake the accept loop so it sees the flag
+            sock = _connect(self.socket_path)
+            if sock is not None:
+                sock.close()
+        elif os.path.realpath(message.get('cwd', '')) != os.path.realpath(self.root):
+            _send(stream, {'reject': f'daemon serves {self.root}'})
+        elif message.get('key') != key_digest():
+            # The daemon's clients were built with its own key; the client's would be ignored
+            _send(stream, {'reject': 'daemon uses a different OPENAI_API_KEY'})
+        elif not self._busy.acquire(blocking=False):
+            _send(stream, {'reject': 'busy'})
+        else:
+            try:
+                self.requests += 1
+                code = self._execute(main, message['argv'], stream, message.get('tty', False))
+            finally:
+                # Released before the reply, so the client's next command is not turned away
+                self._busy.release()
+            _send(stream, {'exit': code})
+
+    def _execute(self, main, argv, stream, tty=False):
+        """Run one command line with its output relayed to stream; returns the exit code."""
+        import click
+        state = {'broken': False}
+        out, err = _Relay(stream, 'out', tty, state), _Relay(stream, 'err', tty, state)
+        saved = sys.stdin, sys.stdout, sys.stderr
+        # Prompts see end-of-input instead of waiting on the daemon's terminal
+        sys.stdin, sys.stdout, sys.stderr = io.StringIO(), out, err
+        try:
+            main.main(args=argv, prog_name='codex-autotest', standalone_mode=False, obj={'daemon': True})
+            return 0
+        except click.exceptions.Exit as e:
+            return e.exit_code
+        except click.ClickException as e:
+            e.show(file=err)
+            return e.exit_code
+        except click.Abort:
+            err.write('Aborted!\n')
+            return 1
+        except KeyboardInterrupt:
+            # A write to the disconnected client interrupted the command outside click's handling
+            return 130
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            err.write(f'Error: {e}\n')
+            return 1
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = saved
@@ -0,0 +1,103 @@
+"""
+Split large staged diffs into per-file or per-hunk pieces for map-reduce
+commit message generation.
+
+Pieces are normalised before they are summarised: `index` lines and the line
+numbers in hunk headers are dropped, so a hunk that is only shifted by other
+edits (re-staging, amending) renders the same prompt and its summary is served
+from the response cache.
+"""
+import re
+from collections import namedtuple
+from string import Template
+
+DEFAULT_MAP_THRESHOLD = 4000
+DEFAULT_PIECE_TOKENS = 1500
+
+DEFAULT_SUMMARY_PROMPT = (
+    'Summarise the following part of a staged git diff in at most three short bullet '
+    'points, naming the file and describing what changed:\n\n'
+    '{diff}'
+)
+DEFAULT_REDUCE_PROMPT = (
+    'Write a conventional commit message (type, scope, subject, and a short body '
+    'if needed) following Conventional Commits format for a change made of the '
+    'following parts:\n\n'
+    '{summaries}'
+)
+
+Piece = namedtuple('Piece', 'path text')
+_HUNK_HEADER_RE = re.compile(r'^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@ ?')
+
+
+def _split_files(diff):
+    """Yield (path, header_lines, hunks) for each file section of a git diff."""
+    path, header, hunks = None, [], []
+    for line in diff.splitlines():
+        if line.startswith('diff --git '):
+            if header or hunks:
+                yield path, header, hunks
+            path = line.split(' b/', 1)[-1] if ' b/' in line else line[len('diff --git '):]
+            header, hunks = [line], []
+        elif line.startswith('@@'):
+            hunks.append([line])
+        elif hunks:
+            hunks[-1].append(line)
+        else:
+            header.append(line)
+    if header or hunks:
+        yield path, header, hunks
+
+
+def normalize(lines):
+    """Drop index lines and hunk line numbers, keeping the function context of hunk headers."""
+    out = []
+    for line in lines:
+        if line.startswith('index '):
+            continue
+        if line.startswith('@@'):
+            context = _HUNK_HEADER_RE.sub('', line)
+            line = '@@ ' + context if context else '@@'
+        out.append(line)
+    return out
+
+
+def split(diff, count, max_tokens=DEFAULT_PIECE_TOKENS):
+    """
+    Split diff into Pieces of at most max_tokens (as measured by count): one
+    per file, or one per hunk (under the file header) for larger files. A hunk
+    that is still too large is cut into runs of whole lines.
+    """
+    pieces = []
+    for path, header, hunks in _split_files(diff):
+        header = normalize(header)
+        whole = '\n'.join(header + normalize([line for hunk in hunks for line in hunk]))
+        if count(whole) <= max_tokens or not hunks:
+            pieces.append(Piece(path, whole))
+            continue
+        for hunk in hunks:
+            hunk = normalize(hunk)
+            text = '\n'.join(header + hunk)
+            if count(text) <= max_tokens:
+                pieces.append(Piece(path, text))
+                continue
+            # Every run repeats the file and hunk headers for context
+            base = count('\n'.join(header + hunk[:1]))
+            run, size = [], base
+            for line in hunk[1:]:
+                n = count(line) + 1
+                if run and size + n > max_tokens:
+                    pieces.append(Piece(path, '\n'.join(header + hunk[:1] + run)))
+                    run, size = [], base
+                run.append(line)
+                size += n
+            if run:
+                pieces.append(Piece(path, '\n'.join(header + hunk[:1] + run)))
+    return pieces
+
+
+def render(template, **values):
+    """Render a $-style or {}-style prompt template."""
+    if '$' in template:
+        return Template(template).safe_substitute(**values)
+    return template.format(**values)
@@ -0,0 +1,228 @@
+"""
+Source file discovery shared by the scanning commands.
+
+Walks the source tree once, pruning directories that are ignored by
+`.gitignore`, by the built-in excludes (virtualenvs, node_modules, caches, and
+build output at the scan root) or by the `discovery.exclude` globs, instead of filtering files after a
+full `rglob`. Files can be further restricted with `discovery.include` globs;
+oversized, binary and generated files are skipped.
+"""
+import fnmatch
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+# Directory names that never contain first-party sources
+DEFAULT_EXCLUDE_DIRS = (
+    '.git', '.hg', '.svn', '.venv', 'venv', '.tox', '.nox', 'node_modules', '__pycache__',
+    '.mypy_cache', '.pytest_cache', '.ruff_cache', 'site-packages', '.eggs', '.codex-autotest',
+)
+# Virtualenv and build output names that are also common package names, so
+# they are only excluded directly under the scan root
+ROOT_EXCLUDE_DIRS = ('env', 'build', 'dist')
+DEFAULT_EXCLUDE = ('*.egg-info', '*_pb2.py', '*_pb2_grpc.py', '*.min.js')
+DEFAULT_MAX_FILE_SIZE_KB = 512
+# Markers in the first lines of a file that identify generated code
+GENERATED_MARKERS = ('@generated', 'DO NOT EDIT', 'Code generated by', 'Autogenerated by')
+_SNIFF_BYTES = 2048
+
+
+def _glob_regex(pattern):
+    """Translate a gitignore-style glob (with `**`) into a regex matching relative posix paths."""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == n:
+            out.append('/.*')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif c == '*':
+            out.append('[^/]*')
+            i += 1
+        elif c == '?':
+            out.append('[^/]')
+            i += 1
+        elif c == '[':
+            j = pattern.find(']', i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = j + 1
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return ''.join(out)
+
+
+class IgnoreRules:
+    """Ordered gitignore rules; the last matching rule decides, `!` rules re-include."""
+
+    def __init__(self):
+        self.rules = []
+
+    def add(self, pattern, base):
+        """Add one gitignore pattern whose anchored form is relative to directory base."""
+        pattern = pattern.rstrip('\n').rstrip()
+        if not pattern or pattern.startswith('#'):
+            return
+        negate = pattern.startswith('!')
+        if negate or pattern.startswith('\\!') or pattern.startswith('\\#'):
+            pattern = pattern[1:]
+        dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        if not pattern:
+            return
+        # A slash anywhere but the end anchors the pattern to its .gitignore's directory
+        anchored = '/' in pattern
+        regex = _glob_regex(pattern.lstrip('/'))
+        if not anchored:
+            regex = '(?:.*/)?' + regex
+        self.rules.append((str(base), re.compile(regex + r'\Z', re.DOTALL), negate, dir_only))
+
+    def add_file(self, path):
+        try:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    self.add(line, Path(path).parent)
+        except OSError:
+            pass
+
+    def ignored(self, path, is_dir):
+        """Return True if the absolute path is ignored."""
+        result = False
+        path = str(path)
+        for base, regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            prefix = base.rstrip(os.sep) + os.sep
+            if not path.startswith(prefix):
+                continue
+            rel = path[len(prefix):].replace(os.sep, '/')
+            if regex.match(rel):
+                result = not negate
+        return result
+
+
+def _git_root(start):
+    for directory in [start] + list(start.parents):
+        if (directory / '.git').exists():
+            return directory
+    return None
+
+
+def _is_generated_or_binary(path):
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(_SNIFF_BYTES)
+    except OSError:
+        return True
+    if b'\0' in head:
+        return True
+    text = head.decode('utf-8', errors='replace')
+    first_lines = '\n'.join(text.splitlines()[:5])
+    return any(marker in first_lines for marker in GENERATED_MARKERS)
+
+
+@lru_cache(maxsize=None)
+def _path_regex(pattern):
+    return re.compile(_glob_regex(pattern.strip('/')) + r'\Z', re.DOTALL)
+
+
+def _matches(rel, patterns):
+    """fnmatch-style match of a relative posix path against globs (basename for slash-free globs)."""
+    name = rel.rsplit('/', 1)[-1]
+    for pattern in patterns:
+        if '/' in pattern.rstrip('/'):
+            if _path_regex(pattern).match(rel):
+                return True
+        elif fnmatch.fnmatchcase(name, pattern.rstrip('/')):
+            return True
+    return False
+
+
+def discover(path, extensions, config=None):
+    """
+    Return the sorted source files under path whose suffix is in extensions
+    (a string or tuple), honouring the optional `discovery` config section:
+    `gitignore` (default true), `include`/`exclude` globs, `max_file_size_kb`
+    and `skip_generated` (default true). Globs containing a slash are matched
+    against the path relative to path, others against each name.
+    """
+    settings = (config or {}).get('discovery') or {}
+    if isinstance(extensions, str):
+        extensions = (extensions,)
+    root = Path(path).resolve()
+    if root.is_file():
+        return [Path(path)] if root.suffix in extensions else []
+    include = list(settings.get('include') or [])
+    exclude = list(DEFAULT_EXCLUDE) + list(settings.get('exclude') or [])
+    exclude_dirs = set(DEFAULT_EXCLUDE_DIRS)
+    max_bytes = int(float(settings.get('max_file_size_kb', DEFAULT_MAX_FILE_SIZE_KB)) * 1024)
+    skip_generated = settings.get('skip_generated', True)
+    rules = None
+    if settings.get('gitignore', True):
+        rules = IgnoreRules()
+        # .gitignore files from the repository root down to the scan root also apply
+        top = _git_root(root)
+        if top is not None and top != root:
+            for directory in [top] + [p for p in reversed(root.parents) if top in p.parents]:
+                rules.add_file(directory / '.gitignore')
+    found = []
+    # Depth-first scandir walk on plain strings; ignored directories are never entered
+    stack = [(str(root), '')]
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        if rules is not None and any(e.name == '.gitignore' for e in entries):
+            rules.add_file(os.path.join(directory, '.gitignore'))
+        for entry in entries:
+            name = entry.name
+            rel = rel_dir + name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                if name in exclude_dirs or (not rel_dir and name in ROOT_EXCLUDE_DIRS) or _matches(rel, exclude):
+                    continue
+                if rules is not None and rules.ignored(entry.path, True):
+                    continue
+                stack.append((entry.path, rel + '/'))
+                continue
+            if not name.endswith(extensions):
+                continue
+            if _matches(rel, exclude) or (include and not _matches(rel, include)):
+                continue
+            if rules is not None and rules.ignored(entry.path, False):
+                continue
+            try:
+                if max_bytes and entry.stat().st_size > max_bytes:
+                    continue
+            except OSError:
+                continue
+            if skip_generated and _is_generated_or_binary(entry.path):
+                continue
+            found.append(rel)
+    # Report paths under the caller's spelling of path, in rglob-like sorted order
+    found.sort(key=lambda rel: rel.split('/'))
+    base = Path(path)
+    return [base / rel for rel in found]
@@ -0,0 +1,42 @@
+"""
+Bounded worker pool used to keep several API requests in flight at once.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _resolve(item, future):
+    try:
+        return item, future.result(), None
+    except Exception as e:
+        return item, None, e
+
+
+def imap_ordered(func, items, jobs=1, window=None):
+    """
+    Apply func to each item with at most `jobs` calls running concurrently.
+    Yields (item, result, error) tuples in input order, each one as soon as it
+    and every item before it have finished. Exceptions raised by func are
+    returned as `error` so one failing item does not stop the batch.
+    """
+    if not jobs or jobs <= 1:
+        for item in items:
+            try:
+                yield item, func(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+    # Submit ahead of the head of the queue so a slow item does not leave
+    # workers idle while its successors wait to be yielded.
+    window = window or jobs * 4
+    pending = deque()
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        for item in items:
+            pending.append((item, pool.submit(func, item)))
+            if len(pending) >= window:
+                yield _resolve(*pending.popleft())
+        while pending:
+            yield _resolve(*pending.popleft())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
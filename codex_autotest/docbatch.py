@@ -0,0 +1,95 @@
+"""
+Pack many undocumented objects into one docstring request and parse the keyed
+reply back into per-object docstrings.
+"""
+import json
+import re
+from string import Template
+
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_BATCH_TOKENS = 3000
+# Completion tokens requested per object in a batch
+COMPLETION_TOKENS_PER_OBJECT = 160
+
+DEFAULT_BATCH_PROMPT = (
+    'Write docstrings for each of the following {language} objects, including '
+    'descriptions of parameters and return values where applicable. Reply with '
+    'only a JSON object mapping each object ID to its docstring text, without '
+    'triple quotes or indentation.\n\n'
+    '{objects}'
+)
+
+_PAIR_RE = re.compile(r'"(D\d+)"\s*:\s*("(?:[^"\\]|\\.)*")', re.DOTALL)
+
+
+def pack(items, count, max_objects=DEFAULT_BATCH_SIZE, max_tokens=DEFAULT_BATCH_TOKENS):
+    """
+    Greedily group items into batches of at most max_objects items whose
+    count(item) total stays within max_tokens. An item larger than max_tokens
+    gets a batch of its own.
+    """
+    batches = []
+    current = []
+    size = 0
+    for item in items:
+        n = count(item)
+        if current and (len(current) >= max_objects or size + n > max_tokens):
+            batches.append(current)
+            current = []
+            size = 0
+        current.append(item)
+        size += n
+    if current:
+        batches.append(current)
+    return batches
+
+
+def render(template, language, entries):
+    """
+    Render a batch prompt. entries are (key, object_type, name, lineno, code)
+    tuples; each is listed under a `### key` heading.
+    """
+    objects = '\n\n'.join(
+        f'### {key}: {obj_type} {name} (line {lineno})\n{code}'
+        for key, obj_type, name, lineno, code in entries
+    )
+    if '$' in template:
+        return Template(template).safe_substitute(language=language, objects=objects)
+    return template.format(language=language, objects=objects)
+
+
+def parse(text, keys):
+    """
+    Return {key: docstring} for the keys the reply answers with usable text.
+    Falls back to salvaging individual `"key": "..."` pairs when the reply is
+    not valid JSON (e.g. truncated), so one bad entry does not fail the batch.
+    """
+    body = text.strip()
+    if body.startswith('```'):
+        body = body.split('\n', 1)[-1].rsplit('```', 1)[0]
+    start, end = body.find('{'), body.rfind('}')
+    data = None
+    if start != -1 and end > start:
+        try:
+            data = json.loads(body[start:end + 1])
+        except ValueError:
+            data = None
+    if not isinstance(data, dict):
+        data = {}
+        for key, value in _PAIR_RE.findall(body):
+            try:
+                data[key] = json.loads(value)
+            except ValueError:
+                continue
+    docs = {}
+    for key in keys:
+        value = data.get(key)
+        if not isinstance(value, str):
+            continue
+        value = value.strip()
+        if value.startswith('"""') and value.endswith('"""') and len(value) >= 6:
+            value = value[3:-3].strip()
+        # Empty text or embedded triple quotes cannot be inserted safely
+        if value and '"""' not in value:
+            docs[key] = value
+    return docs
@@ -0,0 +1,114 @@
+"""
+Analysis stage of `docstring`: parse each file and list the definitions that
+need a docstring, optionally in a pool of worker processes.
+
+Workers return compact picklable records (FilePlan with Insertion tuples)
+instead of AST nodes, so only the file text and a few integers per object
+cross the process boundary. On request a plan also carries the file's symbol
+index entry (symindex.make_entry), built from the same parse, so stale index
+entries are refreshed in the workers rather than by a serial pass beforehand.
+The request stage in commands/docstring.py consumes the plans in file order
+as they arrive.
+"""
+import ast
+import os
+import re
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from .astwalk import iter_definitions, parse
+from .gitscope import overlaps
+from .symindex import make_entry
+
+# line: first body statement (the docstring goes above it); start/end: the
+# definition's lines, sent as the prompt's code snippet; indent: of line
+Insertion = namedtuple('Insertion', 'line obj_type name start end indent')
+# error is the SyntaxError message when the file cannot be parsed; entry is
+# the file's symbol index entry when requested
+FilePlan = namedtuple('FilePlan', 'path content insertions error entry', defaults=(None,))
+
+# Files handed to a worker at a time; amortises the per-task IPC overhead
+CHUNK_SIZE = 16
+# Chunks submitted per worker ahead of the consumer; bounds the plans held in memory
+WINDOW = 2
+
+
+def analyse(path, touched=None, index=False):
+    """
+    Read and parse path and return its FilePlan: the undocumented functions,
+    classes and methods, bottom-up, limited to the touched line ranges if given,
+    and with index its symbol index entry.
+    """
+    # Stat first: a file changed after this is re-indexed on the next run
+    st = os.stat(path) if index else None
+    content = Path(path).read_text()
+    entry = make_entry(content, st) if index else None
+    try:
+        tree = parse(content)
+    except SyntaxError as e:
+        return FilePlan(str(path), content, [], str(e), entry)
+    lines = content.splitlines()
+    insertions = []
+    # Top-level functions and classes, and methods inside classes
+    for node, obj_type in iter_definitions(tree):
+        if ast.get_docstring(node, clean=False) is not None or not node.body:
+            continue
+        end = getattr(node, 'end_lineno', node.lineno)
+        if touched is not None and not overlaps(touched, node.lineno, end):
+            continue
+        line = node.body[0].lineno
+        indent = re.match(r'\s*', lines[line - 1]).group(0)
+        insertions.append(Insertion(line, obj_type, node.name, node.lineno, end, indent))
+    insertions.sort(key=lambda i: i.line, reverse=True)
+    return FilePlan(str(path), content, insertions, None, entry)
+
+
+def _analyse(args):
+    return analyse(*args)
+
+
+def _analyse_chunk(tasks):
+    return [analyse(*task) for task in tasks]
+
+
+def iter_plans(paths, touched=None, workers=1, index=()):
+    """
+    Yield the FilePlan of each path in order. touched maps a path to its
+    touched line ranges (omitted paths are analysed whole); the plans of the
+    paths in index carry their symbol index entry. With workers > 1
+    the files are analysed in that many processes while earlier plans are
+    being consumed, at most WINDOW chunks per worker ahead; closing the
+    generator early cancels the chunks not yet started.
+    """
+    touched = touched or {}
+    index = set(index)
+    tasks = ((str(p), touched.get(p), p in index) for p in paths)
+    if workers <= 1:
+        for task in tasks:
+            yield _analyse(task)
+        return
+    chunks = iter(lambda: list(islice(tasks, CHUNK_SIZE)), [])
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque(pool.submit(_analyse_chunk, chunk) for chunk in islice(chunks, WINDOW * workers))
+        while pending:
+            plans = pending.popleft().result()
+            for chunk in islice(chunks, 1):
+                pending.append(pool.submit(_analyse_chunk, chunk))
+            yield from plans
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def apply(lines, insertions, docs):
+    """
+    Return lines with each docstring in docs ({Insertion: quoted docstring})
+    inserted above its definition's first statement.
+    """
+    new_lines = list(lines)
+    # Bottom-up, so earlier insertions do not shift later line numbers
+    for ins in sorted(insertions, key=lambda i: i.line, reverse=True):
+        if ins in docs:
+            new_lines[ins.line - 1:ins.line - 1] = [ins.indent + dl for dl in docs[ins].splitlines()]
+    return new_lines
@@ -0,0 +1,48 @@
+"""
+Resolve the files (and line ranges) touched in git, for --changed-since/--staged.
+"""
+import re
+import subprocess
+from pathlib import Path
+
+_HUNK_RE = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+
+def _diff(args, ref=None, staged=False):
+    if staged:
+        cmd = ['git', 'diff', '--staged']
+    else:
+        cmd = ['git', 'diff', ref or 'HEAD']
+    # Paths relative to the working directory; deleted files cannot be processed
+    cmd += ['--relative', '--diff-filter=ACMR'] + args
+    run = subprocess.run(cmd, capture_output=True, text=True)
+    if run.returncode != 0:
+        raise RuntimeError(run.stderr.strip() or f'{" ".join(cmd)} failed')
+    return run.stdout
+
+
+def changed_lines(ref=None, staged=False):
+    """
+    Return {resolved path: [(start, end), ...]} of new-side line ranges touched
+    since ref, parsed from `git diff -U0`. Pure deletions are recorded as the
+    single line the hunk points at so the enclosing definition still counts.
+    """
+    out = _diff(['-U0', '--no-prefix', '--no-color'], ref=ref, staged=staged)
+    ranges = {}
+    current = None
+    for line in out.splitlines():
+        if line.startswith('+++ '):
+            current = Path(line[4:]).resolve()
+            ranges.setdefault(current, [])
+            continue
+        m = _HUNK_RE.match(line)
+        if m and current is not None:
+            start = int(m.group(1))
+            count = int(m.group(2)) if m.group(2) is not None else 1
+            ranges[current].append((start, start + max(count, 1) - 1))
+    return ranges
+
+
+def overlaps(ranges, start, end):
+    """Return True if any (a, b) in ranges intersects the line span start..end."""
+    return any(a <= end and b >= start for a, b in ranges)
@@ -0,0 +1,105 @@
+"""
+Append-only run journals that let long batch commands resume after a crash or Ctrl-C.
+
+Each command keeps one JSON-lines file. A run begins with a `start` record
+carrying a fingerprint of its settings and the command's parameters, and a
+`pending` record per item it plans to process, followed by one record per item
+as it completes (`done`) or fails (`failed`), and a `finish` record at the end.
+Failed items form the dead-letter queue that `retry-failed` reprocesses.
+Every record is flushed as it is written, so the journal is current up to the
+last finished item whatever stops the process.
+"""
+import json
+import os
+import time
+
+DEFAULT_JOURNAL_DIR = os.path.join('.codex-autotest', 'journal')
+
+
+class RunJournal:
+    """The journal of the latest run of one command."""
+
+    def __init__(self, command, directory=DEFAULT_JOURNAL_DIR):
+        self.command = command
+        self.path = os.path.join(directory, f'{command}.jsonl')
+        self._out = None
+        self.failures = 0
+
+    def read(self):
+        """Return (start record, {item: latest record}, finished) for the latest run, or (None, {}, False)."""
+        start, items, finished = None, {}, False
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash
+                        continue
+                    if record.get('status') == 'start':
+                        start, items, finished = record, {}, False
+                    elif record.get('status') == 'finish':
+                        finished = True
+                    elif 'item' in record:
+                        items[record['item']] = record
+        except OSError:
+            pass
+        return start, items, finished
+
+    def resumable(self, settings):
+        """Return {item: record} of the unfinished latest run with these settings, or None."""
+        start, items, finished = self.read()
+        if start is None or finished or start.get('settings') != settings:
+            return None
+        return items
+
+    def failed(self, settings):
+        """Return the failed items of the latest run with these settings, or None if it had other settings."""
+        start, items, _ = self.read()
+        if start is None or start.get('settings') != settings:
+            return None
+        return [item for item, record in items.items() if record.get('status') == 'failed']
+
+    def start(self, settings, resume=False, params=None, pending=()):
+        """
+        Open the journal: append to the current run when resuming, else begin
+        a new one with a start record and a pending record per item.
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if resume:
+            self._out = open(self.path, 'a')
+            if self._out.tell() and not _ends_with_newline(self.path):
+                # Terminate a line cut short by a crash so the next record parses
+                self._out.write('\n')
+        else:
+            self._out = open(self.path, 'w')
+            self._write({'status': 'start', 'settings': settings, 'params': params or {}})
+            for item in pending:
+                self.record(item, 'pending')
+
+    def record(self, item, status, **fields):
+        """Append the state of one item ('pending', 'done' or 'failed')."""
+        if status == 'failed':
+            self.failures += 1
+        fields = {name: value for name, value in fields.items() if value is not None}
+        self._write(dict(fields, item=str(item), status=status))
+
+    def finish(self):
+        self._write({'status': 'finish'})
+        self.close()
+
+    def close(self):
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+    def _write(self, record):
+        record['ts'] = round(time.time(), 3)
+        self._out.write(json.dumps(record, sort_keys=True) + '\n')
+        self._out.flush()
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
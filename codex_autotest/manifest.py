@@ -0,0 +1,76 @@
+"""
+Run manifest used by --incremental to skip source files whose inputs are unchanged.
+
+For every (command, source file) pair the manifest records a hash of the file
+content, a fingerprint of the prompt template and its parameters, the model
+and the artifact that was produced.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+DEFAULT_MANIFEST_PATH = os.path.join('.codex-autotest', 'manifest.json')
+
+
+def content_hash(text):
+    """Return the SHA-256 hex digest of text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def fingerprint(*parts):
+    """Return a stable hash for a prompt template and the parameters rendered into it."""
+    return content_hash(json.dumps([str(p) for p in parts]))
+
+
+class Manifest:
+    """Per-command record of the inputs and artifacts of previous runs."""
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        self.path = path
+        self.entries = {}
+        try:
+            with open(path) as f:
+                self.entries = json.load(f).get('commands', {})
+        except (OSError, ValueError):
+            self.entries = {}
+        self.dirty = False
+
+    def get(self, command, source):
+        """Return the recorded entry for source under command, or None."""
+        return self.entries.get(command, {}).get(str(source))
+
+    def is_current(self, command, source, content, prompt, model):
+        """Return True if source was processed with identical content, prompt and model."""
+        entry = self.get(command, source)
+        return bool(entry) and (
+            entry.get('content') == content_hash(content)
+            and entry.get('prompt') == prompt
+            and entry.get('model') == model
+        )
+
+    def record(self, command, source, content, prompt, model, artifact=None):
+        """Record that source was processed and produced artifact."""
+        self.entries.setdefault(command, {})[str(source)] = {
+            'content': content_hash(content),
+            'prompt': prompt,
+            'model': model,
+            'artifact': artifact,
+        }
+        self.dirty = True
+
+    def save(self):
+        """Atomically write the manifest if anything was recorded."""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version': 1, 'commands': self.entries}, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self.dirty = False
@@ -0,0 +1,253 @@
+"""
+Local OpenAI-compatible stand-in server for benchmarks and offline runs.
+
+Serves POST /v1/chat/completions over HTTP/1.1 keep-alive connections with a
+configurable latency, error rate and response size; `stream: true` requests
+are answered with server-sent events, one word per chunk. Point the client at it with
+the `http.base_url` config key:
+
+    python -m codex_autotest.mock_server --port 8000 --latency 0.2 --error-rate 0.01
+    # http:
+    #   base_url: http://127.0.0.1:8000/v1
+
+With --complete-batch it instead answers a `--bulk-export` jobs file offline,
+writing a results file in the Batch API output format for `--bulk-import`:
+
+    python -m codex_autotest.mock_server --complete-batch jobs.jsonl results.jsonl
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .tokens import estimate_tokens
+
+DEFAULT_RESPONSE = 'def test_placeholder():\n    pass\n'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; don't let Nagle delay the body
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, n, model, content):
+        """Send content as server-sent chat.completion.chunk events, one per word."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        pieces = re.findall(r'\s*\S+\s*', content) or ['']
+        for i, piece in enumerate(pieces):
+            if i and self.server.stream_delay:
+                time.sleep(self.server.stream_delay)
+            event = {
+                'id': f'chatcmpl-mock-{n}',
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}],
+            }
+            self._write_chunk(f'data: {json.dumps(event)}\n\n')
+        self._write_chunk('data: [DONE]\n\n')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def do_POST(self):
+        started = time.monotonic()
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send(400, {'error': {'message': 'invalid JSON body'}})
+            return
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send(404, {'error': {'message': f'unknown path {self.path}'}})
+            return
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            n = server.requests
+            failing = server.error_rate and server.random.random() < server.error_rate
+        if server.latency:
+            time.sleep(server.latency)
+        if failing:
+            with server.lock:
+                server.errors += 1
+            status = server.error_status
+            headers = {'Retry-After': '0'} if status == 429 else None
+            self._send(status, {'error': {'message': 'mock failure', 'type': 'server_error'}}, headers)
+        elif request.get('stream'):
+            self._send_stream(n, request.get('model', 'mock'), server.content())
+        else:
+            content = server.content()
+            prompt = ' '.join(str(m.get('content', '')) for m in request.get('messages', []))
+            usage = {'prompt_tokens': estimate_tokens(prompt), 'completion_tokens': estimate_tokens(content)}
+            usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+            self._send(200, {
+                'id': f'chatcmpl-mock-{n}',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': request.get('model', 'mock'),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop',
+                }],
+                'usage': usage,
+            })
+        with server.lock:
+            server.intervals.append((started, time.monotonic()))
+
+
+class MockServer(ThreadingHTTPServer):
+    """Threaded mock chat completions server; use as a context manager to run it in the background."""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, response=DEFAULT_RESPONSE,
+                 error_rate=0.0, error_status=500, response_size=None, seed=None, stream_delay=0.0):
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.response = response
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.response_size = response_size
+        # Pause between streamed words
+        self.stream_delay = stream_delay
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.connections = set()
+        self.intervals = []
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def content(self):
+        """Return the completion text, padded with comment lines to response_size bytes."""
+        if not self.response_size or len(self.response) >= self.response_size:
+            return self.response
+        padding = '# ' + 'x' * 77 + '\n'
+        missing = self.response_size - len(self.response)
+        return self.response + (padding * (missing // len(padding) + 1))[:missing]
+
+    def busy_time(self):
+        """Return the wall-clock seconds during which at least one request was being served."""
+        total = 0.0
+        end = None
+        for a, b in sorted(self.intervals):
+            if end is None or a > end:
+                total += b - a
+                end = b
+            elif b > end:
+                total += b - end
+                end = b
+        return total
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def complete_batch(jobs_path, results_path, response=DEFAULT_RESPONSE):
+    """
+    Answer every request of a batch input file and write the Batch API output
+    file. response is the completion text, or a function of the request body
+    that returns it. Returns the number of requests answered.
+    """
+    count = 0
+    with open(jobs_path) as jobs, open(results_path, 'w') as out:
+        for line in jobs:
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            count += 1
+            content = response(job['body']) if callable(response) else response
+            out.write(json.dumps({
+                'id': f'batch_req_mock_{count}',
+                'custom_id': job['custom_id'],
+                'response': {
+                    'status_code': 200,
+                    'request_id': f'req_mock_{count}',
+                    'body': {
+                        'id': f'chatcmpl-mock-{count}',
+                        'object': 'chat.completion',
+                        'model': job['body'].get('model', 'mock'),
+                        'choices': [{
+                            'index': 0,
+                            'message': {'role': 'assistant', 'content': content},
+                            'finish_reason': 'stop',
+                        }],
+                    },
+                },
+                'error': None,
+            }) + '\n')
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a local OpenAI-compatible mock server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before answering')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    parser.add_argument('--error-status', type=int, default=500, help='HTTP status of failed requests')
+    parser.add_argument('--response-size', type=int, default=None, help='Pad completions to this many bytes')
+    parser.add_argument('--stream-delay', type=float, default=0.0, help='Seconds between streamed words')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--complete-batch', nargs=2, metavar=('JOBS', 'RESULTS'), default=None,
+                        help='Answer a batch jobs file offline instead of serving')
+    args = parser.parse_args(argv)
+    if args.complete_batch:
+        count = complete_batch(*args.complete_batch)
+        print(f'Answered {count} request(s) in {args.complete_batch[1]}')
+        return
+    server = MockServer(args.host, args.port, latency=args.latency, error_rate=args.error_rate,
+                        error_status=args.error_status, response_size=args.response_size, seed=args.seed,
+                        stream_delay=args.stream_delay)
+    print(f'Serving mock chat completions on {server.base_url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Mutation-status cache used by `mutate` to avoid re-running mutmut on unchanged modules.
+
+Each source file's mutmut results are stored under a key made of the file's
+content hash and a hash of the test files relevant to it (those that mention
+its module name, plus every conftest.py). Only files whose key changed are
+handed to `mutmut run`; the statuses of the others come from the cache. The
+test files are found under pytest's `testpaths`.
+"""
+import configparser
+import glob
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from .discovery import discover
+from .manifest import content_hash, fingerprint
+
+DEFAULT_MUTATION_CACHE_PATH = os.path.join('.codex-autotest', 'mutations.json')
+DEFAULT_TEST_ROOTS = ('tests',)
+# pytest's configuration files in its lookup order, with the section holding its options
+PYTEST_CONFIGS = (('pytest.ini', 'pytest'), ('pyproject.toml', 'tool.pytest.ini_options'),
+                  ('tox.ini', 'pytest'), ('setup.cfg', 'tool:pytest'))
+
+
+def _read(path):
+    try:
+        return Path(path).read_text(encoding='utf-8', errors='replace')
+    except OSError:
+        return ''
+
+
+def _pytest_options(path, section):
+    """Return the pytest options in section of the config file at path, or None if it has none."""
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                return None
+        try:
+            with open(path, 'rb') as f:
+                data = tomllib.load(f)
+        except (OSError, ValueError):
+            return None
+        for key in section.split('.'):
+            data = data.get(key) if isinstance(data, dict) else None
+        return data if isinstance(data, dict) else None
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read(path, encoding='utf-8')
+    except configparser.Error:
+        return None
+    return dict(parser[section]) if parser.has_section(section) else None
+
+
+def pytest_testpaths(root='.'):
+    """
+    Return the test directories under root named by `testpaths` in the first
+    pytest configuration file that has pytest options, or DEFAULT_TEST_ROOTS.
+    """
+    for name, section in PYTEST_CONFIGS:
+        path = os.path.join(root, name)
+        options = _pytest_options(path, section) if os.path.isfile(path) else None
+        if options is None:
+            continue
+        value = options.get('testpaths') or []
+        patterns = value.split() if isinstance(value, str) else [str(v) for v in value]
+        if patterns:
+            roots = []
+            for pattern in patterns:
+                pattern = os.path.join(root, pattern)
+                roots.extend(sorted(glob.glob(pattern)) or [pattern])
+            return [os.path.normpath(r) for r in roots]
+        break
+    return [os.path.normpath(os.path.join(root, r)) for r in DEFAULT_TEST_ROOTS]
+
+
+def find_tests(config=None, root='.'):
+    """
+    Return {path: text} for the Python files under the test roots. Only
+    .gitignore and the built-in excludes apply: the `discovery` include and
+    exclude globs and size limits select sources, not tests.
+    """
+    settings = (config or {}).get('discovery') or {}
+    only_ignored = {'discovery': {'gitignore': settings.get('gitignore', True), 'max_file_size_kb': 0,
+                                  'skip_generated': False}}
+    tests = {}
+    for directory in pytest_testpaths(root):
+        if os.path.exists(directory):
+            for f in discover(directory, '.py', only_ignored):
+                tests[os.path.normpath(f)] = _read(f)
+    return tests
+
+
+def relevant_tests(source, tests):
+    """
+    Return the paths in tests (a {path: text} dict) that may exercise source:
+    conftest.py files and files mentioning the module name as a word.
+    """
+    name = re.compile(r'\b' + re.escape(Path(source).stem) + r'\b')
+    return sorted(p for p, text in tests.items() if Path(p).name == 'conftest.py' or name.search(text))
+
+
+def source_key(source, tests):
+    """Return the cache key for source given the test files' {path: text}."""
+    parts = [content_hash(_read(source))]
+    for path in relevant_tests(source, tests):
+        parts.extend([str(path), content_hash(tests[path])])
+    return fingerprint(*parts)
+
+
+class MutationCache:
+    """Per-source-file mutmut results, valid while the source and its tests are unchanged."""
+
+    def __init__(self, path=DEFAULT_MUTATION_CACHE_PATH):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.entries = json.load(f).get('files', {})
+        except (OSError, ValueError):
+            self.entries = {}
+        self.dirty = False
+
+    def get(self, source, key):
+        """Return the cached mutant results for source, or None if missing or stale."""
+        entry = self.entries.get(str(source))
+        if entry and entry.get('key') == key:
+            return entry.get('mutants', [])
+        return None
+
+    def put(self, source, key, mutants):
+        self.entries[str(source)] = {'key': key, 'mutants': list(mutants)}
+        self.dirty = True
+
+    def save(self):
+        """Atomically write the cache if anything changed."""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version': 1, 'files': self.entries}, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self.dirty = False
@@ -0,0 +1,102 @@
+"""
+Group surviving mutants by file and enclosing function for `mutate --group`.
+
+The mutated line is read from the hunk header of the `mutmut show` diff and
+resolved to the innermost top-level function, class or method around it, so
+that all mutants of one function can be killed by a single request and test
+module.
+"""
+import hashlib
+import os
+import re
+from pathlib import Path
+from string import Template
+from .astwalk import iter_definitions, node_span, parse
+
+MODULE_SCOPE = '<module>'
+
+DEFAULT_GROUP_PROMPT = (
+    'Write one {framework} test module in {language} that kills each of the following '
+    'mutants of {scope} in {filename}. Each mutant is shown as a diff against the '
+    'original code:\n\n'
+    '{diffs}'
+)
+
+_HUNK_RE = re.compile(r'^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@', re.MULTILINE)
+
+
+def mutant_line(diff):
+    """Return the first original line changed by diff, or None if it has no hunk."""
+    lines = diff.splitlines()
+    for i, line in enumerate(lines):
+        match = _HUNK_RE.match(line)
+        if not match:
+            continue
+        lineno = int(match.group(1))
+        for body in lines[i + 1:]:
+            if body.startswith(('-', '+')) and not body.startswith(('---', '+++')):
+                return lineno
+            lineno += 1
+        return int(match.group(1))
+    return None
+
+
+def enclosing_scope(tree, line):
+    """Return the qualified name of the definition containing line, or MODULE_SCOPE."""
+    scope = MODULE_SCOPE
+    if tree is None or line is None:
+        return scope
+    classes = {}
+    for node, obj_type in iter_definitions(tree):
+        first, last = node_span(node)
+        if obj_type == 'class':
+            for child in node.body:
+                classes[child] = node.name
+        if first <= line <= last:
+            # Methods follow their class, so the innermost match wins
+            scope = f'{classes[node]}.{node.name}' if obj_type == 'method' else node.name
+    return scope
+
+
+def group_mutants(shown):
+    """
+    Group (mutant, diff) pairs into [(filename, scope, [(mutant, diff), ...])]
+    in the order each group first appears. Each source file is parsed once.
+    """
+    trees = {}
+    groups = {}
+    for m, diff in shown:
+        filename = m.get('filename')
+        if filename not in trees:
+            try:
+                trees[filename] = parse(Path(filename).read_text())
+            except (OSError, SyntaxError, ValueError):
+                trees[filename] = None
+        scope = enclosing_scope(trees[filename], mutant_line(diff))
+        groups.setdefault((filename, scope), []).append((m, diff))
+    return [(filename, scope, members) for (filename, scope), members in groups.items()]
+
+
+def kill_test_path(filename, scope, root='.'):
+    """
+    Return the consolidated kill-test module for the mutants of scope in
+    filename, mirrored under tests/ by its package path relative to root (the
+    mutated source path), so same-named modules in different packages do not
+    share a test module.
+    """
+    name = 'module' if scope == MODULE_SCOPE else scope.replace('.', '_')
+    rel = Path(os.path.relpath(filename, root))
+    if rel.parts[:1] == ('..',):
+        # Outside root: keep the name unique with a digest of the path
+        digest = hashlib.sha256(os.path.normpath(filename).encode('utf-8')).hexdigest()[:8]
+        return Path('tests') / f'test_mutants_{rel.stem}_{digest}_{name}.py'
+    return Path('tests') / rel.parent / f'test_mutants_{rel.stem}_{name}.py'
+
+
+def render(template, language, framework, filename, scope, members):
+    """Render the grouped kill prompt; each diff is listed under a `### Mutant <id>` heading."""
+    diffs = '\n\n'.join(f'### Mutant {m.get("id")}\n{diff}' for m, diff in members)
+    values = dict(language=language, framework=framework, filename=filename, scope=scope, diffs=diffs)
+    if '$' in template:
+        return Template(template).safe_substitute(**values)
+    return template.format(**values)
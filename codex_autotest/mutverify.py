@@ -0,0 +1,174 @@
+"""
+Verify that generated kill tests actually kill their mutant.
+
+Each check runs in a throwaway copy of the project: the new test file must pass
+against the original code and fail once the mutant's diff (as printed by
+`mutmut show`) is applied. Only the new test file is run.
+"""
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import namedtuple
+from .discovery import DEFAULT_EXCLUDE_DIRS, ROOT_EXCLUDE_DIRS
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_TIMEOUT = 120
+# Test output attached to regeneration prompts is cut to this many characters
+MAX_FEEDBACK_CHARS = 4000
+
+Verdict = namedtuple('Verdict', 'killed output')
+_HUNK_RE = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+def _diff_path(header):
+    path = header[4:].split('\t')[0].strip()
+    if path.startswith(('a/', 'b/')) and not os.path.exists(path):
+        path = path[2:]
+    return path
+
+
+def apply_unified_diff(diff, root):
+    """
+    Apply a single-file unified diff to the copy of the project at root.
+    Hunks are located by their context, searching outwards from the line the
+    header points at. Returns (patched path, original text); raises
+    ValueError if a hunk does not apply.
+    """
+    lines = diff.splitlines()
+    target = None
+    hunks = []
+    for line in lines:
+        if line.startswith('+++ '):
+            target = _diff_path(line)
+        elif line.startswith('--- ') and target is None:
+            target = _diff_path(line)
+        elif _HUNK_RE.match(line):
+            hunks.append((int(_HUNK_RE.match(line).group(1)), [], []))
+        elif hunks and line[:1] in (' ', '-', '+', ''):
+            start, old, new = hunks[-1]
+            text = line[1:]
+            if line[:1] in (' ', ''):
+                old.append(text)
+                new.append(text)
+            elif line[:1] == '-':
+                old.append(text)
+            else:
+                new.append(text)
+    if target is None or not hunks:
+        raise ValueError('No file or hunks found in mutant diff')
+    path = os.path.join(root, target)
+    with open(path) as f:
+        original = f.read()
+    source = original.splitlines()
+    # Apply bottom-up so earlier hunks' line numbers stay valid
+    for start, old, new in sorted(hunks, key=lambda h: h[0], reverse=True):
+        hint = max(start - 1, 0)
+        at = None
+        for offset in range(len(source) + 1):
+            for pos in (hint - offset, hint + offset):
+                if 0 <= pos <= len(source) - len(old) and source[pos:pos + len(old)] == old:
+                    at = pos
+                    break
+            if at is not None:
+                break
+        if at is None:
+            raise ValueError(f'Mutant diff does not apply to {target} near line {start}')
+        source[at:at + len(old)] = new
+    with open(path, 'w') as f:
+        f.write('\n'.join(source) + '\n')
+    return path, original
+
+
+def import_path(root, src_path=None):
+    """
+    Return a PYTHONPATH that puts src_path (e.g. the `src` of a src-layout
+    project, or the directory of a single source file) and root, both resolved
+    against root, ahead of the inherited one.
+    """
+    entries = []
+    if src_path:
+        src = os.path.join(root, src_path)
+        entries.append(os.path.abspath(src if os.path.isdir(src) else os.path.dirname(src)))
+    entries.append(os.path.abspath(root))
+    inherited = os.environ.get('PYTHONPATH')
+    if inherited:
+        entries.append(inherited)
+    return os.pathsep.join(dict.fromkeys(entries))
+
+
+def run_test(root, test_rel, timeout=DEFAULT_TIMEOUT, src_path=None):
+    """
+    Run one test file with pytest in root, importing the project's code from
+    root and src_path; return (exit status or None on timeout, output tail).
+    """
+    cmd = [sys.executable, '-m', 'pytest', '-x', '-q', '-p', 'no:cacheprovider', test_rel]
+    env = dict(os.environ, PYTHONPATH=import_path(root, src_path))
+    try:
+        run = subprocess.run(cmd, cwd=root, capture_output=True, text=True, timeout=timeout, env=env)
+    except subprocess.TimeoutExpired:
+        return None, f'Timed out after {timeout}s'
+    return run.returncode, (run.stdout + run.stderr)[-MAX_FEEDBACK_CHARS:]
+
+
+class Sandbox:
+    """
+    A temporary copy of the project used to check kill tests for one mutant.
+    Tests import the copy's code from src_path (relative to project_root) and
+    the copy's root, never the installed or original project.
+    """
+
+    def __init__(self, project_root='.', src_path=None):
+        self.tmp = tempfile.mkdtemp(prefix='codex-autotest-verify-')
+        self.root = os.path.join(self.tmp, 'project')
+        self.src_path = src_path
+        top = os.path.abspath(project_root)
+        def ignore(directory, names):
+            excluded = DEFAULT_EXCLUDE_DIRS + (ROOT_EXCLUDE_DIRS if os.path.abspath(directory) == top else ())
+            return [n for n in names if n in excluded]
+        shutil.copytree(project_root, self.root, ignore=ignore, symlinks=True)
+
+    def verify(self, test_rel, test_code, diff, timeout=DEFAULT_TIMEOUT):
+        """
+        Return a Verdict for test_code written at test_rel: killed is True only
+        if the test passes on the original code and fails on the mutant. diff
+        may be a list of mutant diffs, each of which must be killed.
+        """
+        test_path = os.path.join(self.root, test_rel)
+        os.makedirs(os.path.dirname(test_path), exist_ok=True)
+        with open(test_path, 'w') as f:
+            f.write(test_code)
+        status, output = run_test(self.root, test_rel, timeout, self.src_path)
+        if status != 0:
+            return Verdict(False, 'The test fails against the original (unmutated) code:\n' + output)
+        diffs = [diff] if isinstance(diff, str) else list(diff)
+        problems = []
+        for i, mutant in enumerate(diffs, 1):
+            label = 'the mutant' if len(diffs) == 1 else f'mutant {i}'
+            try:
+                patched, original = apply_unified_diff(mutant, self.root)
+            except (OSError, ValueError) as e:
+                problems.append(f'Could not apply {label}: {e}')
+                continue
+            try:
+                status, output = run_test(self.root, test_rel, timeout, self.src_path)
+            finally:
+                # Restore the original source for the next mutant or attempt
+                with open(patched, 'w') as f:
+                    f.write(original)
+            if status == 0:
+                problems.append(f'The test passes against {label}, so it does not kill it:\n' + output)
+        if problems:
+            return Verdict(False, '\n\n'.join(problems)[-MAX_FEEDBACK_CHARS:])
+        return Verdict(True, output)
+
+    def close(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,6 +1,26 @@
 import os
+import threading
 import time
-from functools import lru_cache
+from . import telemetry
+from .cache import ResponseCache, cache_key
+from .tokens import DEFAULT_MAX_TOKENS, completion_budget, count_tokens, prompt_tokens
+from .ratelimit import RateLimiter, is_rate_limited, retry_after
+
+DEFAULT_MODEL = 'gpt-3.5-turbo'
+
+# Process-wide cache settings, adjusted by the CLI's --no-cache/--refresh flags
+_cache_settings = {'enabled': True, 'refresh': False}
+_cache = None
+# Shared by all threads issuing requests; replaced by configure_rate_limit()
+_limiter = RateLimiter()
+# Long-lived API clients, created on first use and shared by every command;
+# the async client is stored with the event loop its connections belong to
+DEFAULT_POOL_SIZE = 10
+_client_settings = {'pool_size': DEFAULT_POOL_SIZE, 'base_url': None, 'timeout': 600.0}
+_clients = {}
+_client_lock = threading.Lock()
+# Answers chat_completion requests instead of the API when set (--bulk-import)
+_responses = None
 
 def _get_api_key():
     key = os.getenv('OPENAI_API_KEY')
@@ -8,29 +28,362 @@ def _get_api_key():
         raise EnvironmentError('OPENAI_API_KEY is not set')
     return key
 
-@lru_cache(maxsize=128)
-def chat_completion(prompt, model='gpt-3.5-turbo', max_tokens=1024, retries=3, backoff=1):
+def configure_cache(enabled=None, refresh=None, cache=None):
+    """Enable/disable the response cache, force refreshes, or install a cache instance."""
+    global _cache
+    if enabled is not None:
+        _cache_settings['enabled'] = enabled
+    if refresh is not None:
+        _cache_settings['refresh'] = refresh
+    if cache is not None:
+        _cache = cache
+
+def configure_responses(source=None):
     """
-    Send a chat completion request with retries and caching.
-    Caches responses by (prompt, model, max_tokens).
+    Answer chat_completion requests with source(prompt, model=, max_tokens=)
+    instead of the cache and the API, or go back to the API when source is None.
     """
+    global _responses
+    _responses = source
+
+def get_cache():
+    """Return the active response cache, or None when caching is disabled."""
+    global _cache
+    if not _cache_settings['enabled']:
+        return None
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+def configure_rate_limit(rpm=None, tpm=None, max_concurrency=None):
+    """Install a process-wide rate limiter with the given RPM/TPM quotas and concurrency ceiling."""
+    global _limiter
+    _limiter = RateLimiter(rpm=rpm, tpm=tpm, max_concurrency=max_concurrency)
+    return _limiter
+
+def get_rate_limiter():
+    """Return the process-wide rate limiter."""
+    return _limiter
+
+def configure_client(pool_size=None, base_url=None, timeout=None):
+    """
+    Update the settings of the shared API clients. Clients created with
+    different settings are closed and rebuilt on next use.
+    """
+    changed = False
+    for name, value in (('pool_size', pool_size), ('base_url', base_url), ('timeout', timeout)):
+        if value is not None and _client_settings[name] != value:
+            _client_settings[name] = value
+            changed = True
+    if changed:
+        close_clients()
+
+def ensure_pool_size(size):
+    """Grow the connection pool so `size` concurrent requests each get a keep-alive connection."""
+    if size > _client_settings['pool_size']:
+        configure_client(pool_size=size)
+
+def _http_client(factory, pool_size):
+    """Return an HTTP client from factory pooling pool_size keep-alive connections, or None for the SDK default."""
+    try:
+        import httpx
+    except ImportError:
+        return None
+    return factory(limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size))
+
+def _build_client(async_=False):
     import openai
-    api_key = _get_api_key()
-    openai.api_key = api_key
+    kwargs = {
+        'api_key': _get_api_key(),
+        'timeout': _client_settings['timeout'],
+        # Retries are handled by chat_completion so they pass through the rate limiter
+        'max_retries': 0,
+    }
+    if _client_settings['base_url']:
+        kwargs['base_url'] = _client_settings['base_url']
+    if async_:
+        http_client = _http_client(openai.DefaultAsyncHttpxClient, _client_settings['pool_size'])
+        cls = openai.AsyncOpenAI
+    else:
+        http_client = _http_client(openai.DefaultHttpxClient, _client_settings['pool_size'])
+        cls = openai.OpenAI
+    if http_client is not None:
+        kwargs['http_client'] = http_client
+    return cls(**kwargs)
+
+def get_client():
+    """Return the shared synchronous OpenAI client, creating it on first use."""
+    with _client_lock:
+        if 'sync' not in _clients:
+            _clients['sync'] = _build_client()
+        return _clients['sync']
+
+def get_async_client():
+    """
+    Return the AsyncOpenAI client of the running event loop, creating it on
+    first use. Its connections belong to that loop, so a client left over from
+    another loop (e.g. an earlier asyncio.run) is closed and replaced.
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        owner, client = _clients.get('async', (None, None))
+        if owner is loop:
+            return client
+        _clients['async'] = (loop, _build_client(async_=True))
+        current = _clients['async'][1]
+    if client is not None:
+        _close_async(owner, client)
+    return current
+
+def _close_async(loop, client):
+    """Close an AsyncOpenAI client on the event loop that owns its connections."""
+    import asyncio
+    if loop.is_closed():
+        # Its transports went with the loop; nothing is left to await
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        loop.create_task(client.close())
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.close(), loop)
+    else:
+        loop.run_until_complete(client.close())
+
+def close_clients():
+    """Close the shared clients and their connection pools."""
+    with _client_lock:
+        clients = list(_clients.items())
+        _clients.clear()
+    for kind, client in clients:
+        if kind == 'sync':
+            client.close()
+        else:
+            _close_async(*client)
+
+def _prepare(prompt, model, max_tokens, refresh=False):
+    """
+    Size the request and look it up in the cache (unless refreshing, per call
+    or with --refresh). Returns (n_prompt, max_tokens, cache, key, cached).
+    """
+    n_prompt = prompt_tokens(prompt, model)
+    max_tokens = completion_budget(n_prompt, model, cap=max_tokens or DEFAULT_MAX_TOKENS)
+    cache = get_cache()
+    key = cache_key(model, max_tokens, prompt)
+    cached = None
+    if cache is not None and not (refresh or _cache_settings['refresh']):
+        cached = cache.get(key)
+    return n_prompt, max_tokens, cache, key, cached
+
+def _cache_state(cache, cached, refresh=False):
+    if cached is not None:
+        return 'hit'
+    if cache is None:
+        return 'off'
+    return 'refresh' if refresh or _cache_settings['refresh'] else 'miss'
+
+def _record_request(model, n_prompt, cache_state, started, queue=0.0, api=0.0, attempts=0,
+                    response=None, content=None, error=None, **fields):
+    """Report one chat_completion call to the active telemetry collector."""
+    tel = telemetry.get()
+    if tel is None:
+        return
+    completion = getattr(getattr(response, 'usage', None), 'completion_tokens', None)
+    if completion is None and content is not None:
+        completion = count_tokens(content, model)
+    tel.count('requests')
+    tel.count('cache_hits' if cache_state == 'hit' else 'cache_misses')
+    tel.count('retries', max(attempts - 1, 0))
+    tel.count('prompt_tokens', n_prompt)
+    tel.count('completion_tokens', completion or 0)
+    if error is not None:
+        tel.count('errors')
+    if queue:
+        tel.add_phase('queue', queue)
+    if attempts:
+        tel.add_phase('api', api)
+    tel.event('request', model=model, cache=cache_state, latency=round(time.perf_counter() - started, 6),
+              queue=round(queue, 6), api=round(api, 6), retries=max(attempts - 1, 0),
+              prompt_tokens=n_prompt, completion_tokens=completion,
+              ok=error is None, error=None if error is None else type(error).__name__, **fields)
+
+def chat_completion(prompt, model=DEFAULT_MODEL, max_tokens=None, retries=3, backoff=1, refresh=False):
+    """
+    Send a chat completion request with retries and caching.
+    Responses are cached on disk by (model, max_tokens, prompt).
+    When max_tokens is None it is sized to fit the prompt in the model's context
+    window; prompts that do not fit raise PromptTooLargeError without a request.
+    Requests pass through the shared rate limiter; 429 responses honour the
+    server's Retry-After hint and reduce concurrency. refresh=True skips the
+    cache lookup for this call and stores the fresh response.
+    """
+    source = _responses
+    if source is not None:
+        return source(prompt, model=model, max_tokens=max_tokens)
+    started = time.perf_counter()
+    n_prompt, max_tokens, cache, key, cached = _prepare(prompt, model, max_tokens, refresh)
+    state = _cache_state(cache, cached, refresh)
+    if cached is not None:
+        _record_request(model, n_prompt, state, started)
+        return cached
+    client = get_client()
+    limiter = _limiter
+    queue = api = 0.0
     last_exc = None
     for attempt in range(1, retries + 1):
+        # TPM is charged for the prompt plus the largest possible completion
+        t0 = time.perf_counter()
+        limiter.acquire(n_prompt + max_tokens)
+        t1 = time.perf_counter()
+        queue += t1 - t0
         try:
-            response = openai.ChatCompletion.create(
+            response = client.chat.completions.create(
                 model=model,
                 messages=[{'role': 'user', 'content': prompt}],
                 max_tokens=max_tokens,
             )
-            return response['choices'][0]['message']['content']
+            content = response.choices[0].message.content
         except Exception as e:
+            api += time.perf_counter() - t1
             last_exc = e
+            hint = retry_after(e)
+            limiter.release(ok=False, rate_limited=is_rate_limited(e), retry_after=hint)
             if attempt < retries:
-                time.sleep(backoff * (2 ** (attempt - 1)))
-            else:
-                raise
+                # With a Retry-After hint the limiter pauses every request, this one included
+                if hint is None:
+                    time.sleep(limiter.backoff(attempt, backoff))
+                continue
+            _record_request(model, n_prompt, state, started, queue, api, attempt, error=e)
+            raise
+        api += time.perf_counter() - t1
+        limiter.release()
+        if cache is not None:
+            cache.set(key, content, model=model, max_tokens=max_tokens)
+        _record_request(model, n_prompt, state, started, queue, api, attempt, response, content)
+        return content
     # fallback
-    raise last_exc
\ No newline at end of file
+    raise last_exc
+
+def stream_completion(prompt, model=DEFAULT_MODEL, max_tokens=None, retries=3, backoff=1):
+    """
+    Streaming variant of chat_completion: yield the completion as text deltas
+    as they arrive. Cached responses are yielded whole and completed streams
+    are cached. Failures are retried only before the first delta. Closing the
+    generator, or a KeyboardInterrupt while reading, closes the HTTP stream.
+    """
+    started = time.perf_counter()
+    n_prompt, max_tokens, cache, key, cached = _prepare(prompt, model, max_tokens)
+    state = _cache_state(cache, cached)
+    if cached is not None:
+        _record_request(model, n_prompt, state, started, stream=True)
+        yield cached
+        return
+    client = get_client()
+    limiter = _limiter
+    queue = api = 0.0
+    first = None
+    for attempt in range(1, retries + 1):
+        t0 = time.perf_counter()
+        limiter.acquire(n_prompt + max_tokens)
+        t1 = time.perf_counter()
+        queue += t1 - t0
+        stream = None
+        parts = []
+        done = failed = False
+        try:
+            stream = client.chat.completions.create(
+                model=model,
+                messages=[{'role': 'user', 'content': prompt}],
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if first is None:
+                        first = round(time.perf_counter() - started, 6)
+                    parts.append(delta)
+                    yield delta
+            done = True
+        except Exception as e:
+            failed = True
+            api += time.perf_counter() - t1
+            hint = retry_after(e)
+            limiter.release(ok=False, rate_limited=is_rate_limited(e), retry_after=hint)
+            # Deltas already handed out cannot be taken back
+            if attempt < retries and not parts:
+                if hint is None:
+                    time.sleep(limiter.backoff(attempt, backoff))
+                continue
+            _record_request(model, n_prompt, state, started, queue, api, attempt, error=e,
+                            stream=True, first_token=first)
+            raise
+        finally:
+            if not done and not failed:
+                # Cancelled mid-stream: drop the connection rather than reading the rest
+                if stream is not None:
+                    stream.close()
+                limiter.release(ok=False)
+        api += time.perf_counter() - t1
+        limiter.release()
+        content = ''.join(parts)
+        if cache is not None:
+            cache.set(key, content, model=model, max_tokens=max_tokens)
+        _record_request(model, n_prompt, state, started, queue, api, attempt, content=content,
+                        stream=True, first_token=first)
+        return
+
+async def achat_completion(prompt, model=DEFAULT_MODEL, max_tokens=None, retries=3, backoff=1, refresh=False):
+    """
+    Asynchronous variant of chat_completion using the AsyncOpenAI client of
+    the running event loop. Honours the configured response source and
+    refresh=True like chat_completion.
+    """
+    import asyncio
+    source = _responses
+    if source is not None:
+        return source(prompt, model=model, max_tokens=max_tokens)
+    started = time.perf_counter()
+    n_prompt, max_tokens, cache, key, cached = _prepare(prompt, model, max_tokens, refresh)
+    state = _cache_state(cache, cached, refresh)
+    if cached is not None:
+        _record_request(model, n_prompt, state, started)
+        return cached
+    client = get_async_client()
+    limiter = _limiter
+    queue = api = 0.0
+    last_exc = None
+    for attempt in range(1, retries + 1):
+        # The limiter blocks, so wait for it off the event loop
+        t0 = time.perf_counter()
+        await asyncio.to_thread(limiter.acquire, n_prompt + max_tokens)
+        t1 = time.perf_counter()
+        queue += t1 - t0
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[{'role': 'user', 'content': prompt}],
+                max_tokens=max_tokens,
+            )
+            content = response.choices[0].message.content
+        except Exception as e:
+            api += time.perf_counter() - t1
+            last_exc = e
+            hint = retry_after(e)
+            limiter.release(ok=False, rate_limited=is_rate_limited(e), retry_after=hint)
+            if attempt < retries:
+                if hint is None:
+                    await asyncio.sleep(limiter.backoff(attempt, backoff))
+                continue
+            _record_request(model, n_prompt, state, started, queue, api, attempt, error=e)
+            raise
+        api += time.perf_counter() - t1
+        limiter.release()
+        if cache is not None:
+            cache.set(key, content, model=model, max_tokens=max_tokens)
+        _record_request(model, n_prompt, state, started, queue, api, attempt, response, content)
+        return content
+    raise last_exc
@@ -0,0 +1,117 @@
+"""
+Client-side rate limiting shared by every request in the process.
+
+A RateLimiter combines requests-per-minute and tokens-per-minute token buckets
+with an adaptive concurrency limit: the limit is halved when the server answers
+429 and raised again by one after a run of successful requests.
+"""
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate_per_minute, holding at most capacity."""
+
+    def __init__(self, rate_per_minute, capacity=None, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def reserve(self, amount):
+        """
+        Take amount from the bucket and return how many seconds the caller must
+        wait before the reservation is covered (0 if available now).
+        """
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # Requests bigger than the bucket would otherwise wait forever
+        self.tokens -= min(amount, self.capacity)
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class RateLimiter:
+    """Dual RPM/TPM limiter with 429-aware adaptive concurrency."""
+
+    def __init__(self, rpm=None, tpm=None, max_concurrency=None, min_concurrency=1,
+                 increase_after=10, clock=time.monotonic, sleep=None):
+        self.requests = TokenBucket(rpm, clock=clock) if rpm else None
+        self.tokens = TokenBucket(tpm, clock=clock) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.increase_after = increase_after
+        self.limit = max_concurrency
+        self.active = 0
+        self.peak = 0
+        self.successes = 0
+        self.paused_until = 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self._cond = threading.Condition()
+
+    def acquire(self, tokens=0):
+        """Block until a request costing `tokens` may be sent."""
+        with self._cond:
+            while self.limit is not None and self.active >= self.limit:
+                self._cond.wait()
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            wait = self.paused_until - self.clock()
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1))
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.reserve(tokens))
+        if wait > 0:
+            (self.sleep or time.sleep)(wait)
+
+    def release(self, ok=True, rate_limited=False, retry_after=None):
+        """Finish a request, adapting the concurrency limit to its outcome."""
+        with self._cond:
+            self.active -= 1
+            if rate_limited:
+                self.successes = 0
+                current = self.limit if self.limit is not None else max(self.peak, 1)
+                self.limit = max(self.min_concurrency, current // 2)
+                if retry_after:
+                    self.paused_until = max(self.paused_until, self.clock() + retry_after)
+            elif ok:
+                self.successes += 1
+                if self.limit is not None and self.successes >= self.increase_after:
+                    self.successes = 0
+                    self.limit += 1
+                    if self.max_concurrency is None and self.limit > self.peak:
+                        self.limit = None
+                    elif self.max_concurrency is not None:
+                        self.limit = min(self.limit, self.max_concurrency)
+            self._cond.notify_all()
+
+    @staticmethod
+    def backoff(attempt, base=1):
+        """Exponential backoff with equal jitter for the given 1-based attempt."""
+        delay = base * (2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+def is_rate_limited(exc):
+    """Return True if exc is an HTTP 429 / rate-limit error from the API client."""
+    status = getattr(exc, 'status_code', None) or getattr(getattr(exc, 'response', None), 'status_code', None)
+    return status == 429 or type(exc).__name__ == 'RateLimitError'
+
+
+def retry_after(exc):
+    """Return the server's Retry-After hint in seconds for exc, or None."""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None) or getattr(exc, 'headers', None)
+    if not headers:
+        return None
+    headers = {str(k).lower(): v for k, v in headers.items()}
+    try:
+        if headers.get('retry-after-ms') is not None:
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after') is not None:
+            return float(headers['retry-after'])
+    except (TypeError, ValueError):
+        return None
+    return None
@@ -0,0 +1,164 @@
+"""
+Persistent index of the modules, classes, functions and imports of Python files.
+
+For every indexed file the index records its modification time, size and
+content hash, its imports, and for each top-level function and class and each
+method (see astwalk.iter_definitions): the qualified name, kind, line range,
+first body line, whether it has a docstring and a hash of its source. An entry
+is reused while the file's mtime and size are unchanged, or when its content
+hash still matches, so a run only reads and parses the files that changed.
+"""
+import ast
+import json
+import os
+import tempfile
+from pathlib import Path
+from . import telemetry
+from .astwalk import iter_definitions, node_span, parse
+from .manifest import content_hash
+
+DEFAULT_INDEX_PATH = os.path.join('.codex-autotest', 'symbols.json')
+
+
+def _imports(tree):
+    """Return the module names imported by tree; relative imports keep their leading dots."""
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            module = '.' * node.level + (node.module or '')
+            names.append(module)
+            # `from pkg import mod` may import a submodule
+            names.extend(f'{module}.{alias.name}' if node.module else module + alias.name
+                         for alias in node.names if alias.name != '*')
+    return sorted(set(names))
+
+
+def scan(source):
+    """Return the index record of source text: its symbols and imports, or the syntax error."""
+    try:
+        tree = parse(source)
+    except (SyntaxError, ValueError) as e:
+        return {'symbols': [], 'imports': [], 'error': str(e)}
+    lines = source.splitlines()
+    symbols = []
+    owner = {}
+    for node, kind in iter_definitions(tree):
+        if kind == 'class':
+            for child in node.body:
+                owner[child] = node.name
+        start, end = node_span(node)
+        symbols.append({
+            'name': node.name,
+            'qualname': f'{owner[node]}.{node.name}' if kind == 'method' else node.name,
+            'kind': kind,
+            'start': start,
+            'end': end,
+            'body': node.body[0].lineno if node.body else None,
+            'docstring': ast.get_docstring(node, clean=False) is not None,
+            'hash': content_hash('\n'.join(lines[start - 1:end])),
+        })
+    return {'symbols': symbols, 'imports': _imports(tree), 'error': None}
+
+
+def make_entry(source, st):
+    """Return the index entry of source text read from a file with os.stat result st."""
+    return dict(scan(source), hash=content_hash(source), mtime=st.st_mtime_ns, size=st.st_size)
+
+
+class SymbolIndex:
+    """On-disk symbol index, refreshed incrementally by update()."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.entries = json.load(f).get('files', {})
+        except (OSError, ValueError):
+            self.entries = {}
+        self.dirty = False
+        self.parsed = 0
+
+    def update(self, files):
+        """Bring the entries of files up to date, reading and parsing only the files that changed."""
+        parsed = self.parsed
+        with telemetry.phase('index'):
+            for f in files:
+                self._refresh(f)
+        telemetry.count('index_parsed', self.parsed - parsed)
+
+    def _refresh(self, f):
+        key = str(f)
+        try:
+            st = os.stat(f)
+        except OSError:
+            if self.entries.pop(key, None) is not None:
+                self.dirty = True
+            return None
+        entry = self.entries.get(key)
+        if entry and entry['mtime'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            return entry
+        source = Path(f).read_text(encoding='utf-8', errors='replace')
+        digest = content_hash(source)
+        if not entry or entry['hash'] != digest:
+            entry = dict(scan(source), hash=digest)
+            self.parsed += 1
+        entry.update(mtime=st.st_mtime_ns, size=st.st_size)
+        self.entries[key] = entry
+        self.dirty = True
+        return entry
+
+    def current(self, f):
+        """Return the entry of f if its mtime and size are unchanged, without reading the file; else None."""
+        entry = self.entries.get(str(f))
+        try:
+            st = os.stat(f)
+        except OSError:
+            return None
+        if entry and entry['mtime'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            return entry
+        return None
+
+    def put(self, f, entry):
+        """Store an entry built elsewhere (see make_entry), e.g. by docplan's worker processes."""
+        if self.entries.get(str(f)) != entry:
+            self.entries[str(f)] = entry
+            self.parsed += 1
+            self.dirty = True
+
+    def get(self, f):
+        """Return the up-to-date entry of f, or None if it does not exist."""
+        return self._refresh(f)
+
+    def symbols(self, f):
+        """Return the symbol records of f (empty when it cannot be parsed)."""
+        entry = self.get(f)
+        return entry['symbols'] if entry else []
+
+    def lookup(self, f, qualname):
+        """Return the symbol of f named qualname (e.g. `Class.method`), or None."""
+        return next((s for s in self.symbols(f) if s['qualname'] == qualname), None)
+
+    def modules(self, name):
+        """Return the indexed files that define the dotted module name."""
+        parts = name.lstrip('.').split('.')
+        suffixes = ('/'.join(parts) + '.py', '/'.join(parts + ['__init__.py']))
+        return [p for p in self.entries
+                if any(('/' + Path(p).as_posix()).endswith('/' + suffix) for suffix in suffixes)]
+
+    def save(self):
+        """Atomically write the index if anything changed."""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version': 1, 'files': self.entries}, f, sort_keys=True)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self.dirty = False
@@ -0,0 +1,109 @@
+"""
+Per-phase timings and request telemetry for --profile / --metrics-out.
+
+Instrumentation calls (phase, event, count) are no-ops until configure() is
+called, so the hot paths pay nothing when profiling is off. Events are written
+as JSON lines as they happen; phase totals and request counters are aggregated
+for the --profile summary.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+_active = None
+
+
+class Telemetry:
+    """Thread-safe collector of phase timings, counters and events for one run."""
+
+    def __init__(self, metrics_out=None, command=None):
+        self.command = command
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._out = open(metrics_out, 'a') if metrics_out else None
+
+    def add_phase(self, name, seconds):
+        with self._lock:
+            calls, total = self.phases.get(name, (0, 0.0))
+            self.phases[name] = (calls + 1, total + seconds)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def event(self, kind, **fields):
+        if self._out is None:
+            return
+        record = {'event': kind, 'ts': round(time.time(), 6), 'command': self.command}
+        record.update(fields)
+        line = json.dumps(record, sort_keys=True, default=str)
+        with self._lock:
+            self._out.write(line + '\n')
+
+    def summary(self):
+        """Return the --profile summary table as a list of lines."""
+        wall = time.perf_counter() - self.started
+        c = self.counters.get
+        lines = [f'{"Phase":<12}{"Calls":>8}{"Total s":>10}{"Mean ms":>10}']
+        for name, (calls, total) in self.phases.items():
+            lines.append(f'{name:<12}{calls:>8}{total:>10.3f}{total / calls * 1000:>10.1f}')
+        lines.append(f'Requests: {c("requests", 0)} (cache hits {c("cache_hits", 0)}, '
+                     f'misses {c("cache_misses", 0)}), retries {c("retries", 0)}, errors {c("errors", 0)}')
+        lines.append(f'Tokens: prompt {c("prompt_tokens", 0)}, completion {c("completion_tokens", 0)}')
+        lines.append(f'Bytes written: {c("bytes_written", 0)}')
+        lines.append(f'Wall time: {wall:.3f} s')
+        return lines
+
+    def close(self):
+        self.event('run', wall=round(time.perf_counter() - self.started, 6),
+                   phases={k: {'calls': n, 'seconds': round(t, 6)} for k, (n, t) in self.phases.items()},
+                   counters=dict(self.counters))
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+
+def configure(metrics_out=None, command=None):
+    """Start collecting telemetry for this process; returns the collector."""
+    global _active
+    _active = Telemetry(metrics_out=metrics_out, command=command)
+    return _active
+
+
+def get():
+    """Return the active collector, or None when telemetry is off."""
+    return _active
+
+
+def reset():
+    """Close and discard the active collector."""
+    global _active
+    if _active is not None:
+        _active.close()
+    _active = None
+
+
+def phase(name):
+    """Context manager timing a block under name (no-op when telemetry is off)."""
+    return _active.phase(name) if _active is not None else nullcontext()
+
+
+def count(name, amount=1):
+    if _active is not None:
+        _active.count(name, amount)
+
+
+def event(kind, **fields):
+    if _active is not None:
+        _active.event(kind, **fields)
@@ -47,4 +47,77 @@ def test_audit_security_apply_fixes(tmp_path, monkeypatch):
     assert result.exit_code == 0
     # Ensure file was updated with fixed code
     updated = (tmp_path / 'src' / 'vuln.py').read_text()
-    assert '# fixed' in updated
\ No newline at end of file
+    assert '# fixed' in updated
+
+def test_audit_security_incremental_reuses_findings(tmp_path, monkeypatch):
+    calls = []
+    def fake_chat(prompt, **kwargs):
+        calls.append(prompt)
+        return 'VULNERABILITY at line 1'
+    monkeypatch.setattr(cli, 'chat_completion', fake_chat)
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / 'src'
+    src.mkdir()
+    (src / 'vuln.py').write_text('def foo():\n    pass\n')
+    runner = CliRunner()
+    args = ['audit-security', '--path', 'src', '--output', 'report.md', '--incremental']
+    assert runner.invoke(cli.main, args).exit_code == 0
+    result = runner.invoke(cli.main, args)
+    assert result.exit_code == 0
+    assert len(calls) == 1
+    assert 'Reused findings for 1 unchanged file(s).' in result.output
+    assert 'VULNERABILITY at line 1' in (tmp_path / 'report.md').read_text()
+
+
+def test_audit_security_chunked_report_and_fixes(tmp_path, monkeypatch):
+    def fake_chat(prompt, **kwargs):
+        if prompt.startswith('Apply the security fixes'):
+            return 'def two():\n    return 22' if 'def two' in prompt else 'def one():\n    return 11'
+        return 'issue in ' + ('two' if 'def two' in prompt else 'one')
+    monkeypatch.setattr(cli, 'chat_completion', fake_chat)
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / 'src'
+    src.mkdir()
+    (src / 'big.py').write_text('import os\n\ndef one():\n    return 1\n\ndef two():\n    return 2\n')
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['audit-security', '--path', 'src', '--output', 'report.md',
+                                      '--chunk-lines', '2', '--apply-fixes'])
+    assert result.exit_code == 0
+    report = (tmp_path / 'report.md').read_text()
+    assert '### one (lines 3-4)' in report and 'issue in two' in report
+    assert (src / 'big.py').read_text() == 'import os\n\ndef one():\n    return 11\n\ndef two():\n    return 22\n'
+
+def test_audit_security_resume_after_interrupt(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / 'src'
+    src.mkdir()
+    for name in ('a', 'b', 'c'):
+        (src / f'{name}.py').write_text(f'def {name}():\n    pass\n')
+    calls = []
+    def interrupted_chat(prompt, **kwargs):
+        if 'def b()' in prompt:
+            raise KeyboardInterrupt
+        calls.append(prompt)
+        return 'VULNERABILITY in ' + prompt.split('def ')[-1][:1]
+    monkeypatch.setattr(cli, 'chat_completion', interrupted_chat)
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['audit-security', '--path', 'src', '--output', 'report.md'])
+    assert result.exit_code == 130
+    assert 'Run again with --resume' in result.output
+    report = (tmp_path / 'report.md').read_text()
+    assert 'VULNERABILITY in a' in report and 'src/b.py' not in report
+    def chat(prompt, **kwargs):
+        calls.append(prompt)
+        return 'VULNERABILITY in ' + prompt.split('def ')[-1][:1]
+    monkeypatch.setattr(cli, 'chat_completion', chat)
+    result = runner.invoke(cli.main, ['audit-security', '--path', 'src', '--output', 'report.md', '--resume'])
+    assert result.exit_code == 0, result.output
+    assert len(calls) == 3
+    assert 'Resumed after 1 file(s)' in result.output
+    resumed = (tmp_path / 'report.md').read_text()
+    # Identical to an uninterrupted run
+    result = runner.invoke(cli.main, ['audit-security', '--path', 'src', '--output', 'full.md'])
+    assert resumed == (tmp_path / 'full.md').read_text()
+    # A finished run cannot be resumed
+    result = runner.invoke(cli.main, ['audit-security', '--path', 'src', '--output', 'full.md', '--resume'])
+    assert 'No interrupted audit-security run' in result.output
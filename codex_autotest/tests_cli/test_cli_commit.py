@@ -52,4 +52,24 @@ def test_commit_success(monkeypatch):
     result = runner.invoke(cli.main, ['commit', '--staged'])
     assert result.exit_code == 0
     # chat_completion stub returns commit message
-    assert 'feat: add foo feature' in result.output
\ No newline at end of file
+    assert 'feat: add foo feature' in result.output
+
+def test_commit_map_reduce_summarises_each_file(monkeypatch):
+    diff_text = (
+        'diff --git a/foo.py b/foo.py\n@@ -1 +1 @@\n-a = 1\n+a = 2\n'
+        'diff --git a/bar.py b/bar.py\n@@ -1 +1 @@\n-b = 1\n+b = 2\n'
+    )
+    monkeypatch.setattr(subprocess, 'run', lambda *args, **kwargs: FakeResult(returncode=0, stdout=diff_text))
+    prompts = []
+    def fake_chat(prompt, **kwargs):
+        prompts.append(prompt)
+        if 'part of a staged git diff' in prompt:
+            return '- changed ' + ('foo' if 'foo.py' in prompt else 'bar')
+        return 'refactor: update foo and bar'
+    monkeypatch.setattr(cli, 'chat_completion', fake_chat)
+    result = CliRunner().invoke(cli.main, ['commit', '--staged', '--map-reduce', '--no-stream'])
+    assert result.exit_code == 0, result.output
+    assert len(prompts) == 3
+    assert 'foo.py:\n- changed foo\n\nbar.py:\n- changed bar' in prompts[-1]
+    assert 'Summarising 2 piece(s)' in result.output
+    assert result.output.rstrip().endswith('refactor: update foo and bar')
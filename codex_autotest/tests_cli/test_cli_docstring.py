@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 import pytest
@@ -8,7 +9,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 from codex_autotest import cli
 
 @pytest.fixture(autouse=True)
-def stub_chat(monkeypatch):
+def stub_chat(tmp_path, monkeypatch):
+    # Run in a scratch directory so run journals stay out of the repo
+    monkeypatch.chdir(tmp_path)
     # Stub OpenAI client
     monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
     monkeypatch.setattr(cli, 'chat_completion', lambda prompt, **kwargs: 'Generated docstring')
@@ -62,4 +65,73 @@ def test_docstring_apply(tmp_path):
     assert content[idx_cls + 1].strip() == '"""Generated docstring"""'
     # Check method docstring
     idx_m = next(i for i, line in enumerate(content) if 'baz(self)' in line)
-    assert content[idx_m + 1].strip() == '"""Generated docstring"""'
\ No newline at end of file
+    assert content[idx_m + 1].strip() == '"""Generated docstring"""'
+
+def test_docstring_changed_since_touched_only(tmp_path, monkeypatch):
+    import subprocess
+    def git(*args):
+        subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@example.com', *args],
+                       check=True, capture_output=True)
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / 'src'
+    src.mkdir()
+    (src / 'a.py').write_text('def foo():\n    pass\n\ndef bar():\n    pass\n')
+    (src / 'b.py').write_text('def untouched():\n    pass\n')
+    git('init', '-q')
+    git('add', '.')
+    git('commit', '-qm', 'init')
+    (src / 'a.py').write_text('def foo():\n    pass\n\ndef bar():\n    return 1\n')
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['docstring', '--path', 'src', '--changed-since', 'HEAD'])
+    assert result.exit_code == 0
+    assert 'src/b.py' not in result.output
+    assert result.output.count('Generated docstring') == 2
+    result = runner.invoke(cli.main, ['docstring', '--path', 'src', '--changed-since', 'HEAD', '--touched-only'])
+    assert result.exit_code == 0
+    assert result.output.count('Generated docstring') == 1
+
+def test_docstring_batch_falls_back_for_unparsed(tmp_path, monkeypatch):
+    src = tmp_path / 'src'
+    src.mkdir()
+    f = src / 'c.py'
+    f.write_text(
+        'def foo():\n'
+        '    pass\n'
+        '\n'
+        'class Bar:\n'
+        '    def baz(self):\n'
+        '        pass\n'
+    )
+    prompts = []
+    def fake_chat(prompt, **kwargs):
+        prompts.append(prompt)
+        if '### D1' in prompt:
+            # Answers the function and the class but not the method
+            return '{"D1": "Batched foo.", "D2": "Batched Bar."}'
+        return 'Single docstring'
+    monkeypatch.setattr(cli, 'chat_completion', fake_chat)
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['docstring', '--path', str(src), '--apply', '--batch'])
+    assert result.exit_code == 0
+    assert len(prompts) == 2
+    assert 'did not parse' in result.output
+    content = f.read_text()
+    assert '    """Batched foo."""' in content
+    assert '    """Batched Bar."""' in content
+    assert '        """Single docstring"""' in content
+
+def test_docstring_workers_match_in_process_output(tmp_path):
+    src = tmp_path / 'src'
+    src.mkdir()
+    for i in range(6):
+        (src / f'm{i}.py').write_text(f'def f{i}():\n    pass\n\nclass C{i}:\n    def m(self):\n        pass\n')
+    (src / 'bad.py').write_text('def broken(:\n')
+    runner = CliRunner()
+    parallel = runner.invoke(cli.main, ['docstring', '--path', str(src), '--workers', '3'])
+    assert parallel.exit_code == 0
+    # The cold index was filled from the workers' analysis
+    entries = json.loads((tmp_path / '.codex-autotest' / 'symbols.json').read_text())['files']
+    assert len(entries) == 7 and entries[str(src / 'm0.py')]['symbols'][0]['name'] == 'f0'
+    serial = runner.invoke(cli.main, ['docstring', '--path', str(src)])
+    assert parallel.output == serial.output
+    assert 'SyntaxError parsing' in parallel.output and '+    """Generated docstring"""' in parallel.output
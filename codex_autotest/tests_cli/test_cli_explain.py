@@ -42,4 +42,44 @@ def test_explain_success_range(tmp_path):
     runner = CliRunner()
     result = runner.invoke(cli.main, ['explain', str(f) + ':1-1'])
     assert result.exit_code == 0
-    assert 'Mock explanation' in result.output
\ No newline at end of file
+    assert 'Mock explanation' in result.output
+
+def test_explain_stream_prints_deltas(tmp_path, monkeypatch):
+    f = tmp_path / 'foo.py'
+    f.write_text('x=1\n')
+    monkeypatch.setattr(cli, 'stream_completion', lambda prompt, **kwargs: (d for d in ['Mock ', 'stream']))
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['explain', str(f), '--stream'])
+    assert result.exit_code == 0
+    assert result.output == 'Mock stream\n'
+
+def test_explain_stream_ctrl_c_cancels(tmp_path, monkeypatch):
+    f = tmp_path / 'foo.py'
+    f.write_text('x=1\n')
+    closed = []
+    def deltas(prompt, **kwargs):
+        try:
+            yield 'partial '
+            raise KeyboardInterrupt
+        finally:
+            closed.append(True)
+    monkeypatch.setattr(cli, 'stream_completion', deltas)
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['explain', str(f), '--stream'])
+    assert result.exit_code == 130
+    assert 'partial' in result.output
+    assert 'Cancelled.' in result.output
+    assert closed == [True]
+
+def test_explain_symbol_by_name(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    prompts = []
+    monkeypatch.setattr(cli, 'chat_completion', lambda prompt, **kwargs: prompts.append(prompt) or 'Mock explanation')
+    f = tmp_path / 'foo.py'
+    f.write_text('def a():\n    return 1\n\nclass B:\n    def c(self):\n        return 2\n')
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['explain', 'foo.py:B.c', '--no-stream'])
+    assert result.exit_code == 0
+    assert 'def c(self):\n        return 2' in prompts[0] and 'def a' not in prompts[0]
+    result = runner.invoke(cli.main, ['explain', 'foo.py:missing'])
+    assert 'No function or class named missing in foo.py' in result.output
@@ -54,4 +54,98 @@ def test_generate_apply(monkeypatch):
         test_file = Path('tests') / 'test_foo.py'
         assert test_file.exists()
         content = test_file.read_text()
-        assert 'def test_foo()' in content
\ No newline at end of file
+        assert 'def test_foo()' in content
+
+def test_generate_jobs_ordered_and_reports_failures(tmp_path, monkeypatch):
+    import time
+    src = tmp_path / 'src'
+    src.mkdir()
+    for name, delay in (('a', 0.05), ('b', 0), ('c', 0)):
+        (src / f'{name}.py').write_text(f'# delay={delay}\ndef {name}():\n    return 1\n')
+
+    def fake_chat(prompt, **kwargs):
+        if 'def b()' in prompt:
+            raise RuntimeError('boom')
+        if 'delay=0.05' in prompt:
+            time.sleep(0.05)
+        return 'def test_ok():\n    assert True'
+    monkeypatch.setattr(cli, 'chat_completion', fake_chat)
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['generate-tests', '--path', 'src', '--apply', '--jobs', '3'])
+    assert result.exit_code == 0
+    out = result.output
+    # Output follows discovery order even though a.py finishes last
+    order = [out.index(f'Generating tests for src/{n}.py') for n in 'abc' if f'src/{n}.py' in out]
+    assert order == sorted(order)
+    assert 'Error generating tests for src/b.py: boom' in out
+    assert 'Failed to generate tests for 1 file(s)' in out
+    assert (tmp_path / 'tests' / 'test_a.py').exists()
+    assert (tmp_path / 'tests' / 'test_c.py').exists()
+    assert not (tmp_path / 'tests' / 'test_b.py').exists()
+
+
+def test_generate_incremental_skips_unchanged(tmp_path, monkeypatch):
+    calls = []
+    def fake_chat(prompt, **kwargs):
+        calls.append(prompt)
+        return 'def test_foo():\n    pass'
+    monkeypatch.setattr(cli, 'chat_completion', fake_chat)
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / 'src'
+    src.mkdir()
+    (src / 'foo.py').write_text('def foo():\n    return 1\n')
+    (src / 'bar.py').write_text('def bar():\n    return 2\n')
+    runner = CliRunner()
+    args = ['generate-tests', '--path', 'src', '--apply', '--incremental']
+    assert runner.invoke(cli.main, args).exit_code == 0
+    assert len(calls) == 2
+    (src / 'bar.py').write_text('def bar():\n    return 3\n')
+    result = runner.invoke(cli.main, args)
+    assert result.exit_code == 0
+    assert len(calls) == 3
+    assert 'Generating tests for src/bar.py' in result.output
+    assert 'Skipped 1 unchanged file(s).' in result.output
+
+
+def test_generate_chunks_large_files(tmp_path, monkeypatch):
+    prompts = []
+    def fake_chat(prompt, **kwargs):
+        prompts.append(prompt)
+        name = 'one' if 'def one' in prompt else 'two'
+        return f'import pytest\n\ndef test_{name}():\n    assert True\n'
+    monkeypatch.setattr(cli, 'chat_completion', fake_chat)
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / 'src'
+    src.mkdir()
+    (src / 'big.py').write_text('import os\n\ndef one():\n    return 1\n\ndef two():\n    return 2\n')
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['generate-tests', '--path', 'src', '--apply', '--chunk-lines', '2', '--jobs', '2'])
+    assert result.exit_code == 0
+    assert 'Generating tests for src/big.py (2 chunks)' in result.output
+    assert len(prompts) == 2
+    assert all('import os' in p for p in prompts)
+    content = (tmp_path / 'tests' / 'test_big.py').read_text()
+    assert content.count('import pytest') == 1
+    assert 'def test_one' in content and 'def test_two' in content
+
+
+def test_generate_dry_run_estimate_makes_no_requests(tmp_path, monkeypatch):
+    def fail_chat(prompt, **kwargs):
+        raise AssertionError('dry run must not call the API')
+    monkeypatch.setattr(cli, 'chat_completion', fail_chat)
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / 'src'
+    src.mkdir()
+    (src / 'foo.py').write_text('def foo():\n    return 1\n')
+    (src / 'bar.py').write_text('def bar():\n    return 2\n')
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['generate-tests', '--path', 'src', '--dry-run'])
+    assert result.exit_code == 0
+    assert 'src/foo.py:' in result.output and 'prompt tokens' in result.output
+    result = runner.invoke(cli.main, ['generate-tests', '--path', 'src', '--dry-run', '--estimate'])
+    assert result.exit_code == 0
+    assert 'src/foo.py:' not in result.output
+    assert 'Requests: 2' in result.output
+    assert 'Projected cost: up to $' in result.output
+    assert not (tmp_path / 'tests').exists()
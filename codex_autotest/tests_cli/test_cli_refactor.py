@@ -44,4 +44,31 @@ def test_refactor_apply(monkeypatch):
         assert 'Wrote refactored code to' in out
         content = f.read_text().splitlines()
         assert 'def foo():' in content[0]
-        assert '    return 2' in content[1]
\ No newline at end of file
+        assert '    return 2' in content[1]
+
+def test_refactor_failures_are_retried_by_retry_failed(tmp_path, monkeypatch):
+    def flaky_chat(prompt, **kwargs):
+        if 'bar' in prompt:
+            raise RuntimeError('connection reset')
+        return prompt.split('\n\n')[-1].replace('1', '2')
+    monkeypatch.setattr(cli, 'chat_completion', flaky_chat)
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    src = Path('src')
+    src.mkdir()
+    (src / 'foo.py').write_text('def foo():\n    return 1\n')
+    (src / 'bar.py').write_text('def bar():\n    return 1\n')
+    result = runner.invoke(cli.main, ['refactor', '--path', 'src', '--focus', 'speed', '--apply'])
+    assert result.exit_code == 0
+    assert 'Error refactoring src/bar.py' in result.output
+    assert '1 file(s) failed; run "codex-autotest retry-failed"' in result.output
+    assert (src / 'bar.py').read_text() == 'def bar():\n    return 1\n'
+    monkeypatch.setattr(cli, 'chat_completion', lambda prompt, **kwargs: 'def bar():\n    return 2')
+    result = runner.invoke(cli.main, ['retry-failed'])
+    assert result.exit_code == 0, result.output
+    assert 'Retrying 1 failed file(s) from the last refactor run' in result.output
+    assert 'Refactoring src/bar.py' in result.output
+    assert 'Refactoring src/foo.py' not in result.output
+    assert (src / 'bar.py').read_text() == 'def bar():\n    return 2'
+    result = runner.invoke(cli.main, ['retry-failed'])
+    assert 'No failed files to retry.' in result.output
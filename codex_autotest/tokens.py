@@ -0,0 +1,126 @@
+"""
+Token counting, per-request budgets and cost estimates.
+
+Counting uses a pluggable tokenizer: one installed with set_tokenizer(), else
+`tiktoken` when it is available, else a pure-Python estimator that works offline.
+"""
+import math
+import re
+
+# Context window sizes in tokens
+MODEL_CONTEXT = {
+    'gpt-3.5-turbo': 16385,
+    'gpt-4': 8192,
+    'gpt-4-turbo': 128000,
+    'gpt-4o': 128000,
+    'gpt-4o-mini': 128000,
+}
+DEFAULT_CONTEXT = 8192
+# USD per million (prompt, completion) tokens
+MODEL_PRICING = {
+    'gpt-3.5-turbo': (0.50, 1.50),
+    'gpt-4': (30.00, 60.00),
+    'gpt-4-turbo': (10.00, 30.00),
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4o-mini': (0.15, 0.60),
+}
+# Upper bound for completions when the caller does not pass max_tokens
+DEFAULT_MAX_TOKENS = 1024
+# Requests that cannot leave at least this many tokens for the answer are rejected
+MIN_COMPLETION_TOKENS = 64
+# Fixed chat-format overhead for a single user message
+MESSAGE_OVERHEAD = 7
+
+_WORD_RE = re.compile(r'\w+|[^\w\s]', re.UNICODE)
+_tokenizer = None
+
+
+class PromptTooLargeError(ValueError):
+    """Raised when a prompt leaves no room for a completion in the model's context window."""
+
+
+def estimate_tokens(text):
+    """
+    Estimate the token count of text without a tokenizer: words cost one token
+    per four characters (at least one), punctuation one token per character.
+    """
+    total = 0
+    for piece in _WORD_RE.findall(text):
+        total += max(1, math.ceil(len(piece) / 4)) if piece[0].isalnum() or piece[0] == '_' else 1
+    return total
+
+
+def _tiktoken_counter():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    def count(text, model):
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding('cl100k_base')
+        return len(encoding.encode(text))
+    return count
+
+
+def set_tokenizer(func):
+    """Install func(text, model) -> int as the token counter; None restores auto-detection."""
+    global _tokenizer
+    _tokenizer = func
+
+
+def get_tokenizer():
+    """Return the active token counter, detecting tiktoken on first use."""
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = _tiktoken_counter() or (lambda text, model: estimate_tokens(text))
+    return _tokenizer
+
+
+def count_tokens(text, model):
+    """Return the number of tokens in text for model."""
+    return get_tokenizer()(text, model)
+
+
+def prompt_tokens(prompt, model):
+    """Return the tokens a single-message chat request with prompt consumes."""
+    return count_tokens(prompt, model) + MESSAGE_OVERHEAD
+
+
+def context_window(model):
+    """Return the context window of model, matching dated variants by prefix."""
+    if model in MODEL_CONTEXT:
+        return MODEL_CONTEXT[model]
+    for name in sorted(MODEL_CONTEXT, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_CONTEXT[name]
+    return DEFAULT_CONTEXT
+
+
+def completion_budget(n_prompt_tokens, model, cap=DEFAULT_MAX_TOKENS):
+    """
+    Return the max_tokens to request: cap, reduced to what is left of the
+    context window. Raises PromptTooLargeError if too little is left.
+    """
+    available = context_window(model) - n_prompt_tokens
+    if available < MIN_COMPLETION_TOKENS:
+        raise PromptTooLargeError(
+            f'Prompt of {n_prompt_tokens} tokens leaves no room for a completion '
+            f'in the {context_window(model)}-token context of {model}'
+        )
+    return min(cap, available)
+
+
+def estimate_cost(n_prompt_tokens, n_completion_tokens, model):
+    """Return the USD cost of the given token counts, or None if model has no known pricing."""
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        for name in sorted(MODEL_PRICING, key=len, reverse=True):
+            if model.startswith(name):
+                pricing = MODEL_PRICING[name]
+                break
+    if pricing is None:
+        return None
+    return (n_prompt_tokens * pricing[0] + n_completion_tokens * pricing[1]) / 1_000_000
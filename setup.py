@@ -8,15 +8,16 @@ setup(
     packages=find_packages(),
     install_requires=[
         'click',
-        'openai',
+        'openai>=1.0',
         'PyYAML',
     ],
     extras_require={
         'dev': ['mutmut', 'hypothesis'],
+        'tokens': ['tiktoken'],
     },
     entry_points={
         'console_scripts': [
-            'codex-autotest=codex_autotest.cli:main',
+            'codex-autotest=codex_autotest.daemon:run',
         ],
     },
 )
\ No newline at end of file
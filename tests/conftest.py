@@ -0,0 +1,34 @@
+import re
+from types import SimpleNamespace
+import pytest
+from codex_autotest import openai_client
+
+def make_completion(content):
+    """Build a chat completion response object shaped like the OpenAI SDK's."""
+    message = SimpleNamespace(role='assistant', content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason='stop')])
+
+def make_stream(content):
+    """Yield streamed chat completion chunks carrying content word by word."""
+    for piece in re.findall(r'\s*\S+\s*', content):
+        delta = SimpleNamespace(role='assistant', content=piece)
+        yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+
+@pytest.fixture
+def stub_create(monkeypatch):
+    """
+    Route chat completions through create(**kwargs) instead of the shared API
+    client; a plain string returned by create is wrapped as the message content
+    (or streamed word by word when the request sets stream=True).
+    """
+    def install(create):
+        def wrapped(**kwargs):
+            result = create(**kwargs)
+            if not isinstance(result, str):
+                return result
+            return make_stream(result) if kwargs.get('stream') else make_completion(result)
+        completions = SimpleNamespace(create=wrapped)
+        client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        monkeypatch.setattr(openai_client, 'get_client', lambda: client)
+        return client
+    return install
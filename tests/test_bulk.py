@@ -0,0 +1,44 @@
+import json
+import pytest
+from codex_autotest import openai_client
+from codex_autotest.bulk import BulkResultError, BulkResults, JobWriter, request
+from codex_autotest.mock_server import complete_batch
+
+@pytest.fixture(autouse=True)
+def no_cache():
+    openai_client.configure_cache(enabled=False)
+    yield
+    openai_client.configure_cache(enabled=True)
+
+def test_jobs_round_trip_through_batch_results(tmp_path):
+    jobs = tmp_path / 'jobs.jsonl'
+    with JobWriter(str(jobs)) as writer:
+        assert writer.add('first prompt')
+        assert not writer.add('first prompt')
+        assert writer.add('second prompt', max_tokens=50)
+    lines = [json.loads(line) for line in jobs.read_text().splitlines()]
+    assert len(lines) == 2
+    assert lines[0]['method'] == 'POST' and lines[0]['url'] == '/v1/chat/completions'
+    assert lines[0]['body']['messages'] == [{'role': 'user', 'content': 'first prompt'}]
+    assert lines[1]['body']['max_tokens'] == 50
+    assert lines[0]['custom_id'] == request('first prompt')['custom_id']
+    results = tmp_path / 'results.jsonl'
+    answer = lambda body: body['messages'][0]['content'].upper()
+    assert complete_batch(str(jobs), str(results), answer) == 2
+    bulk = BulkResults(str(results))
+    assert bulk.complete('first prompt') == 'FIRST PROMPT'
+    assert bulk.complete('second prompt', max_tokens=50) == 'SECOND PROMPT'
+    # Same prompt with another completion budget is a different request
+    with pytest.raises(BulkResultError, match='no result'):
+        bulk.complete('second prompt')
+
+def test_failed_and_malformed_results(tmp_path):
+    results = tmp_path / 'results.jsonl'
+    key = request('p')['custom_id']
+    results.write_text(json.dumps({'custom_id': key, 'response': {'status_code': 429, 'body': {
+        'error': {'message': 'rate limited'}}}, 'error': None}) + '\n')
+    with pytest.raises(BulkResultError, match='HTTP 429: rate limited'):
+        BulkResults(str(results)).complete('p')
+    results.write_text('{"custom_id": "x"}\nnot json\n')
+    with pytest.raises(ValueError, match=':2:'):
+        BulkResults(str(results))
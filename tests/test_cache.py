@@ -0,0 +1,49 @@
+import os
+import time
+from codex_autotest.cache import ResponseCache, cache_key
+
+def test_cache_key_depends_on_model_tokens_and_prompt():
+    base = cache_key('gpt-3.5-turbo', 1024, 'prompt')
+    assert base == cache_key('gpt-3.5-turbo', 1024, 'prompt')
+    assert base != cache_key('gpt-4', 1024, 'prompt')
+    assert base != cache_key('gpt-3.5-turbo', 512, 'prompt')
+    assert base != cache_key('gpt-3.5-turbo', 1024, 'prompt2')
+
+def test_set_and_get_roundtrip(tmp_path):
+    cache = ResponseCache(root=str(tmp_path / 'cache'))
+    key = cache_key('m', 1, 'p')
+    assert cache.get(key) is None
+    cache.set(key, 'hello')
+    assert cache.get(key) == 'hello'
+    # No temporary files are left behind
+    assert not [p for p in (tmp_path / 'cache').rglob('.tmp-*')]
+
+def test_get_expires_old_entries(tmp_path):
+    cache = ResponseCache(root=str(tmp_path), max_age=60)
+    key = cache_key('m', 1, 'p')
+    cache.set(key, 'old')
+    old = time.time() - 120
+    os.utime(cache._path(key), (old, old))
+    assert cache.get(key) is None
+    assert not os.path.exists(cache._path(key))
+
+def test_prune_by_size_removes_oldest_first(tmp_path):
+    cache = ResponseCache(root=str(tmp_path), max_age=None)
+    keys = [cache_key('m', 1, str(i)) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.set(key, 'x' * 100)
+        t = time.time() - 100 + i
+        os.utime(cache._path(key), (t, t))
+    total = cache.stats()['bytes']
+    removed, _ = cache.prune(max_bytes=total - 1)
+    assert removed == 1
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) is not None
+
+def test_stats_and_clear(tmp_path):
+    cache = ResponseCache(root=str(tmp_path))
+    cache.set(cache_key('m', 1, 'a'), 'a')
+    cache.set(cache_key('m', 1, 'b'), 'b')
+    assert cache.stats()['entries'] == 2
+    assert cache.clear() == 2
+    assert cache.stats()['entries'] == 0
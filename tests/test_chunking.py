@@ -0,0 +1,108 @@
+import ast
+from codex_autotest.chunking import split_module, merge_test_modules, merge_reports
+
+MODULE = '''import os
+from typing import List
+
+LIMIT = 10
+
+
+def helper(x):
+    return x + 1
+
+
+def uses_helper(y):
+    return helper(y) * 2
+
+
+class Big:
+    attr = 1
+
+    def one(self):
+        return os.sep
+
+    def two(self):
+        return 2
+
+    def three(self):
+        return 3
+'''
+
+def test_small_module_is_single_chunk():
+    chunks = split_module(MODULE, max_lines=1000)
+    assert len(chunks) == 1
+    assert chunks[0].code == MODULE
+
+def test_unparsable_module_is_single_chunk():
+    code = 'def broken(:\n' * 50
+    assert len(split_module(code, max_lines=5)) == 1
+
+def test_split_carries_imports_and_referenced_signatures():
+    chunks = split_module(MODULE, max_lines=3)
+    names = [c.name for c in chunks]
+    assert names[:2] == ['helper', 'uses_helper']
+    for chunk in chunks:
+        assert 'import os' in chunk.code
+        assert 'LIMIT = 10' in chunk.code
+        # Every chunk is valid Python on its own
+        ast.parse(chunk.code)
+    uses = chunks[1]
+    assert 'def helper(x):\n    ...' in uses.code
+    assert 'return x + 1' not in uses.code
+    assert (uses.start, uses.end) == (11, 12)
+
+def test_signatures_of_one_line_definitions_keep_colons():
+    code = ("def f(x: int) -> int: return x\n"
+            "def g(d={'a': 1}): return d\n"
+            "def h(a,\n      b: str = 'é:'): return a\n\n"
+            "def uses(y):\n    return f(y), g(y), h(y, y)\n")
+    uses = split_module(code, max_lines=1)[-1]
+    assert 'def f(x: int) -> int:\n    ...' in uses.code
+    assert "def g(d={'a': 1}):\n    ..." in uses.code
+    assert "def h(a,\n      b: str = 'é:'):\n    ..." in uses.code
+    ast.parse(uses.code)
+
+def test_oversized_class_is_split_by_method():
+    chunks = split_module(MODULE, max_lines=3)
+    class_chunks = [c for c in chunks if c.name.startswith('Big.')]
+    assert len(class_chunks) > 1
+    for chunk in class_chunks:
+        assert 'class Big:' in chunk.code
+        assert 'attr = 1' in chunk.code
+
+def test_merge_test_modules_hoists_imports():
+    merged = merge_test_modules([
+        'import pytest\nfrom mod import a\n\ndef test_a():\n    assert a()\n',
+        'import pytest\nfrom mod import b\n\ndef test_b():\n    assert b()\n',
+    ])
+    assert merged.count('import pytest') == 1
+    assert merged.index('from mod import b') < merged.index('def test_a')
+    ast.parse(merged)
+
+def test_merge_test_modules_with_leading_blank_lines_and_docstrings():
+    merged = merge_test_modules([
+        '\n\n"""Tests for m."""\nimport pytest\nfrom m import a\n\ndef test_a():\n    assert a()\n',
+        '\n"""Tests for m, part two."""\nimport pytest\nfrom m import b\n\ndef test_b():\n    assert b()\n',
+    ])
+    assert merged.startswith('"""Tests for m."""\n\nimport pytest\nfrom m import a\nfrom m import b\n')
+    assert 'part two' not in merged
+    tree = ast.parse(merged)
+    assert [type(node).__name__ for node in tree.body] == ['Expr', 'Import', 'ImportFrom', 'ImportFrom',
+                                                           'FunctionDef', 'FunctionDef']
+
+def test_merge_test_modules_keeps_every_test_of_clashing_names():
+    fixture = '@pytest.fixture\ndef client():\n    return 1\n'
+    merged = merge_test_modules([
+        'import pytest\n\n' + fixture + '\ndef test_x(client):\n    assert client\n',
+        'import pytest\n\n' + fixture + '\ndef test_x(client):\n    assert client == 1\n',
+    ])
+    names = [node.name for node in ast.parse(merged).body if isinstance(node, ast.FunctionDef)]
+    # The identical fixture is kept once; the second test_x is renamed, not lost
+    assert names == ['client', 'test_x', 'test_x_2']
+    assert 'assert client == 1' in merged
+
+def test_merge_reports_labels_chunks():
+    chunks = split_module(MODULE, max_lines=3)[:2]
+    report = merge_reports(chunks, ['ok', 'issue'])
+    assert '### helper (lines 7-8)' in report
+    assert '### uses_helper (lines 11-12)' in report
@@ -3,7 +3,6 @@ import yaml
 import pytest
 from click.testing import CliRunner
 from codex_autotest.cli import main
-import openai
 
 @pytest.fixture(autouse=True)
 def clear_env(monkeypatch):
@@ -29,6 +28,23 @@ def test_init_fails_if_config_exists(tmp_path, monkeypatch):
     assert result.exit_code == 0
     assert 'already exists' in result.output
 
+def test_malformed_config_only_affects_commands_that_read_it(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / '.codex-autotest.yaml').write_text('src_path: [unclosed\n')
+    runner = CliRunner()
+    result = runner.invoke(main, ['cache', 'stats'])
+    assert result.exit_code == 0, result.output
+    assert 'Entries: 0' in result.output
+    result = runner.invoke(main, ['init'])
+    assert result.exit_code == 0 and 'already exists' in result.output
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'm.py').write_text('x = 1\n')
+    result = runner.invoke(main, ['--no-cache', 'audit-security', '--path', 'src', '--dry-run'])
+    assert result.exit_code == 0, result.output
+    assert 'Requests: 1' in result.output
+    (tmp_path / '.codex-autotest.yaml').write_text('- just\n- a list\n')
+    assert runner.invoke(main, ['cache', 'stats']).exit_code == 0
+
 def test_generate_requires_init(tmp_path, monkeypatch):
     monkeypatch.chdir(tmp_path)
     runner = CliRunner()
@@ -36,7 +52,7 @@ def test_generate_requires_init(tmp_path, monkeypatch):
     assert result.exit_code == 0
     assert 'Configuration not found. Please run' in result.output
 
-def test_generate_creates_test_file(tmp_path, monkeypatch):
+def test_generate_creates_test_file(tmp_path, monkeypatch, stub_create):
     # Prepare source code
     src_dir = tmp_path / 'src'
     src_dir.mkdir()
@@ -56,8 +72,8 @@ def test_generate_creates_test_file(tmp_path, monkeypatch):
     # Stub OpenAI response
     monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
     def dummy_create(**kwargs):
-        return {'choices': [{'message': {'content': 'def test_add(): pass'}}]}
-    monkeypatch.setattr(openai.ChatCompletion, 'create', dummy_create)
+        return 'def test_add(): pass'
+    stub_create(dummy_create)
     # Change to tmp working directory and run generate
     monkeypatch.chdir(tmp_path)
     runner = CliRunner()
@@ -69,7 +85,7 @@ def test_generate_creates_test_file(tmp_path, monkeypatch):
     content = test_file.read_text()
     assert 'def test_add' in content
 
-def test_review_regenerates_and_overwrites(tmp_path, monkeypatch):
+def test_review_regenerates_and_overwrites(tmp_path, monkeypatch, stub_create):
     monkeypatch.chdir(tmp_path)
     # Setup source and test files
     src_dir = tmp_path / 'src'
@@ -94,8 +110,8 @@ def test_review_regenerates_and_overwrites(tmp_path, monkeypatch):
     # Stub OpenAI response
     monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
     def dummy_create(**kwargs):
-        return {'choices': [{'message': {'content': 'def test_add_new(): pass'}}]}
-    monkeypatch.setattr(openai.ChatCompletion, 'create', dummy_create)
+        return 'def test_add_new(): pass'
+    stub_create(dummy_create)
     # Run review: accept default prompt then confirm overwrite
     runner = CliRunner()
     # Use relative path under tests/ for review
@@ -105,8 +121,34 @@ def test_review_regenerates_and_overwrites(tmp_path, monkeypatch):
     updated = test_file.read_text()
     assert 'def test_add_new' in updated
     assert 'Wrote updated tests to' in result.output
+    # Regenerating with the unchanged prompt asks the API again instead of replaying the cache
+    answers = iter(['def test_first(): pass', 'def test_second(): pass'])
+    stub_create(lambda **kwargs: next(answers))
+    result = runner.invoke(main, ['review', 'tests/test_math_utils.py'], input='\nn\ny\n\ny\n')
+    assert result.exit_code == 0, result.output
+    assert 'def test_second' in test_file.read_text()
     
-def test_mutate_generates_kill_tests(tmp_path, monkeypatch):
+def test_review_finds_the_source_module_the_test_imports(tmp_path, monkeypatch, stub_create):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'src' / 'mathlib').mkdir(parents=True)
+    (tmp_path / 'src' / 'mathlib' / 'ops.py').write_text('def add(a, b):\n    return a + b\n')
+    (tmp_path / '.codex-autotest.yaml').write_text(yaml.dump({
+        'src_path': 'src', 'language': 'python', 'framework': 'pytest',
+        'prompts': {'unit_test': 'Test {framework} for {language} code:\n{code}'},
+    }))
+    # Not mirrored under src/: tests/unit/test_arithmetic.py
+    (tmp_path / 'tests' / 'unit').mkdir(parents=True)
+    test_file = tmp_path / 'tests' / 'unit' / 'test_arithmetic.py'
+    test_file.write_text('from mathlib.ops import add\n\ndef test_old(): pass\n')
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    prompts = []
+    stub_create(lambda **kwargs: prompts.append(kwargs['messages'][-1]['content']) or 'def test_add_new(): pass')
+    result = CliRunner().invoke(main, ['review', 'tests/unit/test_arithmetic.py'], input='\ny\n')
+    assert result.exit_code == 0, result.output
+    assert 'return a + b' in prompts[0]
+    assert 'def test_add_new' in test_file.read_text()
+
+def test_mutate_generates_kill_tests(tmp_path, monkeypatch, stub_create):
     import shutil, subprocess, json
     # Change into project dir
     monkeypatch.chdir(tmp_path)
@@ -149,8 +191,8 @@ def test_mutate_generates_kill_tests(tmp_path, monkeypatch):
     # Stub OpenAI response
     monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
     def dummy_create(**kwargs):
-        return {'choices': [{'message': {'content': 'def test_kill(): pass'}}]}
-    monkeypatch.setattr(openai.ChatCompletion, 'create', dummy_create)
+        return 'def test_kill(): pass'
+    stub_create(dummy_create)
     # Run mutate command
     runner = CliRunner()
     result = runner.invoke(main, ['mutate', '--path', 'src'])
@@ -159,4 +201,272 @@ def test_mutate_generates_kill_tests(tmp_path, monkeypatch):
     test_file = tmp_path / 'tests' / 'test_mutant_mod_1.py'
     assert test_file.exists()
     content = test_file.read_text()
-    assert 'def test_kill' in content
\ No newline at end of file
+    assert 'def test_kill' in content
+
+def _write_src_and_config(tmp_path):
+    src_dir = tmp_path / 'src'
+    src_dir.mkdir()
+    (src_dir / 'math_utils.py').write_text('def add(a, b):\n    return a + b\n')
+    config = {'src_path': 'src', 'language': 'python', 'framework': 'pytest',
+              'prompts': {'unit_test': 'Test {framework} for {language} code:\n{code}'}}
+    (tmp_path / '.codex-autotest.yaml').write_text(yaml.dump(config))
+
+def test_generate_tests_reuses_disk_cache(tmp_path, monkeypatch, stub_create):
+    monkeypatch.chdir(tmp_path)
+    _write_src_and_config(tmp_path)
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    calls = []
+    def dummy_create(**kwargs):
+        calls.append(kwargs)
+        return 'def test_add(): pass'
+    stub_create(dummy_create)
+    runner = CliRunner()
+    assert runner.invoke(main, ['generate-tests']).exit_code == 0
+    assert len(calls) == 1
+    # Unchanged tree: served from .codex-autotest/cache
+    result = runner.invoke(main, ['generate-tests'])
+    assert result.exit_code == 0
+    assert '+def test_add(): pass' in result.output
+    assert len(calls) == 1
+    assert runner.invoke(main, ['--refresh', 'generate-tests']).exit_code == 0
+    assert len(calls) == 2
+    assert runner.invoke(main, ['--no-cache', 'generate-tests']).exit_code == 0
+    assert len(calls) == 3
+    stats = runner.invoke(main, ['cache', 'stats'])
+    assert 'Entries: 1' in stats.output
+    cleared = runner.invoke(main, ['cache', 'clear'])
+    assert 'Removed 1 cache entries.' in cleared.output
+    assert 'Entries: 0' in runner.invoke(main, ['cache', 'stats']).output
+
+def test_generate_tests_covers_modules_without_definitions(tmp_path, monkeypatch, stub_create):
+    monkeypatch.chdir(tmp_path)
+    _write_src_and_config(tmp_path)
+    (tmp_path / 'src' / 'script.py').write_text('double = lambda x: x * 2\nprint(double(2))\n')
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    stub_create(lambda **kwargs: 'def test_double(): pass')
+    result = CliRunner().invoke(main, ['--no-cache', 'generate-tests', '--apply'])
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / 'tests' / 'test_script.py').exists()
+
+def test_docstring_bulk_export_and_import(tmp_path, monkeypatch, stub_create):
+    from codex_autotest.mock_server import complete_batch
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    (tmp_path / 'src').mkdir()
+    f = tmp_path / 'src' / 'c.py'
+    f.write_text('def foo():\n    pass\n\ndef bar():\n    pass\n')
+    calls = []
+    stub_create(lambda **kwargs: calls.append(kwargs) or 'Live docs')
+    runner = CliRunner()
+    result = runner.invoke(main, ['--no-cache', 'docstring', '--path', 'src', '--bulk-export', 'jobs.jsonl'])
+    assert result.exit_code == 0, result.output
+    assert 'Wrote 2 request(s) to jobs.jsonl' in result.output
+    assert '"""' not in f.read_text()
+    complete_batch('jobs.jsonl', 'results.jsonl',
+                   lambda body: 'Docs for foo' if 'def foo' in body['messages'][0]['content'] else 'Docs for bar')
+    result = runner.invoke(main, ['--no-cache', 'docstring', '--path', 'src', '--apply',
+                                  '--bulk-import', 'results.jsonl'])
+    assert result.exit_code == 0, result.output
+    assert '"""Docs for foo"""' in f.read_text() and '"""Docs for bar"""' in f.read_text()
+    assert calls == []
+    # Requests go back to the API once the import is over
+    f.write_text('def baz():\n    pass\n')
+    assert runner.invoke(main, ['--no-cache', 'docstring', '--path', 'src']).exit_code == 0
+    assert len(calls) == 1
+
+def test_profile_and_metrics_out(tmp_path, monkeypatch, stub_create):
+    import json
+    monkeypatch.chdir(tmp_path)
+    _write_src_and_config(tmp_path)
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    stub_create(lambda **kwargs: 'def test_add(): pass')
+    runner = CliRunner()
+    result = runner.invoke(main, ['--no-cache', '--profile', '--metrics-out', 'metrics.jsonl',
+                                  'generate-tests', '--apply'])
+    assert result.exit_code == 0
+    assert 'discovery' in result.output
+    assert 'Requests: 1 (cache hits 0, misses 1), retries 0, errors 0' in result.output
+    events = [json.loads(line) for line in (tmp_path / 'metrics.jsonl').read_text().splitlines()]
+    kinds = [e['event'] for e in events]
+    assert kinds == ['request', 'write', 'run']
+    assert events[0]['command'] == 'generate-tests'
+    assert events[0]['cache'] == 'off' and events[0]['ok']
+    assert events[1]['bytes'] == len('def test_add(): pass')
+    assert events[2]['counters']['bytes_written'] == events[1]['bytes']
+
+def test_mutate_pipeline_is_concurrent_and_ordered(tmp_path, monkeypatch, stub_create):
+    import shutil, subprocess, json
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'mod.py').write_text('def foo():\n    return 42\n')
+    config = {'src_path': 'src', 'prompts': {'kill_mutant': 'Kill mutant diff:\n{diff}'}}
+    (tmp_path / '.codex-autotest.yaml').write_text(yaml.dump(config))
+    monkeypatch.setattr(shutil, 'which', lambda name: '/usr/bin/mutmut')
+    survivors = [{'id': i, 'filename': 'src/mod.py', 'status': 'survived'} for i in range(1, 7)]
+    def fake_run(cmd, capture_output=False, text=False):
+        from types import SimpleNamespace
+        if cmd[:2] == ['mutmut', 'results']:
+            return SimpleNamespace(returncode=0, stdout=json.dumps(survivors), stderr='')
+        if cmd[:2] == ['mutmut', 'show']:
+            if cmd[2] == '3':
+                return SimpleNamespace(returncode=1, stdout='', stderr='no such mutant')
+            return SimpleNamespace(returncode=0, stdout=f'--- mutant {cmd[2]}', stderr='')
+        return SimpleNamespace(returncode=0, stdout='', stderr='')
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    def dummy_create(messages, **kwargs):
+        mutant = messages[0]['content'].rsplit(' ', 1)[-1]
+        if mutant == '5':
+            raise RuntimeError('boom')
+        return f'def test_kill_{mutant}(): pass'
+    stub_create(dummy_create)
+    from codex_autotest import openai_client
+    monkeypatch.setattr(openai_client.time, 'sleep', lambda seconds: None)
+    result = CliRunner().invoke(main, ['--no-cache', 'mutate', '--jobs', '4'])
+    assert result.exit_code == 0
+    processed = [line for line in result.output.splitlines() if line.startswith('Processing')]
+    assert [line.split()[3] for line in processed] == ['1', '2', '3', '4', '5', '6']
+    for i in (1, 2, 4, 6):
+        assert (tmp_path / 'tests' / f'test_mutant_mod_{i}.py').read_text() == f'def test_kill_{i}(): pass'
+    assert not (tmp_path / 'tests' / 'test_mutant_mod_3.py').exists()
+    assert '4 kill test(s) written, 1 show error(s), 1 generation error(s)' in result.output
+    assert 'Failed mutants: 3, 5' in result.output
+
+def test_mutate_verify_regenerates_until_the_mutant_is_killed(tmp_path, monkeypatch, stub_create):
+    import shutil, subprocess, json
+    real_run = subprocess.run
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'calc.py').write_text('def add(a, b):\n    return a + b\n')
+    config = {'src_path': 'src', 'prompts': {'kill_mutant': 'Kill mutant diff:\n{diff}'}}
+    (tmp_path / '.codex-autotest.yaml').write_text(yaml.dump(config))
+    monkeypatch.setattr(shutil, 'which', lambda name: '/usr/bin/mutmut')
+    survivors = [{'id': 1, 'filename': 'src/calc.py', 'status': 'survived'}]
+    diff = '--- src/calc.py\n+++ src/calc.py\n@@ -1,2 +1,2 @@\n def add(a, b):\n-    return a + b\n+    return a - b\n'
+    def fake_run(cmd, **kwargs):
+        from types import SimpleNamespace
+        if cmd[:2] == ['mutmut', 'results']:
+            return SimpleNamespace(returncode=0, stdout=json.dumps(survivors), stderr='')
+        if cmd[:2] == ['mutmut', 'show']:
+            return SimpleNamespace(returncode=0, stdout=diff, stderr='')
+        if cmd[0] == 'mutmut':
+            return SimpleNamespace(returncode=0, stdout='', stderr='')
+        return real_run(cmd, **kwargs)
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    prompts = []
+    def dummy_create(messages, **kwargs):
+        prompts.append(messages[0]['content'])
+        if len(prompts) == 1:
+            return 'import sys; sys.path.insert(0, "src")\nfrom calc import add\n\ndef test_add():\n    assert add(0, 0) == 0\n'
+        return 'import sys; sys.path.insert(0, "src")\nfrom calc import add\n\ndef test_add():\n    assert add(2, 1) == 3\n'
+    stub_create(dummy_create)
+    result = CliRunner().invoke(main, ['--no-cache', 'mutate', '--verify', '--max-attempts', '2'])
+    assert result.exit_code == 0, result.output
+    assert len(prompts) == 2
+    assert 'did not kill the mutant' in prompts[1] and 'assert add(0, 0) == 0' in prompts[1]
+    assert 'assert add(2, 1) == 3' in (tmp_path / 'tests' / 'test_mutant_calc_1.py').read_text()
+    assert 'verified after 2 attempt(s)' in result.output
+    assert '1 kill test(s) written, 0 show error(s), 0 generation error(s), 0 unverified.' in result.output
+
+def test_mutate_reuses_cached_results_for_unchanged_modules(tmp_path, monkeypatch, stub_create):
+    import shutil, subprocess, json
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'a.py').write_text('def a():\n    return 1\n')
+    (tmp_path / 'src' / 'b.py').write_text('def b():\n    return 2\n')
+    config = {'src_path': 'src', 'prompts': {'kill_mutant': 'Kill mutant diff:\n{diff}'}}
+    (tmp_path / '.codex-autotest.yaml').write_text(yaml.dump(config))
+    monkeypatch.setattr(shutil, 'which', lambda name: '/usr/bin/mutmut')
+    runs = []
+    def fake_run(cmd, **kwargs):
+        from types import SimpleNamespace
+        if cmd[:2] == ['mutmut', 'run']:
+            runs.append(cmd[3])
+        if cmd[:2] == ['mutmut', 'results']:
+            results = [{'id': 1, 'filename': 'src/a.py', 'status': 'survived'},
+                       {'id': 2, 'filename': 'src/b.py', 'status': 'killed'}]
+            return SimpleNamespace(returncode=0, stdout=json.dumps(results), stderr='')
+        if cmd[:2] == ['mutmut', 'show']:
+            return SimpleNamespace(returncode=0, stdout=f'--- mutant {cmd[2]}', stderr='')
+        # pytest run of an existing kill test: it passes
+        return SimpleNamespace(returncode=0, stdout='', stderr='')
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    calls = []
+    def dummy_create(**kwargs):
+        calls.append(kwargs)
+        return 'def test_kill(): pass'
+    stub_create(dummy_create)
+    result = CliRunner().invoke(main, ['--no-cache', 'mutate'])
+    assert result.exit_code == 0, result.output
+    assert runs == ['src'] and len(calls) == 1
+    # Nothing changed: mutmut is not run and the passing kill test is not regenerated
+    result = CliRunner().invoke(main, ['--no-cache', 'mutate'])
+    assert result.exit_code == 0, result.output
+    assert runs == ['src'] and len(calls) == 1
+    assert 'Reused cached mutation results for 2 of 2 file(s).' in result.output
+    assert 'Skipped 1 surviving mutant(s) whose kill test already passes.' in result.output
+    # Only the changed module is mutated again
+    (tmp_path / 'src' / 'b.py').write_text('def b():\n    return 3\n')
+    result = CliRunner().invoke(main, ['--no-cache', 'mutate'])
+    assert result.exit_code == 0, result.output
+    assert runs == ['src', os.path.join('src', 'b.py')]
+    assert 'Reused cached mutation results for 1 of 2 file(s).' in result.output
+
+def test_mutate_group_sends_one_request_per_function(tmp_path, monkeypatch, stub_create):
+    import shutil, subprocess, json
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'calc.py').write_text('def add(a, b):\n    return a + b\n\n\ndef neg(a):\n    return -a\n')
+    config = {'src_path': 'src', 'prompts': {'kill_mutant': 'Kill mutant diff:\n{diff}'}}
+    (tmp_path / '.codex-autotest.yaml').write_text(yaml.dump(config))
+    monkeypatch.setattr(shutil, 'which', lambda name: '/usr/bin/mutmut')
+    survivors = [{'id': i, 'filename': 'src/calc.py', 'status': 'survived'} for i in (1, 2, 3)]
+    lines = {'1': 2, '2': 6, '3': 2}
+    def fake_run(cmd, **kwargs):
+        from types import SimpleNamespace
+        if cmd[:2] == ['mutmut', 'results']:
+            return SimpleNamespace(returncode=0, stdout=json.dumps(survivors), stderr='')
+        if cmd[:2] == ['mutmut', 'show']:
+            diff = f'--- src/calc.py\n+++ src/calc.py\n@@ -{lines[cmd[2]]},1 +{lines[cmd[2]]},1 @@\n-old\n+new{cmd[2]}\n'
+            return SimpleNamespace(returncode=0, stdout=diff, stderr='')
+        return SimpleNamespace(returncode=0, stdout='', stderr='')
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    prompts = []
+    def dummy_create(messages, **kwargs):
+        prompts.append(messages[0]['content'])
+        return f'def test_kill_{len(prompts)}(): pass'
+    stub_create(dummy_create)
+    result = CliRunner().invoke(main, ['--no-cache', 'mutate', '--group', '--jobs', '2'])
+    assert result.exit_code == 0, result.output
+    assert len(prompts) == 2
+    add_prompt = next(p for p in prompts if 'mutants of add in src/calc.py' in p)
+    assert '### Mutant 1' in add_prompt and '### Mutant 3' in add_prompt and '### Mutant 2' not in add_prompt
+    assert (tmp_path / 'tests' / 'test_mutants_calc_add.py').exists()
+    assert (tmp_path / 'tests' / 'test_mutants_calc_neg.py').exists()
+    assert 'Grouped 3 surviving mutant(s) into 2 kill-test request(s).' in result.output
+    assert '2 kill test(s) written' in result.output
+
+def test_help_lists_commands_without_importing_them():
+    import subprocess, sys
+    code = (
+        'import sys\n'
+        'from click.testing import CliRunner\n'
+        'from codex_autotest.cli import main\n'
+        'result = CliRunner().invoke(main, ["--help"])\n'
+        'assert "audit-security" in result.output and "mutate" in result.output, result.output\n'
+        'print(sorted(m for m in sys.modules if m.startswith("codex_autotest.commands") or m in ("openai", "yaml")))\n'
+    )
+    run = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert run.returncode == 0, run.stderr
+    assert run.stdout.strip() == '[]'
+
+def test_lazy_command_table_matches_commands():
+    from codex_autotest.cli import COMMANDS
+    for name, (target, short_help) in COMMANDS.items():
+        command = main.get_command(None, name)
+        assert command is not None, name
+        assert command.help.strip().split('\n')[0] == short_help
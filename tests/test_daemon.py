@@ -0,0 +1,130 @@
+import io
+import json
+import os
+import socket
+import threading
+import time
+import pytest
+from codex_autotest import cli, daemon
+from codex_autotest.daemon import Daemon, command_name, forward, request
+from codex_autotest.journal import RunJournal
+
+
+def test_command_name_skips_global_options():
+    assert command_name(['--profile', '--metrics-out', 'm.jsonl', 'explain', 'a.py']) == 'explain'
+    assert command_name(['--help']) is None
+
+def test_forward_runs_locally_without_a_daemon(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert forward(['cache', 'stats']) is None
+
+def test_daemon_serves_commands_until_stopped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(daemon.NO_DAEMON_ENV, raising=False)
+    server = Daemon()
+    ready = threading.Event()
+    thread = threading.Thread(target=server.serve, kwargs={'ready': ready.set})
+    thread.start()
+    try:
+        assert ready.wait(5)
+        out, err = io.StringIO(), io.StringIO()
+        assert forward(['cache', 'stats'], stdout=out, stderr=err) == 0
+        assert 'Entries: 0' in out.getvalue()
+        out, err = io.StringIO(), io.StringIO()
+        assert forward(['explain', 'missing.py'], stdout=out, stderr=err) == 0
+        assert 'missing.py' in err.getvalue() and not out.getvalue()
+        # Interactive commands are never forwarded
+        assert forward(['review', 'tests/test_x.py']) is None
+        assert request({'op': 'ping'})['requests'] == 2
+    finally:
+        request({'op': 'stop'})
+        thread.join(5)
+    assert not thread.is_alive()
+    assert not os.path.exists(daemon.DEFAULT_SOCKET)
+    assert forward(['cache', 'stats']) is None
+
+@pytest.fixture
+def running(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(daemon.NO_DAEMON_ENV, raising=False)
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    server = Daemon()
+    ready = threading.Event()
+    thread = threading.Thread(target=server.serve, kwargs={'ready': ready.set})
+    thread.start()
+    assert ready.wait(5)
+    yield server
+    request({'op': 'stop'})
+    thread.join(5)
+
+def _idle():
+    """Return the daemon's ping reply once no command is running."""
+    for _ in range(500):
+        reply = request({'op': 'ping'})
+        if not reply['busy']:
+            return reply
+        time.sleep(0.01)
+    raise AssertionError('daemon stayed busy')
+
+class _Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+def test_daemon_streams_to_terminals_and_rejects_other_keys(running, tmp_path, monkeypatch):
+    (tmp_path / 'a.py').write_text('x = 1\n')
+    monkeypatch.setattr(cli, 'stream_completion', lambda prompt, **kwargs: iter(['streamed']))
+    monkeypatch.setattr(cli, 'chat_completion', lambda prompt, **kwargs: 'buffered')
+    out = _Terminal()
+    assert forward(['--no-cache', 'explain', 'a.py'], stdout=out, stderr=io.StringIO()) == 0
+    assert out.getvalue() == 'streamed\n'
+    out = io.StringIO()
+    assert forward(['--no-cache', 'explain', 'a.py'], stdout=out, stderr=io.StringIO()) == 0
+    assert out.getvalue() == 'buffered\n'
+    reply = request({'argv': ['cache', 'stats'], 'cwd': os.getcwd(), 'key': 'another key'})
+    assert 'OPENAI_API_KEY' in reply['reject']
+
+def test_client_disconnect_interrupts_only_its_command(running, tmp_path, monkeypatch):
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'a.py').write_text('def foo():\n    pass\n')
+    gone = threading.Event()
+    def slow(prompt, **kwargs):
+        gone.wait(5)
+        return 'Docs'
+    monkeypatch.setattr(cli, 'chat_completion', slow)
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(daemon.DEFAULT_SOCKET)
+    client.sendall(json.dumps({'argv': ['--no-cache', 'docstring', '--path', 'src'], 'cwd': os.getcwd(),
+                               'key': daemon.key_digest()}).encode('utf-8') + b'\n')
+    client.close()
+    gone.set()
+    # The daemon survives and the interrupted run can be resumed
+    assert _idle()['requests'] == 1
+    start, _, finished = RunJournal('docstring').read()
+    assert start is not None and not finished
+    out = io.StringIO()
+    assert forward(['cache', 'stats'], stdout=out, stderr=io.StringIO()) == 0
+    assert 'Entries: 0' in out.getvalue()
+
+def test_commands_arriving_during_a_command_run_locally(running, tmp_path, monkeypatch):
+    (tmp_path / 'a.py').write_text('x = 1\n')
+    started, release = threading.Event(), threading.Event()
+    def slow(prompt, **kwargs):
+        started.set()
+        release.wait(5)
+        return 'slow'
+    monkeypatch.setattr(cli, 'chat_completion', slow)
+    out = io.StringIO()
+    first = threading.Thread(target=forward, args=(['--no-cache', 'explain', 'a.py'],),
+                             kwargs={'stdout': out, 'stderr': io.StringIO()})
+    first.start()
+    try:
+        assert started.wait(5)
+        # Control messages are still answered; commands are handed back to the client
+        assert request({'op': 'ping'})['busy']
+        assert forward(['cache', 'stats'], stdout=io.StringIO(), stderr=io.StringIO()) is None
+    finally:
+        release.set()
+        first.join(5)
+    assert out.getvalue() == 'slow\n'
+    assert _idle()['requests'] == 1
+    assert forward(['cache', 'stats'], stdout=io.StringIO(), stderr=io.StringIO()) == 0
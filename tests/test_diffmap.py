@@ -0,0 +1,47 @@
+from codex_autotest.diffmap import normalize, split
+from codex_autotest.tokens import estimate_tokens
+
+DIFF = (
+    'diff --git a/a.py b/a.py\n'
+    'index 111..222 100644\n'
+    '--- a/a.py\n'
+    '+++ b/a.py\n'
+    '@@ -1,2 +1,2 @@ def one():\n'
+    '-    return 1\n'
+    '+    return 2\n'
+    '@@ -40,2 +40,2 @@ def two():\n'
+    '-    return 3\n'
+    '+    return 4\n'
+    'diff --git a/b.py b/b.py\n'
+    '--- a/b.py\n'
+    '+++ b/b.py\n'
+    '@@ -5 +5 @@\n'
+    '-x = 1\n'
+    '+x = 2\n'
+)
+
+
+def test_split_per_file_and_per_hunk():
+    pieces = split(DIFF, estimate_tokens)
+    assert [p.path for p in pieces] == ['a.py', 'b.py']
+    assert 'index ' not in pieces[0].text and '@@ def two():' in pieces[0].text
+    small = split(DIFF, estimate_tokens, max_tokens=50)
+    assert [p.path for p in small] == ['a.py', 'a.py', 'b.py']
+    assert small[1].text.startswith('diff --git a/a.py b/a.py\n--- a/a.py\n+++ b/a.py\n@@ def two():')
+
+
+def test_shifted_hunks_normalise_to_the_same_text():
+    shifted = DIFF.replace('@@ -40,2 +40,2 @@', '@@ -52,2 +52,2 @@').replace('index 111..222', 'index 333..444')
+    assert split(shifted, estimate_tokens, 50) == split(DIFF, estimate_tokens, 50)
+    assert normalize(['@@ -5 +5 @@']) == ['@@']
+
+
+def test_oversized_hunk_is_cut_into_line_runs():
+    body = ''.join(f'+line_{i} = {i}\n' for i in range(60))
+    diff = 'diff --git a/c.py b/c.py\n--- a/c.py\n+++ b/c.py\n@@ -0,0 +1,60 @@\n' + body
+    pieces = split(diff, estimate_tokens, max_tokens=80)
+    assert len(pieces) > 1
+    assert all(estimate_tokens(p.text) <= 80 for p in pieces)
+    assert all(p.text.split('\n')[3] == '@@' for p in pieces)
+    lines = [line for p in pieces for line in p.text.split('\n')[4:]]
+    assert lines == body.splitlines()
@@ -0,0 +1,56 @@
+from pathlib import Path
+from codex_autotest.discovery import IgnoreRules, discover
+
+def _tree(root, files):
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content)
+
+def test_ignore_rules_follow_gitignore_semantics(tmp_path):
+    rules = IgnoreRules()
+    for line in ['*.log', '/build/', 'docs/**/*.md', '!docs/keep.md', 'cache/']:
+        rules.add(line, tmp_path)
+    assert rules.ignored(tmp_path / 'a' / 'x.log', False)
+    assert rules.ignored(tmp_path / 'build', True)
+    assert not rules.ignored(tmp_path / 'src' / 'build', True)
+    assert rules.ignored(tmp_path / 'docs' / 'a' / 'b.md', False)
+    assert not rules.ignored(tmp_path / 'docs' / 'keep.md', False)
+    assert not rules.ignored(tmp_path / 'cache', False)
+    assert rules.ignored(tmp_path / 'x' / 'cache', True)
+
+def test_discover_prunes_ignored_and_skips_unusable_files(tmp_path, monkeypatch):
+    (tmp_path / '.git').mkdir()
+    _tree(tmp_path, {
+        '.gitignore': 'src/gen/\n',
+        'src/a.py': 'x = 1\n',
+        'src/pkg/b.py': 'x = 1\n',
+        'src/pkg/.gitignore': 'skip_*.py\n',
+        'src/pkg/skip_me.py': 'x = 1\n',
+        'src/gen/c.py': 'x = 1\n',
+        'src/.venv/lib/d.py': 'x = 1\n',
+        'src/node_modules/e.js': 'x\n',
+        'src/f_pb2.py': 'x = 1\n',
+        'src/generated.py': '# @generated by a tool\nx = 1\n',
+        'src/binary.py': b'\x00\x01',
+        'src/large.py': 'x' * 2048,
+    })
+    monkeypatch.chdir(tmp_path)
+    config = {'discovery': {'max_file_size_kb': 1}}
+    assert discover('src', '.py', config) == [Path('src/a.py'), Path('src/pkg/b.py')]
+
+def test_discover_include_exclude_globs(tmp_path):
+    _tree(tmp_path, {'a.py': '', 'pkg/b.py': '', 'pkg/tests/test_b.py': '', 'legacy/c.py': ''})
+    config = {'discovery': {'include': ['pkg/**'], 'exclude': ['test_*.py']}}
+    assert discover(tmp_path, '.py', config) == [tmp_path / 'pkg' / 'b.py']
+    config = {'discovery': {'exclude': ['legacy/']}}
+    assert discover(tmp_path, '.py', config) == [tmp_path / 'a.py', tmp_path / 'pkg' / 'b.py',
+                                                 tmp_path / 'pkg' / 'tests' / 'test_b.py']
+
+def test_discover_prunes_build_output_only_at_the_scan_root(tmp_path):
+    _tree(tmp_path, {'build/lib/a.py': '', 'dist/b.py': '', 'env/c.py': '',
+                     'pkg/build/d.py': '', 'pkg/env/e.py': '', 'pkg/venv/f.py': ''})
+    assert discover(tmp_path, '.py', {}) == [tmp_path / 'pkg' / 'build' / 'd.py', tmp_path / 'pkg' / 'env' / 'e.py']
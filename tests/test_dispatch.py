@@ -0,0 +1,33 @@
+import threading
+import time
+from codex_autotest.dispatch import imap_ordered
+
+def test_imap_ordered_serial_collects_errors():
+    def work(x):
+        if x == 2:
+            raise ValueError('bad')
+        return x * 10
+    results = list(imap_ordered(work, [1, 2, 3]))
+    assert [(i, r) for i, r, _ in results] == [(1, 10), (2, None), (3, 30)]
+    assert isinstance(results[1][2], ValueError)
+
+def test_imap_ordered_parallel_preserves_order():
+    def work(x):
+        time.sleep(0.01 * (5 - x))
+        return x
+    results = list(imap_ordered(work, range(5), jobs=5))
+    assert [r for _, r, _ in results] == [0, 1, 2, 3, 4]
+
+def test_imap_ordered_bounds_concurrency():
+    lock = threading.Lock()
+    state = {'active': 0, 'peak': 0}
+    def work(x):
+        with lock:
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        time.sleep(0.01)
+        with lock:
+            state['active'] -= 1
+        return x
+    list(imap_ordered(work, range(20), jobs=3))
+    assert state['peak'] <= 3
@@ -0,0 +1,20 @@
+from codex_autotest import docbatch
+
+def test_pack_respects_object_and_token_caps():
+    items = ['a' * n for n in (1, 1, 1, 5, 1)]
+    assert docbatch.pack(items, len, max_objects=2, max_tokens=100) == [['a', 'a'], ['a', 'aaaaa'], ['a']]
+    # An oversized item gets a batch of its own
+    assert docbatch.pack(items, len, max_objects=10, max_tokens=4) == [['a', 'a', 'a'], ['aaaaa'], ['a']]
+
+def test_render_lists_objects_under_keys():
+    prompt = docbatch.render('Document {language}:\n{objects}', 'python',
+                             [('D1', 'function', 'foo', 3, 'def foo():\n    pass')])
+    assert prompt == 'Document python:\n### D1: function foo (line 3)\ndef foo():\n    pass'
+
+def test_parse_json_reply_with_fences():
+    reply = '```json\n{"D1": "Return foo.", "D2": "\\"\\"\\"Quoted.\\"\\"\\"", "D3": ""}\n```'
+    assert docbatch.parse(reply, ['D1', 'D2', 'D3']) == {'D1': 'Return foo.', 'D2': 'Quoted.'}
+
+def test_parse_salvages_truncated_reply():
+    reply = '{"D1": "First line.\\n\\nMore.", "D2": "Second.", "D3": "cut off'
+    assert docbatch.parse(reply, ['D1', 'D2', 'D3']) == {'D1': 'First line.\n\nMore.', 'D2': 'Second.'}
@@ -0,0 +1,86 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from codex_autotest import docplan
+from codex_autotest.docplan import Insertion, analyse, apply, iter_plans
+
+SOURCE = (
+    'def documented():\n'
+    '    """Doc."""\n'
+    '\n'
+    'def bare(x):\n'
+    '    return x\n'
+    '\n'
+    'class Box:\n'
+    '    def get(self):\n'
+    '        return 1\n'
+)
+
+
+def test_analyse_lists_undocumented_definitions_bottom_up(tmp_path):
+    f = tmp_path / 'm.py'
+    f.write_text(SOURCE)
+    plan = analyse(f)
+    assert plan.error is None and plan.content == SOURCE
+    assert [(i.name, i.obj_type, i.line, i.indent) for i in plan.insertions] == [
+        ('get', 'method', 9, '        '), ('Box', 'class', 8, '    '), ('bare', 'function', 5, '    ')]
+    assert pickle.loads(pickle.dumps(plan)) == plan
+    assert [i.name for i in analyse(f, touched=[(4, 4)]).insertions] == ['bare']
+    (tmp_path / 'bad.py').write_text('def broken(:\n')
+    assert analyse(tmp_path / 'bad.py').error
+
+
+def test_worker_processes_yield_the_same_plans_in_order(tmp_path):
+    paths = []
+    for i in range(40):
+        f = tmp_path / f'm{i}.py'
+        f.write_text(SOURCE.replace('bare', f'bare{i}'))
+        paths.append(f)
+    serial = list(iter_plans(paths))
+    assert list(iter_plans(paths, workers=2)) == serial
+    assert [p.path for p in serial] == [str(p) for p in paths]
+    # Plans of the requested paths carry their symbol index entry
+    indexed = list(iter_plans(paths[:2], workers=2, index=paths[:1]))
+    assert [s['qualname'] for s in indexed[0].entry['symbols']] == ['documented', 'bare0', 'Box', 'Box.get']
+    assert indexed[1].entry is None
+
+
+def test_worker_submissions_are_bounded_and_cancelled_on_close(tmp_path, monkeypatch):
+    pools = []
+
+    class Recording(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.submitted = 0
+            self.shutdown_args = None
+            pools.append(self)
+
+        def submit(self, *args, **kwargs):
+            self.submitted += 1
+            return super().submit(*args, **kwargs)
+
+        def shutdown(self, *args, **kwargs):
+            self.shutdown_args = kwargs
+            return super().shutdown(*args, **kwargs)
+
+    monkeypatch.setattr(docplan, 'ProcessPoolExecutor', Recording)
+    monkeypatch.setattr(docplan, 'CHUNK_SIZE', 2)
+    paths = []
+    for i in range(40):
+        f = tmp_path / f'm{i}.py'
+        f.write_text(SOURCE)
+        paths.append(f)
+    plans = iter_plans(paths, workers=2)
+    assert next(plans).path == str(paths[0])
+    # Two chunks per worker ahead, plus the one that replaced the consumed chunk
+    assert pools[0].submitted == docplan.WINDOW * 2 + 1
+    plans.close()
+    assert pools[0].shutdown_args == {'cancel_futures': True}
+
+
+def test_apply_inserts_docstrings_with_indentation():
+    lines = SOURCE.splitlines()
+    bare = Insertion(5, 'function', 'bare', 4, 5, '    ')
+    get = Insertion(9, 'method', 'get', 8, 9, '        ')
+    out = apply(lines, [bare, get], {bare: '"""Return x."""', get: '"""One."""'})
+    assert out[4:6] == ['    """Return x."""', '    return x']
+    assert out[-2:] == ['        """One."""', '        return 1']
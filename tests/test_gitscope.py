@@ -0,0 +1,38 @@
+import subprocess
+from pathlib import Path
+import pytest
+from codex_autotest.gitscope import changed_lines, overlaps
+
+def _git(*args):
+    subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@example.com', *args],
+                   check=True, capture_output=True)
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _git('init', '-q')
+    (tmp_path / 'a.py').write_text('def a():\n    return 1\n\ndef b():\n    return 2\n')
+    (tmp_path / 'c.py').write_text('x = 1\n')
+    _git('add', '.')
+    _git('commit', '-qm', 'init')
+    return tmp_path
+
+def test_changed_lines_since_ref(repo):
+    (repo / 'a.py').write_text('def a():\n    return 1\n\ndef b():\n    return 3\n')
+    ranges = changed_lines(ref='HEAD')
+    assert list(ranges) == [Path('a.py').resolve()]
+    assert ranges[Path('a.py').resolve()] == [(5, 5)]
+
+def test_changed_lines_staged_only(repo):
+    (repo / 'c.py').write_text('x = 2\n')
+    (repo / 'a.py').write_text('# unstaged\n')
+    _git('add', 'c.py')
+    assert set(changed_lines(staged=True)) == {Path('c.py').resolve()}
+
+def test_changed_lines_bad_ref(repo):
+    with pytest.raises(RuntimeError):
+        changed_lines(ref='no-such-ref')
+
+def test_overlaps():
+    assert overlaps([(5, 5)], 4, 5)
+    assert not overlaps([(5, 5)], 1, 2)
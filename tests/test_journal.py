@@ -0,0 +1,39 @@
+from codex_autotest.journal import RunJournal
+
+def test_journal_tracks_latest_run_and_survives_torn_lines(tmp_path):
+    journal = RunJournal('audit-security', directory=str(tmp_path))
+    assert journal.resumable('s1') is None
+    journal.start('s1')
+    journal.record('src/a.py', 'done', offset=10)
+    journal.record('src/b.py', 'failed', error='timeout')
+    journal.close()
+    with open(journal.path, 'a') as f:
+        f.write('{"item": "src/c.py", "sta')
+    items = journal.resumable('s1')
+    assert {k: v['status'] for k, v in items.items()} == {'src/a.py': 'done', 'src/b.py': 'failed'}
+    assert items['src/a.py']['offset'] == 10
+    assert journal.resumable('other settings') is None
+    # Resuming appends to the same run; finishing closes it
+    journal.start('s1', resume=True)
+    journal.record('src/b.py', 'done', offset=20)
+    journal.finish()
+    start, items, finished = journal.read()
+    assert finished and items['src/b.py']['status'] == 'done'
+    assert journal.resumable('s1') is None
+    # A new run starts from scratch
+    journal.start('s2')
+    journal.close()
+    assert journal.resumable('s2') == {}
+
+def test_journal_lists_pending_and_failed_items(tmp_path):
+    journal = RunJournal('refactor', directory=str(tmp_path))
+    journal.start('s1', params={'focus': 'speed'}, pending=['a.py', 'b.py', 'c.py'])
+    journal.record('a.py', 'done')
+    journal.record('b.py', 'failed', error='timeout')
+    journal.finish()
+    start, items, _ = journal.read()
+    assert start['params'] == {'focus': 'speed'}
+    assert items['c.py']['status'] == 'pending'
+    assert journal.failures == 1
+    assert journal.failed('s1') == ['b.py']
+    assert journal.failed('s2') is None
@@ -0,0 +1,22 @@
+from codex_autotest.manifest import Manifest, fingerprint
+
+def test_record_and_is_current(tmp_path):
+    path = tmp_path / 'manifest.json'
+    manifest = Manifest(str(path))
+    prompt = fingerprint('Test {code}', 'python')
+    assert not manifest.is_current('generate-tests', 'src/a.py', 'x = 1', prompt, 'm')
+    manifest.record('generate-tests', 'src/a.py', 'x = 1', prompt, 'm', artifact='tests/test_a.py')
+    manifest.save()
+    reloaded = Manifest(str(path))
+    assert reloaded.is_current('generate-tests', 'src/a.py', 'x = 1', prompt, 'm')
+    assert reloaded.get('generate-tests', 'src/a.py')['artifact'] == 'tests/test_a.py'
+    # Any changed input invalidates the entry
+    assert not reloaded.is_current('generate-tests', 'src/a.py', 'x = 2', prompt, 'm')
+    assert not reloaded.is_current('generate-tests', 'src/a.py', 'x = 1', fingerprint('Other {code}'), 'm')
+    assert not reloaded.is_current('generate-tests', 'src/a.py', 'x = 1', prompt, 'other-model')
+    assert not reloaded.is_current('refactor', 'src/a.py', 'x = 1', prompt, 'm')
+
+def test_corrupt_manifest_is_ignored(tmp_path):
+    path = tmp_path / 'manifest.json'
+    path.write_text('{not json')
+    assert Manifest(str(path)).entries == {}
@@ -0,0 +1,33 @@
+import json
+import urllib.error
+import urllib.request
+import pytest
+from codex_autotest.mock_server import MockServer
+
+def _post(server, body):
+    req = urllib.request.Request(server.base_url + '/chat/completions', data=json.dumps(body).encode(),
+                                 headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req) as resp:
+        return json.loads(resp.read())
+
+def test_mock_server_pads_response():
+    with MockServer(response='ok', response_size=500) as server:
+        data = _post(server, {'model': 'm', 'messages': []})
+    content = data['choices'][0]['message']['content']
+    assert content.startswith('ok') and len(content) == 500
+    assert data['model'] == 'm'
+    assert server.requests == 1
+
+def test_mock_server_error_rate():
+    with MockServer(error_rate=1.0, error_status=429) as server:
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            _post(server, {'messages': []})
+    assert exc.value.code == 429
+    assert exc.value.headers['Retry-After'] == '0'
+    assert server.errors == 1
+
+def test_busy_time_merges_overlapping_intervals():
+    server = MockServer()
+    server.intervals = [(0.0, 1.0), (0.5, 2.0), (3.0, 4.0)]
+    assert server.busy_time() == pytest.approx(3.0)
+    server.server_close()
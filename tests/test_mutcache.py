@@ -0,0 +1,48 @@
+from codex_autotest.mutcache import MutationCache, find_tests, pytest_testpaths, relevant_tests, source_key
+
+def test_relevant_tests_match_module_name_and_conftest():
+    tests = {
+        'tests/test_calc.py': 'from src.calc import add',
+        'tests/test_other.py': 'from src.calculator import mul',
+        'tests/conftest.py': '',
+    }
+    assert relevant_tests('src/calc.py', tests) == ['tests/conftest.py', 'tests/test_calc.py']
+
+def test_key_changes_with_source_or_relevant_tests(tmp_path):
+    source = tmp_path / 'calc.py'
+    source.write_text('def add(a, b):\n    return a + b\n')
+    tests = {'tests/test_calc.py': 'import calc', 'tests/test_other.py': 'import other'}
+    key = source_key(str(source), tests)
+    assert source_key(str(source), dict(tests, **{'tests/test_other.py': 'import other2'})) == key
+    assert source_key(str(source), dict(tests, **{'tests/test_calc.py': 'import calc  # new'})) != key
+    source.write_text('def add(a, b):\n    return b + a\n')
+    assert source_key(str(source), tests) != key
+
+def test_cache_round_trip_and_stale_entries(tmp_path):
+    path = tmp_path / 'mutations.json'
+    cache = MutationCache(str(path))
+    cache.put('src/calc.py', 'k1', [{'id': 1, 'filename': 'src/calc.py', 'status': 'survived'}])
+    cache.save()
+    reloaded = MutationCache(str(path))
+    assert reloaded.get('src/calc.py', 'k1') == [{'id': 1, 'filename': 'src/calc.py', 'status': 'survived'}]
+    assert reloaded.get('src/calc.py', 'k2') is None
+    assert reloaded.get('src/other.py', 'k1') is None
+
+def test_testpaths_follow_the_pytest_configuration(tmp_path):
+    assert pytest_testpaths(str(tmp_path)) == [str(tmp_path / 'tests')]
+    (tmp_path / 'setup.cfg').write_text('[tool:pytest]\ntestpaths = checks\n')
+    assert pytest_testpaths(str(tmp_path)) == [str(tmp_path / 'checks')]
+    (tmp_path / 'pyproject.toml').write_text('[tool.pytest.ini_options]\ntestpaths = ["unit", "pkg/tests"]\n')
+    assert pytest_testpaths(str(tmp_path)) == [str(tmp_path / 'unit'), str(tmp_path / 'pkg' / 'tests')]
+    # pytest.ini takes precedence, even without testpaths
+    (tmp_path / 'pytest.ini').write_text('[pytest]\naddopts = -q\n')
+    assert pytest_testpaths(str(tmp_path)) == [str(tmp_path / 'tests')]
+
+def test_find_tests_ignores_source_include_filters(tmp_path):
+    (tmp_path / 'pytest.ini').write_text('[pytest]\ntestpaths =\n  unit\n  integration\n')
+    for rel in ('unit/test_calc.py', 'integration/conftest.py', 'unit/.venv/test_dep.py', 'tests/test_old.py'):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text('import calc\n')
+    config = {'discovery': {'include': ['src/**'], 'exclude': ['unit/**']}}
+    assert sorted(find_tests(config, str(tmp_path))) == [str(tmp_path / 'integration' / 'conftest.py'),
+                                                         str(tmp_path / 'unit' / 'test_calc.py')]
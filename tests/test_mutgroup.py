@@ -0,0 +1,60 @@
+import ast
+from pathlib import Path
+from codex_autotest.mutgroup import MODULE_SCOPE, enclosing_scope, group_mutants, kill_test_path, mutant_line, render
+
+SOURCE = (
+    'LIMIT = 3\n'
+    '\n'
+    'def add(a, b):\n'
+    '    return a + b\n'
+    '\n'
+    'class Calc:\n'
+    '    def mul(self, a, b):\n'
+    '        return a * b\n'
+)
+
+
+def _diff(line, old, new):
+    return f'--- src/calc.py\n+++ src/calc.py\n@@ -{line - 1},2 +{line - 1},2 @@\n context\n-{old}\n+{new}\n'
+
+
+def test_mutant_line_skips_context():
+    assert mutant_line(_diff(4, '    return a + b', '    return a - b')) == 4
+    assert mutant_line('no hunk here') is None
+
+
+def test_enclosing_scope_prefers_innermost_definition():
+    tree = ast.parse(SOURCE)
+    assert enclosing_scope(tree, 1) == MODULE_SCOPE
+    assert enclosing_scope(tree, 4) == 'add'
+    assert enclosing_scope(tree, 6) == 'Calc'
+    assert enclosing_scope(tree, 8) == 'Calc.mul'
+
+
+def test_group_mutants_by_file_and_function(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'calc.py').write_text(SOURCE)
+    m = lambda i: {'id': i, 'filename': 'src/calc.py'}
+    shown = [
+        (m(1), _diff(4, '    return a + b', '    return a - b')),
+        (m(2), _diff(8, '        return a * b', '        return a / b')),
+        (m(3), _diff(4, '    return a + b', '    return a + b + 1')),
+        (m(4), _diff(1, 'LIMIT = 3', 'LIMIT = 4')),
+    ]
+    groups = group_mutants(shown)
+    assert [(scope, [mm['id'] for mm, diff in members]) for filename, scope, members in groups] == [
+        ('add', [1, 3]), ('Calc.mul', [2]), (MODULE_SCOPE, [4])]
+    assert kill_test_path('src/calc.py', 'Calc.mul', 'src') == Path('tests') / 'test_mutants_calc_Calc_mul.py'
+    assert kill_test_path('src/calc.py', MODULE_SCOPE, 'src') == Path('tests') / 'test_mutants_calc_module.py'
+    prompt = render('Kill in {scope} of {filename}:\n{diffs}', 'python', 'pytest', 'src/calc.py', 'add',
+                    groups[0][2])
+    assert prompt.startswith('Kill in add of src/calc.py:\n### Mutant 1\n')
+    assert '### Mutant 3\n' in prompt
+
+def test_kill_test_paths_of_same_named_modules_differ():
+    assert kill_test_path('src/a/__init__.py', MODULE_SCOPE, 'src') == Path('tests/a/test_mutants___init___module.py')
+    assert kill_test_path('src/b/__init__.py', MODULE_SCOPE, 'src') == Path('tests/b/test_mutants___init___module.py')
+    assert kill_test_path('src/a/utils.py', 'load', 'src') != kill_test_path('src/b/utils.py', 'load', 'src')
+    outside = kill_test_path('lib/utils.py', 'load', 'src')
+    assert outside.parent == Path('tests') and outside != kill_test_path('vendor/utils.py', 'load', 'src')
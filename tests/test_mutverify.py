@@ -0,0 +1,59 @@
+import os
+import pytest
+from codex_autotest.mutverify import Sandbox, apply_unified_diff
+
+DIFF = (
+    '--- src/calc.py\n'
+    '+++ src/calc.py\n'
+    '@@ -1,2 +1,2 @@\n'
+    ' def add(a, b):\n'
+    '-    return a + b\n'
+    '+    return a - b\n'
+)
+
+
+def _project(tmp_path):
+    (tmp_path / 'src').mkdir(parents=True)
+    (tmp_path / 'src' / 'calc.py').write_text('def add(a, b):\n    return a + b\n')
+    (tmp_path / 'src' / '__init__.py').write_text('')
+    return tmp_path
+
+
+def test_apply_unified_diff_uses_context_when_lines_moved(tmp_path):
+    (tmp_path / 'src').mkdir()
+    original = '# header\n\ndef add(a, b):\n    return a + b\n'
+    (tmp_path / 'src' / 'calc.py').write_text(original)
+    path, text = apply_unified_diff(DIFF, str(tmp_path))
+    assert text == original
+    assert (tmp_path / 'src' / 'calc.py').read_text() == '# header\n\ndef add(a, b):\n    return a - b\n'
+    with pytest.raises(ValueError):
+        apply_unified_diff(DIFF, str(tmp_path))
+
+
+def test_sandbox_keeps_only_tests_that_kill_the_mutant(tmp_path):
+    project = _project(tmp_path / 'project')
+    killing = 'from src.calc import add\n\ndef test_add():\n    assert add(2, 1) == 3\n'
+    weak = 'from src.calc import add\n\ndef test_add():\n    assert add(0, 0) == 0\n'
+    broken = 'from src.calc import add\n\ndef test_add():\n    assert add(2, 1) == 4\n'
+    with Sandbox(str(project)) as box:
+        assert box.verify('tests/test_k.py', killing, DIFF).killed
+        weak_verdict = box.verify('tests/test_w.py', weak, DIFF)
+        assert not weak_verdict.killed and 'passes against the mutant' in weak_verdict.output
+        assert 'fails against the original' in box.verify('tests/test_b.py', broken, DIFF).output
+        root = box.root
+    assert (project / 'src' / 'calc.py').read_text() == 'def add(a, b):\n    return a + b\n'
+    assert not (project / 'tests').exists()
+    assert not os.path.exists(root)
+
+
+def test_sandbox_imports_src_layout_packages_from_the_copy(tmp_path):
+    project = tmp_path / 'project'
+    (project / 'src' / 'calcpkg').mkdir(parents=True)
+    (project / 'src' / 'calcpkg' / '__init__.py').write_text('')
+    (project / 'src' / 'calcpkg' / 'calc.py').write_text('def add(a, b):\n    return a + b\n')
+    diff = DIFF.replace('src/calc.py', 'src/calcpkg/calc.py')
+    # No sys.path manipulation: the package must be importable as installed
+    killing = 'from calcpkg.calc import add\n\ndef test_add():\n    assert add(2, 1) == 3\n'
+    with Sandbox(str(project), 'src') as box:
+        verdict = box.verify('tests/test_k.py', killing, diff)
+    assert verdict.killed, verdict.output
@@ -0,0 +1,82 @@
+import pytest
+from codex_autotest import openai_client
+from codex_autotest.mock_server import MockServer
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    openai_client.configure_cache(enabled=False)
+    with MockServer(response='pong') as server:
+        openai_client.configure_client(base_url=server.base_url)
+        yield server
+        openai_client.close_clients()
+    openai_client.configure_cache(enabled=True)
+    openai_client._client_settings['base_url'] = None
+
+def test_get_client_is_shared(mock_api):
+    assert openai_client.get_client() is openai_client.get_client()
+
+def test_chat_completion_reuses_connection(mock_api):
+    for i in range(5):
+        assert openai_client.chat_completion(f'ping {i}') == 'pong'
+    assert mock_api.requests == 5
+    assert len(mock_api.connections) == 1
+
+def test_configure_client_rebuilds_on_change(mock_api):
+    client = openai_client.get_client()
+    openai_client.ensure_pool_size(1)
+    assert openai_client.get_client() is client
+    openai_client.ensure_pool_size(openai_client.DEFAULT_POOL_SIZE + 5)
+    assert openai_client.get_client() is not client
+    openai_client.configure_client(pool_size=openai_client.DEFAULT_POOL_SIZE)
+
+def test_achat_completion(mock_api):
+    import asyncio
+    assert asyncio.run(openai_client.achat_completion('ping')) == 'pong'
+
+def test_achat_completion_across_event_loops(mock_api):
+    import asyncio
+    # Each asyncio.run has its own loop; the client of a closed loop is not reused
+    assert asyncio.run(openai_client.achat_completion('ping 1')) == 'pong'
+    assert asyncio.run(openai_client.achat_completion('ping 2')) == 'pong'
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(openai_client.achat_completion('ping 3')) == 'pong'
+        client = openai_client._clients['async'][1]
+        openai_client.close_clients()
+        assert client.is_closed()
+    finally:
+        loop.close()
+    assert mock_api.requests == 3
+
+def test_achat_completion_uses_response_source(mock_api):
+    import asyncio
+    openai_client.configure_responses(lambda prompt, **kwargs: f'answer to {prompt}')
+    try:
+        assert asyncio.run(openai_client.achat_completion('ping')) == 'answer to ping'
+    finally:
+        openai_client.configure_responses(None)
+    assert mock_api.requests == 0
+
+def test_stream_completion_yields_deltas_and_caches(mock_api, tmp_path):
+    from codex_autotest.cache import ResponseCache
+    mock_api.response = 'one two three'
+    openai_client.configure_cache(enabled=True, cache=ResponseCache(str(tmp_path / 'cache')))
+    try:
+        assert list(openai_client.stream_completion('count')) == ['one ', 'two ', 'three']
+        # A completed stream is cached and replayed whole
+        assert list(openai_client.stream_completion('count')) == ['one two three']
+        assert mock_api.requests == 1
+    finally:
+        openai_client.configure_cache(cache=ResponseCache())
+
+def test_stream_completion_close_releases_limiter(mock_api):
+    mock_api.response = 'one two three'
+    limiter = openai_client.configure_rate_limit(max_concurrency=1)
+    try:
+        stream = openai_client.stream_completion('count')
+        assert next(stream) == 'one '
+        stream.close()
+        assert limiter.active == 0
+    finally:
+        openai_client.configure_rate_limit()
@@ -0,0 +1,79 @@
+import pytest
+from codex_autotest import openai_client
+from codex_autotest.ratelimit import RateLimiter, TokenBucket, is_rate_limited, retry_after
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+    def sleep(self, seconds):
+        self.now += seconds
+
+class RateLimitError(Exception):
+    def __init__(self, headers=None):
+        super().__init__('429 Too Many Requests')
+        self.status_code = 429
+        self.headers = headers or {}
+
+def test_token_bucket_waits_for_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)  # one token per second
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    clock.now += 5
+    assert bucket.reserve(3) == 0
+
+def test_limiter_enforces_rpm():
+    clock = FakeClock()
+    limiter = RateLimiter(rpm=2, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release()
+    # Third request had to wait for the bucket to refill half a minute
+    assert clock.now == pytest.approx(30.0)
+
+def test_limiter_halves_on_429_and_recovers():
+    clock = FakeClock()
+    limiter = RateLimiter(max_concurrency=8, increase_after=2, clock=clock, sleep=clock.sleep)
+    limiter.acquire()
+    limiter.release(ok=False, rate_limited=True, retry_after=3)
+    assert limiter.limit == 4
+    limiter.acquire()
+    assert clock.now == pytest.approx(3.0)
+    limiter.release()
+    limiter.acquire()
+    limiter.release()
+    assert limiter.limit == 5
+    # Ordinary failures neither shrink nor grow the limit
+    limiter.acquire()
+    limiter.release(ok=False)
+    assert limiter.limit == 5
+
+def test_retry_after_hints():
+    assert retry_after(RateLimitError({'Retry-After': '2'})) == 2.0
+    assert retry_after(RateLimitError({'retry-after-ms': '250'})) == 0.25
+    assert retry_after(ValueError()) is None
+    assert is_rate_limited(RateLimitError())
+    assert not is_rate_limited(ValueError())
+
+def test_chat_completion_honours_retry_after(monkeypatch, stub_create):
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    attempts = []
+    def fake_create(**kwargs):
+        attempts.append(kwargs)
+        if len(attempts) == 1:
+            raise RateLimitError({'retry-after': '7'})
+        return 'ok'
+    sleeps = []
+    stub_create(fake_create)
+    monkeypatch.setattr(openai_client.time, 'sleep', sleeps.append)
+    limiter = openai_client.configure_rate_limit(max_concurrency=4)
+    openai_client.configure_cache(enabled=False)
+    try:
+        assert openai_client.chat_completion('hello') == 'ok'
+    finally:
+        openai_client.configure_cache(enabled=True)
+        openai_client.configure_rate_limit()
+    assert sleeps[0] == pytest.approx(7.0, abs=0.5)
+    assert limiter.limit == 2
@@ -0,0 +1,50 @@
+import os
+from codex_autotest.symindex import SymbolIndex, scan
+
+
+def test_scan_records_definitions_and_imports():
+    record = scan(
+        'import os\n'
+        'from pkg import mod\n'
+        '\n'
+        '@decorator\n'
+        'def f():\n'
+        '    """Doc."""\n'
+        '\n'
+        'class C:\n'
+        '    def m(self):\n'
+        '        pass\n'
+    )
+    assert record['error'] is None
+    assert record['imports'] == ['os', 'pkg', 'pkg.mod']
+    f, c, m = record['symbols']
+    assert (f['qualname'], f['kind'], f['start'], f['end'], f['docstring']) == ('f', 'function', 4, 6, True)
+    assert (c['qualname'], c['docstring']) == ('C', False)
+    assert (m['qualname'], m['kind'], m['body']) == ('C.m', 'method', 10)
+    assert scan('def broken(:\n')['error']
+
+
+def test_index_reparses_only_changed_files(tmp_path):
+    a = tmp_path / 'pkg' / 'a.py'
+    b = tmp_path / 'pkg' / 'b.py'
+    a.parent.mkdir()
+    a.write_text('def f():\n    pass\n')
+    b.write_text('x = 1\n')
+    path = str(tmp_path / 'symbols.json')
+    index = SymbolIndex(path)
+    index.update([a, b])
+    assert index.parsed == 2
+    index.save()
+    # A new process reuses the saved entries; a touched but identical file is not re-parsed
+    index = SymbolIndex(path)
+    os.utime(a, ns=(1, 1))
+    index.update([a, b])
+    assert index.parsed == 0
+    a.write_text('def f():\n    """Doc."""\n\ndef g():\n    pass\n')
+    index.update([a, b])
+    assert index.parsed == 1
+    assert [s['qualname'] for s in index.symbols(a)] == ['f', 'g']
+    assert index.lookup(a, 'g')['start'] == 4
+    assert index.modules('pkg.a') == [str(a)]
+    b.unlink()
+    assert index.get(b) is None and str(b) not in index.entries
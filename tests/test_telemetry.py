@@ -0,0 +1,32 @@
+import json
+from codex_autotest import telemetry
+
+def test_instrumentation_is_noop_when_off():
+    telemetry.reset()
+    with telemetry.phase('render'):
+        pass
+    telemetry.count('requests')
+    telemetry.event('request', latency=1)
+    assert telemetry.get() is None
+
+def test_phases_counters_and_events(tmp_path):
+    out = tmp_path / 'metrics.jsonl'
+    tel = telemetry.configure(metrics_out=str(out), command='docstring')
+    try:
+        with telemetry.phase('parse'):
+            pass
+        with telemetry.phase('parse'):
+            pass
+        telemetry.count('requests', 2)
+        telemetry.event('request', latency=0.5)
+        assert tel.phases['parse'][0] == 2
+        summary = '\n'.join(tel.summary())
+        assert 'parse' in summary
+        assert 'Requests: 2' in summary
+    finally:
+        telemetry.reset()
+    events = [json.loads(line) for line in out.read_text().splitlines()]
+    assert events[0] == {**events[0], 'event': 'request', 'command': 'docstring', 'latency': 0.5}
+    assert events[1]['event'] == 'run'
+    assert events[1]['phases']['parse']['calls'] == 2
+    assert events[1]['counters'] == {'requests': 2}
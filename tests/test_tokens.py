@@ -0,0 +1,57 @@
+import pytest
+from codex_autotest import tokens
+from codex_autotest.openai_client import chat_completion, configure_cache
+from codex_autotest.tokens import (
+    PromptTooLargeError, completion_budget, context_window, estimate_cost, estimate_tokens, set_tokenizer,
+)
+
+@pytest.fixture
+def word_tokenizer():
+    set_tokenizer(lambda text, model: len(text.split()))
+    yield
+    set_tokenizer(None)
+
+def test_estimate_tokens_offline():
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('def add(a, b):') == 8
+    assert estimate_tokens('x' * 40) == 10
+
+def test_completion_budget_shrinks_to_fit_context():
+    assert completion_budget(100, 'gpt-4') == tokens.DEFAULT_MAX_TOKENS
+    assert completion_budget(8000, 'gpt-4') == 192
+    with pytest.raises(PromptTooLargeError):
+        completion_budget(8190, 'gpt-4')
+
+def test_context_window_matches_dated_models():
+    assert context_window('gpt-4o-2024-08-06') == 128000
+    assert context_window('unknown-model') == tokens.DEFAULT_CONTEXT
+
+def test_estimate_cost():
+    assert estimate_cost(1_000_000, 0, 'gpt-4o') == pytest.approx(2.50)
+    assert estimate_cost(10, 10, 'mystery') is None
+
+def test_chat_completion_rejects_oversized_prompt_without_request(word_tokenizer, monkeypatch, stub_create):
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    def fail_create(**kwargs):
+        raise AssertionError('request should not be sent')
+    stub_create(fail_create)
+    configure_cache(enabled=False)
+    try:
+        with pytest.raises(PromptTooLargeError):
+            chat_completion('word ' * 9000, model='gpt-4')
+    finally:
+        configure_cache(enabled=True)
+
+def test_chat_completion_sizes_max_tokens(word_tokenizer, monkeypatch, stub_create):
+    monkeypatch.setenv('OPENAI_API_KEY', 'testkey')
+    seen = {}
+    def fake_create(**kwargs):
+        seen.update(kwargs)
+        return 'ok'
+    stub_create(fake_create)
+    configure_cache(enabled=False)
+    try:
+        assert chat_completion('word ' * 8000, model='gpt-4') == 'ok'
+    finally:
+        configure_cache(enabled=True)
+    assert seen['max_tokens'] == 8192 - 8000 - tokens.MESSAGE_OVERHEAD